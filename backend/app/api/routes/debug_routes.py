@@ -0,0 +1,61 @@
+"""
+Debug Routes
+Recent request traces as span trees, for finding where a slow plan spent its time,
+and the cProfile dumps of requests profiled with X-Profile-Token. Both need that token.
+"""
+
+import asyncio
+from typing import Optional
+
+from fastapi import APIRouter, Header, HTTPException, Query
+from fastapi.responses import FileResponse, PlainTextResponse
+from app.core.utils import profiling, tracing
+
+router = APIRouter(tags=["debug"])
+
+def _require_profile_token(token: Optional[str]) -> None:
+    # Profiles and traces expose code paths and arguments, so they are as restricted as taking profiles
+    if not profiling.is_authorized(token):
+        raise HTTPException(status_code=403, detail="Profiling is disabled or the token is invalid")
+
+@router.get("/debug/traces")
+async def list_traces(limit: int = Query(50, ge=1, le=500), x_profile_token: Optional[str] = Header(None)):
+    _require_profile_token(x_profile_token)
+    return {"success": True, "data": {"traces": tracing.tracer.recent(limit)}}
+
+@router.get("/debug/traces/{trace_id}")
+async def get_trace(trace_id: str, x_profile_token: Optional[str] = Header(None)):
+    _require_profile_token(x_profile_token)
+    # Older traces are read back from the files
+    trace = await asyncio.to_thread(tracing.tracer.find, trace_id)
+    if trace is None:
+        raise HTTPException(status_code=404, detail=f"Trace {trace_id} not found")
+    return {"success": True, "data": tracing.build_tree(trace)}
+
+@router.get("/debug/profiles")
+async def list_profiles(x_profile_token: Optional[str] = Header(None)):
+    _require_profile_token(x_profile_token)
+    return {"success": True, "data": {"profiles": profiling.profile_store.list()}}
+
+@router.get("/debug/profiles/{profile_id}", response_class=PlainTextResponse)
+async def get_profile_summary(
+    profile_id: str,
+    sort: str = Query("cumulative"),
+    limit: int = Query(40, ge=1, le=500),
+    x_profile_token: Optional[str] = Header(None)
+):
+    _require_profile_token(x_profile_token)
+    if sort not in profiling.SORT_KEYS:
+        raise HTTPException(status_code=400, detail=f"sort must be one of {', '.join(profiling.SORT_KEYS)}")
+    summary = profiling.profile_store.summary(profile_id, sort, limit)
+    if summary is None:
+        raise HTTPException(status_code=404, detail=f"Profile {profile_id} not found")
+    return summary
+
+@router.get("/debug/profiles/{profile_id}/download")
+async def download_profile(profile_id: str, x_profile_token: Optional[str] = Header(None)):
+    _require_profile_token(x_profile_token)
+    path = profiling.profile_store.path(profile_id)
+    if path is None:
+        raise HTTPException(status_code=404, detail=f"Profile {profile_id} not found")
+    return FileResponse(path, media_type="application/octet-stream", filename=f"{profile_id}.prof")
@@ -0,0 +1,37 @@
+"""
+Flight API Routes
+Flexible-date and multi-origin flight search.
+"""
+
+from fastapi import APIRouter, HTTPException, Query
+from typing import Optional
+from app.config import settings
+from app.core.tools.flight_tool import FlightTool, parse_departure_date
+
+router = APIRouter(tags=["flights"])
+flight_tool = FlightTool()
+
+@router.get("/flights/flex")
+async def flexible_flight_search(
+    destination: str = Query(..., description="Destination city or IATA code"),
+    origins: str = Query("NYC", description="Comma-separated origin cities or IATA codes"),
+    date: Optional[str] = Query(None, description="Preferred departure date (YYYY-MM-DD)"),
+    flex_days: int = Query(3, ge=0, le=settings.FLIGHT_FLEX_MAX_DAYS, description="Days either side of the date"),
+    adults: int = Query(1, ge=1, le=9, description="Number of adult passengers"),
+):
+    """Return a price matrix over origins x dates plus the cheapest option."""
+    if date and parse_departure_date(date) is None:
+        raise HTTPException(status_code=400, detail=f"Invalid date {date!r}, expected YYYY-MM-DD")
+    try:
+        result = await flight_tool.search_flights_flexible(
+            destination=destination,
+            origins=[origin.strip() for origin in origins.split(",") if origin.strip()],
+            departure_date=date,
+            flex_days=flex_days,
+            adults=adults
+        )
+        return {"success": True, "data": result}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Flight search failed: {str(e)}")
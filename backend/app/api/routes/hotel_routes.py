@@ -24,14 +24,28 @@ async def search_hotels(
     check_in: Optional[str] = Query(None, description="Check-in date (YYYY-MM-DD)"),
     check_out: Optional[str] = Query(None, description="Check-out date (YYYY-MM-DD)"),
     travelers: int = Query(2, description="Number of travelers"),
+    min_price: Optional[float] = Query(None, ge=0, description="Minimum price per night"),
+    max_price: Optional[float] = Query(None, ge=0, description="Maximum price per night"),
+    min_rating: Optional[float] = Query(None, ge=0, description="Minimum review score"),
+    amenities: Optional[List[str]] = Query(None, description="Required amenities, repeated or comma-separated"),
+    sort: str = Query("rating", pattern="^(rating|price|review_count|distance)$", description="Sort order"),
+    limit: Optional[int] = Query(None, ge=1, description="Maximum number of hotels to return"),
 ):
     """Search for hotels in a destination."""
+    if amenities:
+        amenities = [a.strip() for value in amenities for a in value.split(",") if a.strip()]
     try:
         result = await hotel_service.search_and_format_hotels(
             destination=destination,
             check_in=check_in,
             check_out=check_out,
-            travelers=travelers
+            travelers=travelers,
+            min_price=min_price,
+            max_price=max_price,
+            min_rating=min_rating,
+            amenities=amenities,
+            sort=sort,
+            limit=limit
         )
         
         if result["success"]:
@@ -41,12 +55,15 @@ async def search_hotels(
                     "hotels": result["hotels"],
                     "summary": result["summary"],
                     "total_found": len(result["hotels"]),
+                    "total_available": result["total_available"],
                     "api_source": result["api_source"]
                 }
             }
         else:
             raise HTTPException(status_code=400, detail=result["error"])
             
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Hotel search failed: {str(e)}")
 
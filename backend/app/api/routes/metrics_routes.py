@@ -0,0 +1,14 @@
+"""
+Metrics Routes
+Prometheus scrape endpoint for stage, upstream, LLM, storage and cache metrics.
+"""
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from app.core.utils.metrics import REGISTRY
+
+router = APIRouter(tags=["metrics"])
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
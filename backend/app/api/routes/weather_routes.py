@@ -0,0 +1,35 @@
+"""
+Weather API Routes
+Batch weather lookups for multi-city itineraries and the dashboard.
+"""
+
+from fastapi import APIRouter, HTTPException, Query
+from typing import Optional
+from app.config import settings
+from app.core.tools.weather_tool import WeatherTool, parse_window_date
+
+router = APIRouter(tags=["weather"])
+weather_tool = WeatherTool()
+
+@router.get("/weather")
+async def get_weather_for_cities(
+    cities: str = Query(..., description="Comma-separated city names"),
+    units: str = Query("metric", pattern="^(metric|imperial|standard)$", description="Measurement units"),
+    start_date: Optional[str] = Query(None, description="Only forecast from this date (YYYY-MM-DD)"),
+    end_date: Optional[str] = Query(None, description="Only forecast up to this date (YYYY-MM-DD)"),
+):
+    """Current weather and forecast for each requested city."""
+    city_list = [city.strip() for city in cities.split(",") if city.strip()]
+    if not city_list:
+        raise HTTPException(status_code=400, detail="At least one city is required")
+    if len(city_list) > settings.WEATHER_MAX_CITIES:
+        raise HTTPException(status_code=400, detail=f"At most {settings.WEATHER_MAX_CITIES} cities per request")
+    for name, value in (("start_date", start_date), ("end_date", end_date)):
+        if value and parse_window_date(value) is None:
+            raise HTTPException(status_code=400, detail=f"Invalid {name} {value!r}, expected YYYY-MM-DD")
+    
+    try:
+        weather = await weather_tool.get_weather_many(city_list, units=units, start_date=start_date, end_date=end_date)
+        return {"success": True, "data": {"weather": weather, "total": len(weather), "units": units}}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Weather lookup failed: {str(e)}")
@@ -1,5 +1,7 @@
 from pydantic_settings import BaseSettings
 from pydantic import ConfigDict
+from typing import Optional
+from urllib.parse import urlparse
 import os
 
 class Settings(BaseSettings):
@@ -15,6 +17,109 @@ class Settings(BaseSettings):
     OPENAI_API_KEY: str = os.getenv("OPENAI_API_KEY", "")
     WEATHER_API_KEY: str = os.getenv("WEATHER_API_KEY", "")
     FLIGHTS_API_KEY: str = os.getenv("FLIGHTS_API_KEY", "")
+    FLIGHTS_API_SECRET: str = os.getenv("FLIGHTS_API_SECRET", "")
     HOTELS_API_KEY: str = os.getenv("HOTELS_API_KEY", "")
+    
+    # Logging; LOG_LEVELS overrides per module, e.g. "hotel_tool=WARNING,openai_service=DEBUG"
+    LOG_LEVEL: str = "INFO"
+    LOG_LEVELS: str = ""
+    
+    # Local record/replay server standing in for every upstream API (see app/stubs)
+    UPSTREAM_STUB_URL: str = ""
+    
+    # Hotel search
+    HOTEL_SEARCH_PAGES: int = 2
+    HOTEL_CACHE_TTL: int = 900
+    # Placeholder hotels served after an upstream failure are cached this briefly
+    HOTEL_FALLBACK_TTL: int = 30
+    
+    # Flight search
+    FLIGHT_CACHE_TTL: int = 600
+    FLIGHT_FLEX_MAX_DAYS: int = 3
+    FLIGHT_MAX_ORIGINS: int = 4
+    
+    # Weather
+    WEATHER_CACHE_TTL: int = 600
+    WEATHER_MAX_CITIES: int = 10
+    
+    # LLM calls and degraded mode: when queue wait, error rate or p90 latency crosses these
+    # limits, new plans use the template itinerary and are upgraded in the background later,
+    # LLM_UPGRADE_CONCURRENCY at a time and only while the LLM has spare capacity. A plan
+    # that waits LLM_DEGRADE_QUEUE_WAIT for a completion slot also gets the template itinerary.
+    LLM_MAX_CONCURRENCY: int = 8
+    LLM_TIMEOUT: float = 30.0
+    LLM_DEGRADE_WINDOW: int = 20
+    LLM_DEGRADE_MIN_SAMPLES: int = 5
+    LLM_DEGRADE_ERROR_RATE: float = 0.5
+    LLM_DEGRADE_LATENCY: float = 20.0
+    LLM_DEGRADE_QUEUE_WAIT: float = 5.0
+    LLM_DEGRADE_COOLDOWN: float = 30.0
+    LLM_UPGRADE_DEGRADED: bool = True
+    LLM_UPGRADE_MAX_DELAY: float = 600.0
+    LLM_UPGRADE_MAX_PENDING: int = 100
+    LLM_UPGRADE_CONCURRENCY: int = 1
+    
+    # Admission control: "route=max_concurrency:max_queue" for routes whose requests are
+    # expensive enough to queue and shed under load (see app/core/utils/admission.py)
+    ADMISSION_LIMITS: str = "/api/v1/plan-trip=8:32,/api/v1/trip/plan=8:32"
+    ADMISSION_MAX_WAIT: float = 30.0
+    
+    # Request tracing (see /api/v1/debug/traces)
+    TRACE_ENABLED: bool = True
+    TRACE_FILE: str = "logs/traces.jsonl"
+    TRACE_MAX_BYTES: int = 10_000_000
+    TRACE_BACKUPS: int = 3
+    TRACE_BUFFER_SIZE: int = 200
+
+    # On-demand profiling: requests sending this token in X-Profile-Token run under
+    # cProfile (see /api/v1/debug/profiles). The same token is needed to read traces.
+    # Empty disables profiling and the debug routes.
+    PROFILE_TOKEN: str = ""
+    PROFILE_DIR: str = "logs/profiles"
+    PROFILE_MAX_FILES: int = 50
+
+    # Directory of a memory-mapped embedding store (see app/core/memory/mapped_memory.py);
+    # empty keeps embeddings in process memory. Workers that only search open it read-only.
+    VECTOR_STORE_DIR: str = ""
+    VECTOR_STORE_READONLY: bool = False
+
+    # Local hashing embedder (see app/core/rag/embedder.py)
+    EMBEDDING_DIM: int = 384
+    EMBEDDING_CACHE_SIZE: int = 4096
+
+    # Directory of Markdown/JSON documents for the Retriever (see app/core/rag/knowledge_base.py);
+    # empty uses the built-in tips. Built indexes are saved to KNOWLEDGE_INDEX_DIR, and changed
+    # files are picked up at most every KNOWLEDGE_REFRESH_SECONDS (0 only checks at startup).
+    KNOWLEDGE_BASE_DIR: str = ""
+    KNOWLEDGE_INDEX_DIR: str = "data/knowledge-index"
+    KNOWLEDGE_REFRESH_SECONDS: float = 60.0
+
+    # Per-session conversation memory (see app/core/memory/conversation_memory.py):
+    # entries kept per kind, idle seconds before a session is evicted, and an optional
+    # byte budget across all sessions (0 for none)
+    CONVERSATION_MAX_ENTRIES: int = 20
+    CONVERSATION_SESSION_TTL: float = 1800.0
+    CONVERSATION_MAX_SESSIONS: int = 10_000
+    CONVERSATION_MAX_BYTES: int = 0
+
+    # Past-trip retrieval before itinerary generation (see app/services/trip_index.py):
+    # a saved LLM itinerary for the same destination at PAST_TRIP_REUSE_SIMILARITY is
+    # adapted without an LLM call; one at PAST_TRIP_EXEMPLAR_SIMILARITY goes into a
+    # shorter prompt limited to PAST_TRIP_MAX_TOKENS completion tokens
+    PAST_TRIP_RETRIEVAL: bool = True
+    PAST_TRIP_REUSE_SIMILARITY: float = 0.9
+    PAST_TRIP_EXEMPLAR_SIMILARITY: float = 0.5
+    PAST_TRIP_MAX_TOKENS: int = 1200
+    PAST_TRIPS_PER_DESTINATION: int = 20
+
+settings = Settings()
+
+def upstream_url(provider: str, default: str) -> str:
+    """Base URL for an upstream API, pointed at the stub server when UPSTREAM_STUB_URL is set."""
+    if not settings.UPSTREAM_STUB_URL:
+        return default
+    return f"{settings.UPSTREAM_STUB_URL.rstrip('/')}/{provider}{urlparse(default).path}".rstrip('/')
 
-settings = Settings()
\ No newline at end of file
+def upstream_key(env_var: str) -> Optional[str]:
+    """API credential from the environment, with a placeholder when running against the stub server."""
+    return os.getenv(env_var) or ("stub-key" if settings.UPSTREAM_STUB_URL else None)
\ No newline at end of file
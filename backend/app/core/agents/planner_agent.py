@@ -1,15 +1,17 @@
 from typing import Dict, Any, List
 from ..tools.cost_calculator import CostCalculator
-from ..memory.conversation_memory import ConversationMemory
+from ..memory.conversation_memory import conversation_memory
 from ...services.openai_service import OpenAIService
+from ..utils.tracing import traced
 
 class PlannerAgent:
     def __init__(self):
         self.cost_calculator = CostCalculator()
-        self.memory = ConversationMemory()
+        self.memory = conversation_memory
         self.openai_service = OpenAIService()
     
-    async def create_itinerary(self, trip_data: Dict[str, Any]) -> Dict[str, Any]:
+    @traced("create_itinerary")
+    async def create_itinerary(self, trip_data: Dict[str, Any], allow_degraded: bool = True) -> Dict[str, Any]:
         # Calculate duration from dates if provided
         duration = self._calculate_duration(trip_data)
         trip_data["duration"] = duration
@@ -19,7 +21,8 @@ class PlannerAgent:
             trip_data["weather_info"] = trip_data["weather"]
         
         # Generate AI-powered itinerary
-        ai_itinerary = await self.openai_service.generate_itinerary(trip_data)
+        ai_itinerary = await self.openai_service.generate_itinerary(trip_data, allow_degraded=allow_degraded)
+        degraded = isinstance(ai_itinerary, dict) and ai_itinerary.get("degraded", False)
         
         # Calculate costs
         total_cost = self.cost_calculator.calculate_total_cost(trip_data)
@@ -61,7 +64,8 @@ class PlannerAgent:
             "estimated_cost": total_cost,
             "recommendations": recommendations,
             "daily_plan": daily_plan,
-            "ai_generated": True,
+            "ai_generated": not degraded,
+            "degraded": degraded,
             "api_sources": {
                 "itinerary": ai_itinerary.get("api_source", "Enhanced Mock Data") if isinstance(ai_itinerary, dict) else "Enhanced Mock Data",
                 "flights": "Amadeus API" if trip_data.get("flights") else "Enhanced Mock Data",
@@ -70,7 +74,7 @@ class PlannerAgent:
             }
         }
         
-        await self.memory.store_plan(itinerary)
+        await self.memory.store_plan(itinerary, trip_data.get("session_id"))
         return itinerary
     
     def _calculate_duration(self, trip_data: Dict[str, Any]) -> int:
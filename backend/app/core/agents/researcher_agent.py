@@ -1,24 +1,46 @@
-from typing import Dict, Any
+from typing import Dict, Any, List
 from datetime import datetime, timedelta
 from ..tools.weather_tool import WeatherTool
 from ..tools.flight_tool import FlightTool
 from ..tools.hotel_tool import HotelTool
+from ..tools.hotel_summary import summarize_hotels
+from ..utils.tracing import traced
+from ..utils.logger import Logger
 
 class ResearcherAgent:
     def __init__(self):
         self.weather_tool = WeatherTool()
         self.flight_tool = FlightTool()
         self.hotel_tool = HotelTool()
+        self.logger = Logger("researcher_agent")
     
+    @traced("research_destination")
     async def research_destination(self, destination: str, check_in: str = None, check_out: str = None, 
-                                 travelers: int = 2) -> Dict[str, Any]:
-        print(f"Researching destination: {destination}")
+                                 travelers: int = 2, origins: List[str] = None, flex_days: int = 0) -> Dict[str, Any]:
+        self.logger.info("Researching destination: %s", destination)
         
-        weather = await self.weather_tool.get_weather(destination)
-        print(f"Weather data: {len(str(weather))} chars")
+        weather = await self.weather_tool.get_weather(destination, start_date=check_in, end_date=check_out)
         
-        flights = await self.flight_tool.search_flights(destination)
-        print(f"Flights data: {len(flights)} flights")
+        flight_search = None
+        if flex_days or (origins and len(origins) > 1):
+            flight_search = await self.flight_tool.search_flights_flexible(
+                destination=destination,
+                origins=origins,
+                departure_date=check_in,
+                flex_days=flex_days,
+                adults=travelers
+            )
+            flights = flight_search["flights"]
+        elif origins:
+            flights = await self.flight_tool.search_flights(
+                destination=destination,
+                origin=origins[0],
+                departure_date=check_in,
+                adults=travelers
+            )
+        else:
+            flights = await self.flight_tool.search_flights(destination)
+        self.logger.debug("Flights data: %d flights", len(flights))
         
         hotels = await self.hotel_tool.search_hotels(
             location=destination,
@@ -27,12 +49,12 @@ class ResearcherAgent:
             adults=travelers,
             rooms=max(1, travelers // 2)
         )
-        print(f"Hotels data: {len(hotels)} hotels found via RapidAPI")
+        self.logger.debug("Hotels data: %d hotels found via RapidAPI", len(hotels))
         
         # Format hotel data for trip integration
         formatted_hotels = self._format_hotels_for_trip(hotels)
         
-        return {
+        research = {
             "destination": destination,
             "weather": weather,
             "flights": flights,
@@ -45,31 +67,18 @@ class ResearcherAgent:
                 "hotels": "RapidAPI Booking.com"
             }
         }
+        if flight_search:
+            research["flight_search"] = flight_search
+        return research
     
     def _format_hotels_for_trip(self, hotels: list) -> Dict[str, Any]:
         """Format hotel data for trip summary and highlights."""
         if not hotels:
             return {"available": False, "message": "No hotels found"}
         
-        # Get best hotel (highest rated)
-        best_hotel = max(hotels, key=lambda x: x.get('rating', 0))
-        
-        # Calculate average price
-        avg_price = sum(h.get('price_per_night', 0) for h in hotels) / len(hotels)
-        
+        summary = summarize_hotels(hotels)
         return {
-            "available": True,
-            "total_found": len(hotels),
-            "best_hotel": {
-                "name": best_hotel.get('name'),
-                "rating": best_hotel.get('rating'),
-                "price": best_hotel.get('price_per_night'),
-                "currency": best_hotel.get('currency', 'USD')
-            },
-            "price_range": {
-                "min": min(h.get('price_per_night', 0) for h in hotels),
-                "max": max(h.get('price_per_night', 0) for h in hotels),
-                "average": round(avg_price, 2)
-            },
+            **summary,
+            "total_found": summary["total_hotels"],
             "api_source": "RapidAPI Booking.com"
         }
\ No newline at end of file
@@ -1,12 +1,14 @@
 from typing import Dict, Any, List
-from ..memory.conversation_memory import ConversationMemory
+from ..memory.conversation_memory import conversation_memory
 from ...services.openai_service import OpenAIService
+from ..utils.tracing import traced
 
 class SummarizerAgent:
     def __init__(self):
-        self.memory = ConversationMemory()
+        self.memory = conversation_memory
         self.openai_service = OpenAIService()
     
+    @traced("summarize_trip")
     async def summarize_trip(self, trip_data: Dict[str, Any]) -> Dict[str, Any]:
         # Generate AI-powered summary
         ai_summary = await self.openai_service.generate_travel_summary(trip_data)
@@ -21,7 +23,7 @@ class SummarizerAgent:
             "timestamp": trip_data.get("timestamp", "")
         }
         
-        await self.memory.store_summary(summary)
+        await self.memory.store_summary(summary, trip_data.get("session_id"))
         return summary
     
     def _create_overview(self, trip_data: Dict[str, Any]) -> str:
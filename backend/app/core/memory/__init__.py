@@ -1,4 +1,6 @@
 from .conversation_memory import ConversationMemory
+from .ivf_index import IVFIndex
+from .mapped_memory import MappedVectorMemory
 from .vector_memory import VectorMemory
 
-__all__ = ["ConversationMemory", "VectorMemory"]
\ No newline at end of file
+__all__ = ["ConversationMemory", "IVFIndex", "MappedVectorMemory", "VectorMemory"]
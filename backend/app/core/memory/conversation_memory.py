@@ -1,32 +1,195 @@
-from typing import Dict, Any, List
-import json
+"""
+Conversation Memory
+Recent conversations, plans and summaries per session, bounded three ways:
+- each session keeps at most ``max_entries`` of each kind (oldest dropped first)
+- sessions idle for ``session_ttl`` seconds are evicted, as are the least recently
+  used ones beyond ``max_sessions``
+- with ``max_bytes`` set, entries are sized as JSON and least recently used
+  sessions are evicted until the total fits
+
+Sessions are kept in least-recently-used order, so eviction only looks at the
+sessions it removes. Entries are stored as given, not copied.
+"""
+
+from typing import Any, Deque, Dict, List, Optional, Tuple
+from collections import OrderedDict, deque
 from datetime import datetime
+import json
+import time
+
+from ...config import settings
+from ..utils.metrics import REGISTRY
+
+DEFAULT_SESSION = "default"
+KINDS = ("conversations", "plans", "summaries")
+
+class _Session:
+    __slots__ = ("entries", "bytes", "last_seen")
 
-class ConversationMemory:
     def __init__(self):
-        self.conversations = []
-        self.plans = []
-        self.summaries = []
-    
-    async def store_conversation(self, user_input: str, agent_response: str) -> None:
+        self.entries: Dict[str, Deque[Tuple[int, Dict[str, Any]]]] = {kind: deque() for kind in KINDS}
+        self.bytes = 0
+        self.last_seen = time.monotonic()
+
+class ConversationMemory:
+    def __init__(self, max_entries: int = 20, session_ttl: float = 1800.0,
+                 max_sessions: int = 10_000, max_bytes: int = 0):
+        self.max_entries = max_entries
+        self.session_ttl = session_ttl
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+        self._sessions: "OrderedDict[str, _Session]" = OrderedDict()
+        self._bytes = 0
+        self.evicted_sessions = 0
+        self.evicted_entries = 0
+
+    def _touch(self, session_id: Optional[str], create: bool) -> Optional[_Session]:
+        self._expire()
+        session_id = session_id or DEFAULT_SESSION
+        session = self._sessions.get(session_id)
+        if session is None:
+            if not create:
+                return None
+            session = self._sessions[session_id] = _Session()
+        else:
+            self._sessions.move_to_end(session_id)
+        session.last_seen = time.monotonic()
+        return session
+
+    def _expire(self) -> None:
+        cutoff = time.monotonic() - self.session_ttl
+        while self._sessions:
+            session_id, session = next(iter(self._sessions.items()))
+            if session.last_seen >= cutoff and len(self._sessions) <= self.max_sessions:
+                break
+            self._evict(session_id)
+
+    def _evict(self, session_id: str) -> None:
+        session = self._sessions.pop(session_id)
+        self._bytes -= session.bytes
+        self.evicted_sessions += 1
+
+    def _size(self, entry: Dict[str, Any]) -> int:
+        # Only measured when there is a budget to enforce
+        return len(json.dumps(entry, default=str)) if self.max_bytes else 0
+
+    def _append(self, session_id: Optional[str], kind: str, entry: Dict[str, Any]) -> None:
+        session = self._touch(session_id, create=True)
+        entries = session.entries[kind]
+        size = self._size(entry)
+        entries.append((size, entry))
+        session.bytes += size
+        self._bytes += size
+        while len(entries) > self.max_entries:
+            self._drop_oldest(session, entries)
+        if self.max_bytes:
+            self._enforce_budget(session)
+
+    def _drop_oldest(self, session: _Session, entries: Deque[Tuple[int, Dict[str, Any]]]) -> None:
+        size, _ = entries.popleft()
+        session.bytes -= size
+        self._bytes -= size
+        self.evicted_entries += 1
+
+    def _enforce_budget(self, current: _Session) -> None:
+        # Other sessions go first, least recently used first; the current one is last in order
+        while self._bytes > self.max_bytes and len(self._sessions) > 1:
+            self._evict(next(iter(self._sessions)))
+        # Then the current session's own oldest entries, keeping its newest one
+        while self._bytes > self.max_bytes:
+            oldest = min((entries for entries in current.entries.values() if entries),
+                         key=lambda entries: entries[0][1].get("timestamp", ""), default=None)
+            if oldest is None or sum(map(len, current.entries.values())) <= 1:
+                break
+            self._drop_oldest(current, oldest)
+
+    async def store_conversation(self, user_input: str, agent_response: str, session_id: Optional[str] = None) -> None:
         conversation = {
             "timestamp": datetime.now().isoformat(),
             "user_input": user_input,
             "agent_response": agent_response
         }
-        self.conversations.append(conversation)
-    
-    async def store_plan(self, plan: Dict[str, Any]) -> None:
+        self._append(session_id, "conversations", conversation)
+
+    async def store_plan(self, plan: Dict[str, Any], session_id: Optional[str] = None) -> None:
         plan["timestamp"] = datetime.now().isoformat()
-        self.plans.append(plan)
-    
-    async def store_summary(self, summary: Dict[str, Any]) -> None:
+        self._append(session_id, "plans", plan)
+
+    async def store_summary(self, summary: Dict[str, Any], session_id: Optional[str] = None) -> None:
         summary["timestamp"] = datetime.now().isoformat()
-        self.summaries.append(summary)
-    
-    def get_recent_conversations(self, limit: int = 5) -> List[Dict[str, Any]]:
-        return self.conversations[-limit:]
-    
-    def get_conversation_context(self) -> str:
-        recent = self.get_recent_conversations(3)
-        return " ".join([f"User: {c['user_input']} Agent: {c['agent_response']}" for c in recent])
\ No newline at end of file
+        self._append(session_id, "summaries", summary)
+
+    def _recent(self, session_id: Optional[str], kind: str, limit: int) -> List[Dict[str, Any]]:
+        session = self._touch(session_id, create=False)
+        if session is None or limit <= 0:
+            return []
+        entries = session.entries[kind]
+        return [entry for _, entry in list(entries)[-limit:]]
+
+    def get_recent_conversations(self, limit: int = 5, session_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        return self._recent(session_id, "conversations", limit)
+
+    def get_recent_plans(self, limit: int = 5, session_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        return self._recent(session_id, "plans", limit)
+
+    def get_recent_summaries(self, limit: int = 5, session_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        return self._recent(session_id, "summaries", limit)
+
+    def get_conversation_context(self, session_id: Optional[str] = None) -> str:
+        recent = self.get_recent_conversations(3, session_id)
+        return " ".join([f"User: {c['user_input']} Agent: {c['agent_response']}" for c in recent])
+
+    def end_session(self, session_id: str) -> bool:
+        if session_id not in self._sessions:
+            return False
+        session = self._sessions.pop(session_id)
+        self._bytes -= session.bytes
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        self._expire()
+        entries = {kind: sum(len(session.entries[kind]) for session in self._sessions.values()) for kind in KINDS}
+        return {
+            "sessions": len(self._sessions),
+            "entries": entries,
+            "bytes": self._bytes if self.max_bytes else None,
+            "evicted_sessions": self.evicted_sessions,
+            "evicted_entries": self.evicted_entries
+        }
+
+conversation_memory = ConversationMemory(
+    settings.CONVERSATION_MAX_ENTRIES,
+    settings.CONVERSATION_SESSION_TTL,
+    settings.CONVERSATION_MAX_SESSIONS,
+    settings.CONVERSATION_MAX_BYTES
+)
+
+
+def _collect_conversations() -> List[str]:
+    stats = conversation_memory.stats()
+    lines = [
+        "# HELP conversation_sessions Sessions currently held by conversation memory.",
+        "# TYPE conversation_sessions gauge",
+        f"conversation_sessions {stats['sessions']}",
+        "# HELP conversation_entries Conversations, plans and summaries currently held.",
+        "# TYPE conversation_entries gauge"
+    ]
+    lines.extend(f'conversation_entries{{kind="{kind}"}} {count}' for kind, count in stats["entries"].items())
+    lines.extend([
+        "# HELP conversation_evicted_sessions_total Sessions evicted for idleness, count or the byte budget.",
+        "# TYPE conversation_evicted_sessions_total counter",
+        f"conversation_evicted_sessions_total {stats['evicted_sessions']}",
+        "# HELP conversation_evicted_entries_total Entries dropped to stay within per-session caps or the budget.",
+        "# TYPE conversation_evicted_entries_total counter",
+        f"conversation_evicted_entries_total {stats['evicted_entries']}"
+    ])
+    if stats["bytes"] is not None:
+        lines.extend([
+            "# HELP conversation_bytes Approximate JSON size of everything held.",
+            "# TYPE conversation_bytes gauge",
+            f"conversation_bytes {stats['bytes']}"
+        ])
+    return lines
+
+
+REGISTRY.add_collector(_collect_conversations)
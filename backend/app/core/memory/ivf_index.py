@@ -0,0 +1,147 @@
+from typing import Any, Dict, List, Optional
+import numpy as np
+
+class IVFIndex:
+    """Inverted-file (IVF-flat) approximate index for VectorMemory.
+
+    Unit vectors are clustered around ``nlist`` centroids by spherical k-means; a
+    query scores only the rows in its ``nprobe`` nearest clusters. Raising nprobe
+    trades speed for recall (nprobe == nlist is exact). Rows added after training
+    join their nearest cluster, so inserts never trigger a rebuild.
+
+    The index holds row numbers into VectorMemory's matrix, not vectors.
+    """
+
+    def __init__(self, nlist: int = 256, nprobe: int = 8, train_size: Optional[int] = None,
+                 iterations: int = 10, seed: int = 0):
+        if nlist <= 0 or nprobe <= 0:
+            raise ValueError("nlist and nprobe must be positive")
+        self.nlist = nlist
+        self.nprobe = nprobe
+        # Rows needed before training; fewer than a few dozen per cluster gives poor centroids
+        self.train_size = train_size or nlist * 39
+        self.iterations = iterations
+        self.seed = seed
+        self.centroids: Optional[np.ndarray] = None
+        # Row -> cluster, -1 when the row is not indexed
+        self._assignment = np.full(0, -1, dtype=np.int32)
+        self._lists: List[np.ndarray] = []
+        self._list_sizes = np.zeros(0, dtype=np.int64)
+        # List entries left behind by removed or re-assigned rows
+        self._stale = 0
+
+    @property
+    def trained(self) -> bool:
+        return self.centroids is not None
+
+    def _assign(self, vectors: np.ndarray, chunk: int = 65536) -> np.ndarray:
+        return np.concatenate([
+            np.argmax(vectors[start:start + chunk] @ self.centroids.T, axis=1)
+            for start in range(0, len(vectors), chunk)
+        ]).astype(np.int32) if len(vectors) else np.zeros(0, dtype=np.int32)
+
+    def train(self, vectors: np.ndarray) -> None:
+        """Fit the centroids with spherical k-means on (a sample of) unit ``vectors``."""
+        rng = np.random.default_rng(self.seed)
+        nlist = min(self.nlist, len(vectors))
+        sample = vectors[rng.choice(len(vectors), min(len(vectors), self.nlist * 64), replace=False)]
+        centroids = sample[rng.choice(len(sample), nlist, replace=False)].copy()
+        for _ in range(self.iterations):
+            assignment = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignment, sample)
+            counts = np.bincount(assignment, minlength=nlist)
+            empty = counts == 0
+            # Reseed clusters that lost all their points
+            sums[empty] = sample[rng.choice(len(sample), int(empty.sum()))]
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            centroids = (sums / norms).astype(np.float32)
+        self.nlist = nlist
+        self.centroids = centroids
+        self._assignment = np.full(len(self._assignment), -1, dtype=np.int32)
+        self._rebuild_lists()
+
+    def _rebuild_lists(self) -> None:
+        self._lists = [np.zeros(16, dtype=np.int64) for _ in range(self.nlist)]
+        self._list_sizes = np.zeros(self.nlist, dtype=np.int64)
+        self._stale = 0
+        rows = np.flatnonzero(self._assignment >= 0)
+        self._append_grouped(rows, self._assignment[rows])
+
+    def add(self, rows: np.ndarray, vectors: np.ndarray) -> None:
+        """Index (or re-index, after a replace) these rows of the matrix."""
+        if not self.trained or not len(rows):
+            return
+        self._ensure_rows(int(rows.max()) + 1)
+        clusters = self._assign(vectors)
+        self._stale += int(np.count_nonzero(self._assignment[rows] >= 0))
+        self._assignment[rows] = clusters
+        self._append_grouped(rows, clusters)
+        self._compact_if_stale()
+
+    def remove(self, rows: np.ndarray) -> None:
+        # List entries are dropped lazily: candidates() skips rows assigned elsewhere
+        rows = rows[rows < len(self._assignment)]
+        self._stale += int(np.count_nonzero(self._assignment[rows] >= 0))
+        self._assignment[rows] = -1
+        self._compact_if_stale()
+
+    def _compact_if_stale(self) -> None:
+        if self._stale > 1024 and self._stale > 0.2 * self._list_sizes.sum():
+            self._rebuild_lists()
+
+    def _ensure_rows(self, count: int) -> None:
+        if count > len(self._assignment):
+            grown = np.full(max(count, 2 * len(self._assignment)), -1, dtype=np.int32)
+            grown[:len(self._assignment)] = self._assignment
+            self._assignment = grown
+
+    def _append_grouped(self, rows: np.ndarray, clusters: np.ndarray) -> None:
+        if not len(rows):
+            return
+        order = np.argsort(clusters, kind="stable")
+        clusters, rows = clusters[order], rows[order]
+        bounds = np.flatnonzero(np.diff(clusters)) + 1
+        for cluster_rows, cluster in zip(np.split(rows, bounds), clusters[np.r_[0, bounds]]):
+            self._append(int(cluster), cluster_rows)
+
+    def _append(self, cluster: int, rows: np.ndarray) -> None:
+        size = self._list_sizes[cluster]
+        entries = self._lists[cluster]
+        if size + len(rows) > len(entries):
+            grown = np.zeros(max(size + len(rows), 2 * len(entries)), dtype=np.int64)
+            grown[:size] = entries[:size]
+            self._lists[cluster] = entries = grown
+        entries[size:size + len(rows)] = rows
+        self._list_sizes[cluster] = size + len(rows)
+
+    def candidates(self, query: np.ndarray, nprobe: Optional[int] = None) -> np.ndarray:
+        """Rows in the clusters nearest to a unit ``query``."""
+        nprobe = min(nprobe or self.nprobe, self.nlist)
+        scores = self.centroids @ query
+        probes = np.argpartition(-scores, nprobe - 1)[:nprobe] if nprobe < self.nlist else range(self.nlist)
+        rows = np.concatenate([self._lists[c][:self._list_sizes[c]] for c in probes])
+        clusters = np.concatenate([np.full(self._list_sizes[c], c, dtype=np.int32) for c in probes])
+        rows = rows[self._assignment[rows] == clusters]
+        # A row removed and reused in the same cluster is listed twice until compaction
+        return np.unique(rows) if self._stale else rows
+
+    def state(self) -> Dict[str, Any]:
+        """Arrays needed to restore the trained index without re-clustering or re-assigning."""
+        return {
+            "params": np.array([self.nlist, self.nprobe, self.train_size, self.iterations, self.seed]),
+            "centroids": self.centroids if self.trained else np.zeros((0, 0), dtype=np.float32),
+            "assignment": self._assignment
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> "IVFIndex":
+        nlist, nprobe, train_size, iterations, seed = (int(value) for value in state["params"])
+        index = cls(nlist, nprobe, train_size, iterations, seed)
+        if len(state["centroids"]):
+            index.centroids = np.asarray(state["centroids"], dtype=np.float32)
+            assignment = np.asarray(state["assignment"], dtype=np.int32)
+            index._assignment = assignment.copy()
+            index._rebuild_lists()
+        return index
@@ -0,0 +1,279 @@
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import json
+import os
+import numpy as np
+from .ivf_index import IVFIndex
+from .vector_memory import VectorMemory
+
+# Per-row entry of the id/offset table: where the row's id and text sit in the document log
+ROW_DTYPE = np.dtype([("offset", "<i8"), ("id_length", "<i4"), ("text_length", "<i4"), ("live", "?")])
+# used rows, write version, live documents
+_HEADER_FIELDS = 3
+
+class MappedVectorMemory(VectorMemory):
+    """VectorMemory whose embeddings live in files under ``directory``.
+
+    - ``vectors.f32``: the fixed-width float32 matrix, opened with ``numpy.memmap``
+    - ``rows.tbl``: the id/offset table, one ROW_DTYPE entry per matrix row
+    - ``documents.log``: append-only log of each stored id and text
+    - ``header.i8``: used rows, a write version and the document count
+
+    Opening maps the files without reading them, so startup does not depend on the
+    corpus size and only the pages a query touches become resident. Pages are shared
+    through the OS page cache, so any number of ``readonly`` instances (one per
+    worker) can serve one store; they pick up the writer's changes through the header.
+    There must be at most one writer. A replaced document is written to a fresh row
+    that goes live before the old row is retired, so readers never see a row whose
+    vector, id and text come from different writes; the old text stays in the log.
+    A trained index is saved to ``index.npz`` when it is (re)built and on ``flush()``,
+    with the log offset of every row it covers; readers assign rows written since then
+    (their offset changed) to the nearest cluster themselves. ``flush()`` makes writes
+    durable.
+    """
+
+    def __init__(self, directory: str, dim: Optional[int] = None, readonly: bool = False,
+                 index: Optional[IVFIndex] = None, initial_capacity: int = 1024):
+        meta_path = os.path.join(directory, "meta.json")
+        if os.path.exists(meta_path):
+            with open(meta_path, "r") as f:
+                stored_dim = json.load(f)["dim"]
+            if dim is not None and dim != stored_dim:
+                raise ValueError(f"{directory} holds {stored_dim}-dimensional embeddings, not {dim}")
+            dim = stored_dim
+        elif readonly:
+            raise FileNotFoundError(f"No vector store in {directory}")
+
+        super().__init__(dim=dim, initial_capacity=initial_capacity, index=index)
+        self.directory = directory
+        self.readonly = readonly
+        # (inode, mtime) of the index.npz loaded; each save replaces the file, so this changes
+        self._index_stamp: Optional[Tuple[int, int]] = None
+        # Log offset of each row as last indexed, -1 for rows not indexed
+        self._indexed_offsets = np.zeros(0, dtype=np.int64)
+        if index is None:
+            self._load_index()
+        self._mode = "r" if readonly else "r+"
+        self._row_table: Optional[Dict[str, int]] = None
+        self._version = -1
+        self._log_fd: Optional[int] = None
+        self._log = None
+        if not readonly:
+            os.makedirs(directory, exist_ok=True)
+        if dim is not None:
+            self._open(dim)
+            # The saved index may predate the last writes (rows written since the last flush)
+            self._sync_index()
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def _open(self, dim: int) -> None:
+        if not self.readonly:
+            if not os.path.exists(self._path("meta.json")):
+                with open(self._path("meta.json"), "w") as f:
+                    json.dump({"dim": dim}, f)
+            for name in ("vectors.f32", "rows.tbl", "documents.log"):
+                open(self._path(name), "ab").close()
+            with open(self._path("header.i8"), "ab") as f:
+                if f.tell() == 0:
+                    f.write(np.zeros(_HEADER_FIELDS, dtype="<i8").tobytes())
+            self._log = open(self._path("documents.log"), "ab")
+        self._header = np.memmap(self._path("header.i8"), dtype="<i8", mode=self._mode, shape=(_HEADER_FIELDS,))
+        self._log_fd = os.open(self._path("documents.log"), os.O_RDONLY)
+        self._map(os.path.getsize(self._path("rows.tbl")) // ROW_DTYPE.itemsize)
+        self._used = int(self._header[0])
+        self._version = int(self._header[1])
+        if not self.readonly:
+            self._free = np.flatnonzero(~self._live[:self._used]).tolist()
+
+    def _map(self, capacity: int) -> None:
+        if capacity == 0:
+            # numpy cannot map an empty file
+            self._matrix = np.zeros((0, self.dim), dtype=np.float32)
+            self._table = np.zeros(0, dtype=ROW_DTYPE)
+        else:
+            self._matrix = np.memmap(self._path("vectors.f32"), dtype=np.float32, mode=self._mode, shape=(capacity, self.dim))
+            self._table = np.memmap(self._path("rows.tbl"), dtype=ROW_DTYPE, mode=self._mode, shape=(capacity,))
+        self._live = self._table["live"]
+
+    def _as_matrix(self, embeddings: Sequence[Sequence[float]]) -> np.ndarray:
+        first = self.dim is None
+        vectors = super()._as_matrix(embeddings)
+        if first:
+            self._open(self.dim)
+        return vectors
+
+    def _grow(self, needed: int) -> None:
+        capacity = len(self._matrix)
+        if needed <= capacity:
+            return
+        new_capacity = max(needed, capacity * 2, self._initial_capacity)
+        # Extending the files leaves them sparse; disk is only used as rows are written
+        for name, width in (("vectors.f32", self.dim * 4), ("rows.tbl", ROW_DTYPE.itemsize)):
+            with open(self._path(name), "r+b") as f:
+                f.truncate(new_capacity * width)
+        self._map(new_capacity)
+
+    def _load_index(self) -> None:
+        try:
+            stat = os.stat(self._path("index.npz"))
+        except OSError:
+            return
+        stamp = (stat.st_ino, stat.st_mtime_ns)
+        if stamp == self._index_stamp:
+            return
+        with np.load(self._path("index.npz")) as state:
+            state = dict(state)
+        self.index = IVFIndex.from_state(state)
+        # Indexes saved without offsets are brought up to date row by row
+        self._indexed_offsets = state.get("offsets", np.zeros(0, dtype=np.int64)).astype(np.int64)
+        self._index_stamp = stamp
+
+    def _save_index(self) -> None:
+        if self.index is not None and self.index.trained and self.dim is not None:
+            offsets = np.asarray(self._table["offset"][:self._used], dtype=np.int64)
+            np.savez(self._path("index.tmp.npz"), offsets=offsets, **self.index.state())
+            os.replace(self._path("index.tmp.npz"), self._path("index.npz"))
+
+    def _sync_index(self) -> None:
+        """Assign rows written since the index was saved (or last synced) to their clusters."""
+        if self.index is None or not self.index.trained or self.dim is None:
+            return
+        offsets = np.array(self._table["offset"][:self._used], dtype=np.int64)
+        known = self._indexed_offsets[:self._used]
+        stale = np.ones(self._used, dtype=bool)
+        stale[:len(known)] = offsets[:len(known)] != known
+        rows = np.flatnonzero(stale)
+        live = rows[self._live[rows]]
+        self.index.add(live, self._matrix[live])
+        # Rows not live yet are checked again on the next sync
+        offsets[rows[~self._live[rows]]] = -1
+        self._indexed_offsets = offsets
+
+    def build_index(self) -> None:
+        super().build_index()
+        if not self.readonly:
+            self._save_index()
+
+    def _refresh(self) -> None:
+        """Catch a reader up with the writer; cheap when nothing changed."""
+        if not self.readonly or self.dim is None or int(self._header[1]) == self._version:
+            return
+        self._version = int(self._header[1])
+        self._used = int(self._header[0])
+        if self._used > len(self._matrix):
+            self._map(os.path.getsize(self._path("rows.tbl")) // ROW_DTYPE.itemsize)
+        self._row_table = None
+        # A rebuilt index replaces ours; either way rows written since need assigning
+        self._load_index()
+        self._sync_index()
+
+    def _committed(self) -> None:
+        self._header[0] = self._used
+        self._header[2] = len(self._rows)
+        # Bumped last so a reader never sees the new version with the old counts
+        self._header[1] += 1
+        self._version = int(self._header[1])
+
+    @property
+    def _rows(self) -> Dict[str, int]:
+        # id -> row is only needed for writes and id lookups, so opening and searching never build it
+        if self._row_table is None:
+            self._refresh()
+            live = np.flatnonzero(self._live[:self._used]).tolist() if self.dim is not None else []
+            self._row_table = {self._document(row)[0]: row for row in live}
+        return self._row_table
+
+    @_rows.setter
+    def _rows(self, rows: Dict[str, int]) -> None:
+        self._row_table = rows
+
+    def __len__(self) -> int:
+        self._refresh()
+        if self._row_table is not None:
+            # Ahead of the header while a write is in progress
+            return len(self._row_table)
+        return int(self._header[2]) if self._log_fd is not None else 0
+
+    def _check_writable(self) -> None:
+        if self.readonly:
+            raise PermissionError(f"Vector store {self.directory} is open read-only")
+
+    def add_batch(self, doc_ids: Sequence[str], texts: Sequence[str], embeddings: Sequence[Sequence[float]]) -> None:
+        self._check_writable()
+        # Replacements take fresh rows, as if new; the old rows stay live until they are written
+        replaced = {doc_id: self._rows.pop(doc_id) for doc_id in set(doc_ids) if doc_id in self._rows}
+        try:
+            super().add_batch(doc_ids, texts, embeddings)
+        except Exception:
+            self._rows.update(replaced)
+            raise
+        if replaced:
+            old = np.fromiter(replaced.values(), dtype=np.int64, count=len(replaced))
+            self._live[old] = False
+            self._matrix[old] = 0.0
+            self._free.extend(old.tolist())
+            if self.index is not None:
+                self.index.remove(old)
+        if len(doc_ids):
+            self._committed()
+
+    def delete(self, doc_id: str) -> bool:
+        self._check_writable()
+        deleted = super().delete(doc_id)
+        if deleted:
+            self._committed()
+        return deleted
+
+    def _write_documents(self, rows: List[int], doc_ids: Sequence[str], texts: Sequence[str]) -> None:
+        ids = [str(doc_id).encode("utf-8") for doc_id in doc_ids]
+        encoded = [str(text).encode("utf-8") for text in texts]
+        id_lengths = np.fromiter(map(len, ids), dtype=np.int64, count=len(ids))
+        text_lengths = np.fromiter(map(len, encoded), dtype=np.int64, count=len(encoded))
+        ends = self._log.tell() + np.cumsum(id_lengths + text_lengths)
+        self._log.write(b"".join(part for record in zip(ids, encoded) for part in record))
+        self._log.flush()
+        # Only rows that are not live are written (add_batch gives replacements fresh rows),
+        # so readers skip them until add_batch marks them live
+        entries = np.zeros(len(rows), dtype=ROW_DTYPE)
+        entries["offset"] = ends - id_lengths - text_lengths
+        entries["id_length"] = id_lengths
+        entries["text_length"] = text_lengths
+        self._table[rows] = entries
+
+    def _forget_document(self, row: int, doc_id: str) -> None:
+        # Clearing live (done by delete) is enough; the log entry is simply orphaned
+        pass
+
+    def _document(self, row: int) -> Tuple[str, str]:
+        offset, id_length, text_length, _ = self._table[row].item()
+        data = os.pread(self._log_fd, id_length + text_length, offset)
+        return data[:id_length].decode("utf-8"), data[id_length:].decode("utf-8")
+
+    def search_batch(self, query_embeddings: Sequence[Sequence[float]], top_k: int = 5,
+                     nprobe: Optional[int] = None) -> List[List[Dict[str, Any]]]:
+        self._refresh()
+        return super().search_batch(query_embeddings, top_k, nprobe)
+
+    def get_embedding(self, doc_id: str) -> Optional[np.ndarray]:
+        self._refresh()
+        return super().get_embedding(doc_id)
+
+    def flush(self) -> None:
+        if self.readonly or self.dim is None:
+            return
+        if isinstance(self._matrix, np.memmap):
+            self._matrix.flush()
+            self._table.flush()
+        self._header.flush()
+        os.fsync(self._log.fileno())
+        self._save_index()
+
+    def close(self) -> None:
+        self.flush()
+        if self._log is not None:
+            self._log.close()
+            self._log = None
+        if self._log_fd is not None:
+            os.close(self._log_fd)
+            self._log_fd = None
@@ -1,26 +1,246 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Sequence, Tuple
 import json
+import os
+import numpy as np
+from .ivf_index import IVFIndex
 
 class VectorMemory:
-    def __init__(self):
-        self.embeddings = {}
-        self.documents = {}
-    
+    """Cosine-similarity index over document embeddings.
+
+    Embeddings are normalized on insert into one contiguous float32 matrix that
+    doubles when full, so a query is a single matrix-vector product followed by
+    ``argpartition`` for the top k. Deleted rows go on a free list and are reused.
+
+    With an ``index`` (IVFIndex), queries only score the rows it proposes once it has
+    been trained, which happens automatically when ``index.train_size`` documents
+    are stored, or on ``build_index()``.
+    """
+
+    def __init__(self, dim: Optional[int] = None, initial_capacity: int = 1024, index: Optional[IVFIndex] = None):
+        self.dim = dim
+        self.index = index
+        self.documents: Dict[str, str] = {}
+        self._initial_capacity = max(1, initial_capacity)
+        self._matrix = np.zeros((0, dim or 0), dtype=np.float32)
+        self._live = np.zeros(0, dtype=bool)
+        self._row_ids: List[Optional[str]] = []
+        self._rows: Dict[str, int] = {}
+        self._free: List[int] = []
+        # Rows below this have been handed out at least once; only they are scanned
+        self._used = 0
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._rows
+
+    def _normalize(self, vectors: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    def _as_matrix(self, embeddings: Sequence[Sequence[float]]) -> np.ndarray:
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        if vectors.ndim == 1:
+            vectors = vectors[None, :]
+        if self.dim is None:
+            self.dim = vectors.shape[1]
+            self._matrix = np.zeros((0, self.dim), dtype=np.float32)
+        if vectors.shape[1] != self.dim:
+            raise ValueError(f"Expected {self.dim}-dimensional embeddings, got {vectors.shape[1]}")
+        return vectors
+
+    def _grow(self, needed: int) -> None:
+        capacity = len(self._matrix)
+        if needed <= capacity:
+            return
+        new_capacity = max(needed, capacity * 2, self._initial_capacity)
+        matrix = np.zeros((new_capacity, self.dim), dtype=np.float32)
+        matrix[:self._used] = self._matrix[:self._used]
+        live = np.zeros(new_capacity, dtype=bool)
+        live[:self._used] = self._live[:self._used]
+        self._matrix, self._live = matrix, live
+        self._row_ids.extend([None] * (new_capacity - capacity))
+
+    def _allocate(self, count: int) -> List[int]:
+        reused = [self._free.pop() for _ in range(min(count, len(self._free)))]
+        fresh = count - len(reused)
+        self._grow(self._used + fresh)
+        rows = reused + list(range(self._used, self._used + fresh))
+        self._used += fresh
+        return rows
+
+    def add_batch(self, doc_ids: Sequence[str], texts: Sequence[str], embeddings: Sequence[Sequence[float]]) -> None:
+        """Insert or replace several documents with one normalization and copy."""
+        if not len(doc_ids):
+            return
+        vectors = self._normalize(self._as_matrix(embeddings))
+        if len(vectors) != len(doc_ids) or len(texts) != len(doc_ids):
+            raise ValueError("doc_ids, texts and embeddings must have the same length")
+        last = {doc_id: i for i, doc_id in enumerate(doc_ids)}
+        if len(last) < len(doc_ids):
+            # The last occurrence of a repeated id wins, as if inserted one by one
+            keep = sorted(last.values())
+            doc_ids, texts, vectors = [doc_ids[i] for i in keep], [texts[i] for i in keep], vectors[keep]
+
+        # Replace an existing document in place; only new ones take a row
+        rows = [self._rows.get(doc_id) for doc_id in doc_ids]
+        new = [i for i, row in enumerate(rows) if row is None]
+        for i, row in zip(new, self._allocate(len(new))):
+            rows[i] = row
+
+        row_index = np.fromiter(rows, dtype=np.int64, count=len(rows))
+        self._matrix[row_index] = vectors
+        self._write_documents(rows, doc_ids, texts)
+        # Marked live last, once the vector and document are in place
+        self._live[row_index] = True
+        for doc_id, row in zip(doc_ids, rows):
+            self._rows[doc_id] = row
+
+        if self.index is not None:
+            if self.index.trained:
+                self.index.add(row_index, vectors)
+            elif len(self) >= self.index.train_size:
+                self.build_index()
+
+    def _write_documents(self, rows: List[int], doc_ids: Sequence[str], texts: Sequence[str]) -> None:
+        for doc_id, text, row in zip(doc_ids, texts, rows):
+            self._row_ids[row] = doc_id
+            self.documents[doc_id] = text
+
+    def _forget_document(self, row: int, doc_id: str) -> None:
+        self.documents.pop(doc_id, None)
+        self._row_ids[row] = None
+
+    def _document(self, row: int) -> Tuple[str, str]:
+        """(doc_id, text) stored in a live row."""
+        doc_id = self._row_ids[row]
+        return doc_id, self.documents[doc_id]
+
+    def build_index(self) -> None:
+        """(Re)train the ANN index on every stored embedding."""
+        if self.index is None or not len(self):
+            return
+        rows = np.flatnonzero(self._live[:self._used])
+        self.index.train(self._matrix[rows])
+        self.index.add(rows, self._matrix[rows])
+
+    def add(self, doc_id: str, text: str, embedding: Sequence[float]) -> None:
+        self.add_batch([doc_id], [text], [embedding])
+
     async def store_embedding(self, doc_id: str, text: str, embedding: List[float]) -> None:
-        self.embeddings[doc_id] = embedding
-        self.documents[doc_id] = text
-    
-    async def similarity_search(self, query_embedding: List[float], top_k: int = 5) -> List[Dict[str, Any]]:
-        # Simple mock similarity search
-        results = []
-        for doc_id, embedding in list(self.embeddings.items())[:top_k]:
-            results.append({
-                "doc_id": doc_id,
-                "text": self.documents[doc_id],
-                "similarity": 0.85  # Mock similarity score
-            })
-        return results
-    
-    def create_mock_embedding(self, text: str) -> List[float]:
-        # Mock embedding generation
-        return [0.1] * 384  # 384-dimensional mock embedding
\ No newline at end of file
+        self.add(doc_id, text, embedding)
+
+    def delete(self, doc_id: str) -> bool:
+        row = self._rows.pop(doc_id, None)
+        if row is None:
+            return False
+        self._live[row] = False
+        self._matrix[row] = 0.0
+        self._forget_document(row, doc_id)
+        self._free.append(row)
+        if self.index is not None:
+            self.index.remove(np.array([row]))
+        return True
+
+    def get_embedding(self, doc_id: str) -> Optional[np.ndarray]:
+        """The stored (normalized) embedding."""
+        row = self._rows.get(doc_id)
+        return None if row is None else self._matrix[row].copy()
+
+    def _top_k(self, scores: np.ndarray, k: int) -> np.ndarray:
+        """Column indices of the ``k`` best scores in each row, best first."""
+        if k < scores.shape[1]:
+            candidates = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        else:
+            candidates = np.broadcast_to(np.arange(scores.shape[1]), scores.shape)
+        order = np.argsort(-np.take_along_axis(scores, candidates, axis=1), axis=1)[:, :k]
+        return np.take_along_axis(candidates, order, axis=1)
+
+    def _hits(self, rows: List[int], scores: List[float]) -> List[Dict[str, Any]]:
+        hits = []
+        for row, score in zip(rows, scores):
+            doc_id, text = self._document(row)
+            hits.append({"doc_id": doc_id, "text": text, "similarity": score})
+        return hits
+
+    def search_batch(self, query_embeddings: Sequence[Sequence[float]], top_k: int = 5,
+                     nprobe: Optional[int] = None) -> List[List[Dict[str, Any]]]:
+        """Top ``top_k`` documents by cosine similarity for each query, best first.
+
+        Exact unless a trained index is set; ``nprobe`` overrides the index's default.
+        """
+        if not len(self) or top_k <= 0 or not len(query_embeddings):
+            return [[] for _ in range(len(query_embeddings))]
+        queries = self._normalize(self._as_matrix(query_embeddings))
+
+        if self.index is not None and self.index.trained:
+            results = []
+            for query in queries:
+                rows = self.index.candidates(query, nprobe)
+                # A reader's index may be a write ahead of its rows
+                rows = rows[rows < self._used]
+                rows = rows[self._live[rows]]
+                if not len(rows):
+                    results.append([])
+                    continue
+                scores = (self._matrix[rows] @ query)[None, :]
+                best = self._top_k(scores, min(top_k, len(rows)))
+                results.append(self._hits(rows[best[0]].tolist(), scores[0, best[0]].tolist()))
+            return results
+
+        scores = queries @ self._matrix[:self._used].T
+        count = len(self)
+        if count < self._used:
+            scores[:, ~self._live[:self._used]] = -np.inf
+        best = self._top_k(scores, min(top_k, count))
+        top_scores = np.take_along_axis(scores, best, axis=1)
+        return [self._hits(rows, row_scores) for rows, row_scores in zip(best.tolist(), top_scores.tolist())]
+
+    async def similarity_search(self, query_embedding: List[float], top_k: int = 5,
+                                nprobe: Optional[int] = None) -> List[Dict[str, Any]]:
+        return self.search_batch([query_embedding], top_k, nprobe)[0]
+
+    def save(self, directory: str) -> None:
+        """Write the embeddings, documents and trained index so ``load`` needs no re-indexing."""
+        os.makedirs(directory, exist_ok=True)
+        live = np.asarray(self._live[:self._used])
+        row_ids: List[Optional[str]] = [None] * self._used
+        documents = {}
+        for row in np.flatnonzero(live).tolist():
+            doc_id, documents[doc_id] = self._document(row)
+            row_ids[row] = doc_id
+        np.save(os.path.join(directory, "vectors.npy"), self._matrix[:self._used])
+        np.save(os.path.join(directory, "live.npy"), live)
+        with open(os.path.join(directory, "documents.json"), "w") as f:
+            json.dump({
+                "dim": self.dim,
+                "row_ids": row_ids,
+                "documents": documents,
+                "free": self._free
+            }, f)
+        if self.index is not None:
+            np.savez(os.path.join(directory, "index.npz"), **self.index.state())
+
+    @classmethod
+    def load(cls, directory: str) -> "VectorMemory":
+        with open(os.path.join(directory, "documents.json"), "r") as f:
+            meta = json.load(f)
+        index_path = os.path.join(directory, "index.npz")
+        index = None
+        if os.path.exists(index_path):
+            with np.load(index_path) as state:
+                index = IVFIndex.from_state(dict(state))
+
+        memory = cls(dim=meta["dim"], index=index)
+        vectors = np.load(os.path.join(directory, "vectors.npy"))
+        memory._grow(len(vectors))
+        memory._used = len(vectors)
+        memory._matrix[:len(vectors)] = vectors
+        memory._live[:len(vectors)] = np.load(os.path.join(directory, "live.npy"))
+        memory._row_ids[:len(vectors)] = meta["row_ids"]
+        memory._rows = {doc_id: row for row, doc_id in enumerate(meta["row_ids"]) if doc_id is not None}
+        memory._free = meta["free"]
+        memory.documents = meta["documents"]
+        return memory
@@ -1,3 +1,6 @@
+from .bm25 import BM25Index
+from .embedder import HashingEmbedder
+from .knowledge_base import KnowledgeBase
 from .retriever import Retriever
 
-__all__ = ["Retriever"]
\ No newline at end of file
+__all__ = ["BM25Index", "HashingEmbedder", "KnowledgeBase", "Retriever"]
@@ -0,0 +1,88 @@
+"""
+BM25 Index
+Inverted index from term to {doc_id: term frequency}, scored with Okapi BM25. A query
+only walks the posting lists of its own terms, so its cost follows how common those
+terms are rather than the number of documents. Documents can be added, replaced and
+removed one at a time.
+"""
+
+from typing import Any, Dict, List, Tuple
+from collections import Counter, defaultdict
+import heapq
+import math
+from operator import itemgetter
+
+from .embedder import tokenize
+
+class BM25Index:
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, Dict[str, int]] = {}
+        self._lengths: Dict[str, int] = {}
+        # Distinct terms of each document, so removing it only touches its own lists
+        self._terms: Dict[str, Tuple[str, ...]] = {}
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return len(self._lengths)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._lengths
+
+    def add(self, doc_id: str, text: str) -> None:
+        """Index ``text`` under ``doc_id``, replacing what was indexed there before."""
+        self.remove(doc_id)
+        terms = Counter(tokenize(text))
+        for term, count in terms.items():
+            self._postings.setdefault(term, {})[doc_id] = count
+        length = sum(terms.values())
+        self._lengths[doc_id] = length
+        self._terms[doc_id] = tuple(terms)
+        self._total_length += length
+
+    def remove(self, doc_id: str) -> bool:
+        length = self._lengths.pop(doc_id, None)
+        if length is None:
+            return False
+        self._total_length -= length
+        for term in self._terms.pop(doc_id):
+            postings = self._postings[term]
+            del postings[doc_id]
+            if not postings:
+                del self._postings[term]
+        return True
+
+    def search(self, query: str, top_k: int = 5) -> List[Tuple[str, float]]:
+        """Up to ``top_k`` (doc_id, score) pairs, best first; only documents sharing a term score."""
+        if not self._lengths or top_k <= 0:
+            return []
+        count = len(self._lengths)
+        average_length = self._total_length / count or 1.0
+        scores: Dict[str, float] = defaultdict(float)
+        for term in set(tokenize(query)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+            for doc_id, frequency in postings.items():
+                norm = self.k1 * (1 - self.b + self.b * self._lengths[doc_id] / average_length)
+                scores[doc_id] += idf * frequency * (self.k1 + 1) / (frequency + norm)
+        return heapq.nlargest(top_k, scores.items(), key=itemgetter(1))
+
+    def state(self) -> Dict[str, Any]:
+        """JSON-serializable contents, restored by ``from_state`` without re-tokenizing."""
+        return {"k1": self.k1, "b": self.b, "postings": self._postings, "lengths": self._lengths}
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> "BM25Index":
+        index = cls(state["k1"], state["b"])
+        index._postings = state["postings"]
+        index._lengths = state["lengths"]
+        index._total_length = sum(index._lengths.values())
+        terms: Dict[str, List[str]] = {doc_id: [] for doc_id in index._lengths}
+        for term, postings in index._postings.items():
+            for doc_id in postings:
+                terms[doc_id].append(term)
+        index._terms = {doc_id: tuple(doc_terms) for doc_id, doc_terms in terms.items()}
+        return index
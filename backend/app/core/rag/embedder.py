@@ -0,0 +1,94 @@
+"""
+Local Embeddings
+Signed feature hashing of words and their character trigrams into a fixed number of
+dimensions, L2-normalized, so texts sharing vocabulary (or word stems, through the
+trigrams) have a positive cosine similarity. Stop words are dropped: in short queries
+they would otherwise dominate the vector.
+
+Needs no model or network. Features are hashed with crc32, which unlike hash() is
+stable across processes, so vectors written to a shared store by one worker match
+queries embedded by another.
+"""
+
+from typing import List, Sequence, Tuple
+import functools
+import re
+import zlib
+import numpy as np
+
+from ...config import settings
+from ..utils.cache import TTLCache
+
+_TOKEN = re.compile(r"\w+")
+STOP_WORDS = frozenset(
+    "a an and are as at be by can do for from how i in is it me my of on or should so "
+    "the this to was what when where which who why will with you your".split()
+)
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased words of ``text`` without stop words."""
+    return [word for word in _TOKEN.findall(text.lower()) if word not in STOP_WORDS]
+
+@functools.lru_cache(maxsize=1 << 16)
+def _word_features(word: str, dim: int) -> Tuple[Tuple[int, ...], Tuple[float, ...]]:
+    """Columns and signed weights of a word and its character trigrams, hashed once per word."""
+    padded = f"<{word}>"
+    grams = ["#" + padded[i:i + 3] for i in range(len(padded) - 2)]
+    # The trigrams together weigh as much as the word itself
+    features = [(word, 1.0)] + [(gram, 1.0 / len(grams)) for gram in grams]
+    columns, weights = [], []
+    for feature, weight in features:
+        digest = zlib.crc32(feature.encode("utf-8"))
+        columns.append(digest % dim)
+        # The sign (top bit) keeps collisions unbiased
+        weights.append(-weight if digest >> 31 else weight)
+    return tuple(columns), tuple(weights)
+
+class HashingEmbedder:
+    def __init__(self, dim: int = 384, cache_size: int = 4096):
+        self.dim = dim
+        self._cache = TTLCache(ttl=float("inf"), maxsize=cache_size, name="embeddings")
+
+    def _embed_uncached(self, texts: Sequence[str]) -> np.ndarray:
+        columns, weights, counts = [], [], []
+        for text in texts:
+            start = len(columns)
+            for word in tokenize(text):
+                word_columns, word_weights = _word_features(word, self.dim)
+                columns.extend(word_columns)
+                weights.extend(word_weights)
+            counts.append(len(columns) - start)
+        # One bincount for the whole batch instead of a scatter per text
+        rows = np.repeat(np.arange(len(texts), dtype=np.int64), counts)
+        cells = rows * self.dim + np.asarray(columns, dtype=np.int64)
+        vectors = np.bincount(cells, weights=np.asarray(weights), minlength=len(texts) * self.dim)
+        vectors = vectors.reshape(len(texts), self.dim).astype(np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    def embed_batch(self, texts: Sequence[str], cache: bool = True) -> np.ndarray:
+        """Unit vectors for ``texts`` as one (len(texts), dim) float32 matrix. ``cache=False``
+        leaves the cache alone, for bulk indexing from another thread."""
+        if not cache:
+            return self._embed_uncached(texts)
+        vectors = np.empty((len(texts), self.dim), dtype=np.float32)
+        missing = []
+        for i, text in enumerate(texts):
+            cached = self._cache.get(text)
+            if cached is None:
+                missing.append(i)
+            else:
+                vectors[i] = cached
+        if missing:
+            vectors[missing] = self._embed_uncached([texts[i] for i in missing])
+            for i in missing:
+                cached = vectors[i].copy()
+                cached.flags.writeable = False
+                self._cache.set(texts[i], cached)
+        return vectors
+
+    def embed(self, text: str) -> np.ndarray:
+        return self.embed_batch([text])[0]
+
+embedder = HashingEmbedder(settings.EMBEDDING_DIM, settings.EMBEDDING_CACHE_SIZE)
@@ -0,0 +1,228 @@
+"""
+Knowledge Base
+Loads a directory of Markdown and JSON documents into the Retriever's vector and BM25
+indexes. Documents are split into overlapping chunks of about ``chunk_words`` words
+(Markdown at headings first) with ids like ``guides/lisbon.md#3``.
+
+A manifest records each file's modification time and size, so ``refresh()`` only
+re-chunks and re-embeds files that changed and drops chunks of deleted ones. The
+indexes and manifest are saved to ``index_dir`` after every change and loaded on
+startup, so a worker only pays for stat calls on an unchanged corpus.
+
+Each save goes to a new subdirectory of ``index_dir`` that the manifest then points
+at, so workers sharing ``index_dir`` never load half-written indexes. While serving,
+``maybe_refresh()`` scans, chunks, embeds and saves in a thread; only updating the
+in-memory indexes runs on the event loop.
+"""
+
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import asyncio
+import json
+import os
+import re
+import shutil
+import time
+
+from ..memory.vector_memory import VectorMemory
+from ..utils.logger import Logger
+from .bm25 import BM25Index
+from .embedder import embedder
+
+EXTENSIONS = (".md", ".markdown", ".json")
+# Superseded index directories are removed once this old; a worker may still be loading one
+STALE_INDEX_SECONDS = 300
+MANIFEST_FIELDS = frozenset(("mtime_ns", "size", "chunks"))
+_HEADING = re.compile(r"^#{1,6}\s", re.MULTILINE)
+
+def split_words(text: str, chunk_words: int, overlap: int) -> List[str]:
+    words = text.split()
+    if len(words) <= chunk_words:
+        return [" ".join(words)] if words else []
+    step = max(1, chunk_words - overlap)
+    return [" ".join(words[start:start + chunk_words]) for start in range(0, len(words) - overlap, step)]
+
+def chunk_markdown(text: str, chunk_words: int = 200, overlap: int = 40) -> List[str]:
+    """Sections at headings, each split further if longer than ``chunk_words``."""
+    starts = [match.start() for match in _HEADING.finditer(text)]
+    bounds = ([0] if not starts or starts[0] else []) + starts + [len(text)]
+    chunks = []
+    for start, end in zip(bounds, bounds[1:]):
+        chunks.extend(split_words(text[start:end], chunk_words, overlap))
+    return chunks
+
+def chunk_json(data: Any, chunk_words: int = 200, overlap: int = 40) -> List[str]:
+    """A list of entries or a single one; each entry is a string or an object whose
+    title/topic and content/text fields are used, e.g. {"title": "Visas", "content": "..."}."""
+    entries = data if isinstance(data, list) else [data]
+    chunks = []
+    for entry in entries:
+        if isinstance(entry, dict):
+            title = entry.get("title") or entry.get("topic") or ""
+            body = entry.get("content") or entry.get("text") or ""
+            text = f"{title}: {body}" if title and body else title or body
+        else:
+            text = str(entry)
+        chunks.extend(split_words(str(text), chunk_words, overlap))
+    return chunks
+
+class KnowledgeBase:
+    def __init__(self, retriever: Any, directory: str, index_dir: Optional[str] = None,
+                 refresh_interval: float = 0.0, chunk_words: int = 200, overlap: int = 40):
+        self.retriever = retriever
+        self.directory = directory
+        self.index_dir = index_dir
+        self.refresh_interval = refresh_interval
+        self.chunk_words = chunk_words
+        self.overlap = overlap
+        # relative path -> {"mtime_ns", "size", "chunks"}
+        self.manifest: Dict[str, Dict[str, int]] = {}
+        self._last_refresh = 0.0
+        self._refreshing: Optional[asyncio.Task] = None
+        self.logger = Logger("knowledge_base")
+
+    def _files(self) -> Iterator[Tuple[str, os.stat_result]]:
+        for root, _, names in os.walk(self.directory):
+            for name in sorted(names):
+                if name.lower().endswith(EXTENSIONS):
+                    path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        # Deleted since the walk listed it; the next refresh drops its chunks
+                        continue
+                    yield os.path.relpath(path, self.directory).replace(os.sep, "/"), stat
+
+    def _chunk(self, relative_path: str) -> List[str]:
+        with open(os.path.join(self.directory, relative_path), "r", encoding="utf-8") as f:
+            content = f.read()
+        if relative_path.lower().endswith(".json"):
+            return chunk_json(json.loads(content), self.chunk_words, self.overlap)
+        return chunk_markdown(content, self.chunk_words, self.overlap)
+
+    def _settings(self) -> Dict[str, Any]:
+        # Saved indexes built with other settings would not match what refresh() produces
+        return {"chunk_words": self.chunk_words, "overlap": self.overlap, "dim": self.retriever.knowledge_memory.dim}
+
+    def load(self) -> bool:
+        """Restore the saved indexes into the retriever; False when there are none usable."""
+        if not self.index_dir or not os.path.exists(os.path.join(self.index_dir, "manifest.json")):
+            return False
+        try:
+            with open(os.path.join(self.index_dir, "manifest.json"), "r") as f:
+                saved = json.load(f)
+            if saved.get("settings") != self._settings():
+                self.logger.info("Ignoring knowledge index built with other settings", path=self.index_dir)
+                return False
+            files = saved["files"]
+            if not all(MANIFEST_FIELDS <= entry.keys() for entry in files.values()):
+                raise ValueError("manifest entry without " + ", ".join(sorted(MANIFEST_FIELDS)))
+            # Indexes saved before versioned directories sit next to the manifest
+            directory = os.path.join(self.index_dir, saved.get("version", ""))
+            with open(os.path.join(directory, "bm25.json"), "r") as f:
+                knowledge_index = BM25Index.from_state(json.load(f))
+            knowledge_memory = VectorMemory.load(os.path.join(directory, "vectors"))
+        except (OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+            # A manifest that is not the shape save() writes is as unusable as a missing one
+            self.logger.warning("Ignoring unreadable knowledge index %s: %s", self.index_dir, e)
+            return False
+        self.retriever.knowledge_index = knowledge_index
+        self.retriever.knowledge_memory = knowledge_memory
+        self.manifest = files
+        return True
+
+    def save(self) -> None:
+        if not self.index_dir:
+            return
+        version = f"v{time.time_ns()}-{os.getpid()}"
+        directory = os.path.join(self.index_dir, version)
+        os.makedirs(directory)
+        self.retriever.knowledge_memory.save(os.path.join(directory, "vectors"))
+        with open(os.path.join(directory, "bm25.json"), "w") as f:
+            json.dump(self.retriever.knowledge_index.state(), f)
+        # Swapping the manifest in publishes the new directory in one step
+        manifest_tmp = os.path.join(self.index_dir, f"manifest.json.{version}.tmp")
+        with open(manifest_tmp, "w") as f:
+            json.dump({"settings": self._settings(), "files": self.manifest, "version": version}, f)
+        os.replace(manifest_tmp, os.path.join(self.index_dir, "manifest.json"))
+        self._remove_stale(version)
+
+    def _remove_stale(self, current: str) -> None:
+        cutoff = time.time() - STALE_INDEX_SECONDS
+        for entry in os.scandir(self.index_dir):
+            if entry.is_dir() and entry.name.startswith("v") and entry.name != current:
+                try:
+                    if entry.stat().st_mtime < cutoff:
+                        shutil.rmtree(entry.path, ignore_errors=True)
+                except OSError:
+                    pass
+
+    def _scan(self) -> Tuple[List[Tuple[str, os.stat_result, List[str], Any]], List[str]]:
+        """Chunks and embeddings of changed files, and paths of deleted ones. Reads the
+        manifest but changes nothing, so it can run off the event loop."""
+        updates, seen = [], set()
+        for relative_path, stat in self._files():
+            seen.add(relative_path)
+            known = self.manifest.get(relative_path)
+            if known and known["mtime_ns"] == stat.st_mtime_ns and known["size"] == stat.st_size:
+                continue
+            try:
+                chunks = self._chunk(relative_path)
+            except (OSError, ValueError) as e:
+                self.logger.warning("Skipping knowledge file %s: %s", relative_path, e)
+                continue
+            updates.append((relative_path, stat, chunks, embedder.embed_batch(chunks, cache=False)))
+        return updates, [path for path in self.manifest if path not in seen]
+
+    def _apply(self, updates: List[Tuple[str, os.stat_result, List[str], Any]], removed: List[str]) -> Dict[str, int]:
+        changed = {"files": 0, "chunks": 0, "removed": 0}
+        for relative_path, stat, chunks, embeddings in updates:
+            known = self.manifest.get(relative_path)
+            doc_ids = [f"{relative_path}#{n}" for n in range(len(chunks))]
+            self.retriever.add_knowledge(doc_ids, chunks, embeddings)
+            for n in range(len(chunks), known["chunks"] if known else 0):
+                self.retriever.remove_knowledge(f"{relative_path}#{n}")
+            self.manifest[relative_path] = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "chunks": len(chunks)}
+            changed["files"] += 1
+            changed["chunks"] += len(chunks)
+
+        for relative_path in removed:
+            for n in range(self.manifest.pop(relative_path)["chunks"]):
+                self.retriever.remove_knowledge(f"{relative_path}#{n}")
+            changed["removed"] += 1
+        if changed["files"] or changed["removed"]:
+            self.logger.info("Knowledge base refreshed", **changed)
+        return changed
+
+    def refresh(self) -> Dict[str, int]:
+        """Re-index changed files and drop deleted ones; counts of what changed."""
+        self._last_refresh = time.monotonic()
+        if not os.path.isdir(self.directory):
+            # Keep what is indexed rather than treating every file as deleted
+            self.logger.warning("Knowledge base directory %s not found", self.directory)
+            return {"files": 0, "chunks": 0, "removed": 0}
+        changed = self._apply(*self._scan())
+        if changed["files"] or changed["removed"]:
+            self.save()
+        return changed
+
+    async def _refresh_in_background(self) -> None:
+        try:
+            if not await asyncio.to_thread(os.path.isdir, self.directory):
+                self.logger.warning("Knowledge base directory %s not found", self.directory)
+                return
+            changed = self._apply(*await asyncio.to_thread(self._scan))
+            if changed["files"] or changed["removed"]:
+                await asyncio.to_thread(self.save)
+        except Exception as e:
+            self.logger.error("Knowledge base refresh failed: %s", e)
+
+    def maybe_refresh(self) -> Optional[asyncio.Task]:
+        """Start a background refresh when ``refresh_interval`` seconds have passed since
+        the last one (0 never) and none is running; the task, if one was started."""
+        if not self.refresh_interval or (self._refreshing and not self._refreshing.done()):
+            return None
+        if time.monotonic() - self._last_refresh < self.refresh_interval:
+            return None
+        self._last_refresh = time.monotonic()
+        self._refreshing = asyncio.get_running_loop().create_task(self._refresh_in_background())
+        return self._refreshing
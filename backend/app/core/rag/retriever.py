@@ -1,20 +1,85 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Sequence, Tuple
+from operator import itemgetter
+import numpy as np
+from ...config import settings
+from ..memory.mapped_memory import MappedVectorMemory
 from ..memory.vector_memory import VectorMemory
+from .bm25 import BM25Index
+from .embedder import embedder
+from .knowledge_base import KnowledgeBase
+
+def open_vector_memory() -> VectorMemory:
+    if settings.VECTOR_STORE_DIR:
+        return MappedVectorMemory(settings.VECTOR_STORE_DIR, readonly=settings.VECTOR_STORE_READONLY)
+    return VectorMemory()
+
+# Reciprocal rank fusion constant: damps the difference between the first few ranks
+RRF_K = 60
 
 class Retriever:
-    def __init__(self):
-        self.vector_memory = VectorMemory()
-        self.knowledge_base = self._load_knowledge_base()
+    def __init__(self, min_similarity: float = 0.15):
+        self.vector_memory = open_vector_memory()
+        self.min_similarity = min_similarity
+        # Small and fixed, so indexed once in process: by embedding and by terms
+        self.knowledge_memory = VectorMemory(dim=embedder.dim)
+        self.knowledge_index = BM25Index()
+        self.knowledge: Optional[KnowledgeBase] = None
+        if settings.KNOWLEDGE_BASE_DIR:
+            self.knowledge = KnowledgeBase(
+                self, settings.KNOWLEDGE_BASE_DIR, settings.KNOWLEDGE_INDEX_DIR, settings.KNOWLEDGE_REFRESH_SECONDS
+            )
+            self.knowledge.load()
+            self.knowledge.refresh()
+        else:
+            builtin = self._load_knowledge_base()
+            self.add_knowledge([item["topic"] for item in builtin], [item["content"] for item in builtin])
+    
+    def add_knowledge(self, doc_ids: Sequence[str], texts: Sequence[str], embeddings: Optional[np.ndarray] = None) -> None:
+        """Index (or re-index) knowledge-base documents for both vector and BM25 search;
+        ``embeddings`` skips embedding texts that were embedded already."""
+        if embeddings is None:
+            embeddings = embedder.embed_batch(texts)
+        self.knowledge_memory.add_batch(doc_ids, texts, embeddings)
+        for doc_id, text in zip(doc_ids, texts):
+            self.knowledge_index.add(doc_id, text)
+    
+    def remove_knowledge(self, doc_id: str) -> bool:
+        self.knowledge_index.remove(doc_id)
+        return self.knowledge_memory.delete(doc_id)
     
     async def retrieve_relevant_info(self, query: str, top_k: int = 3) -> List[Dict[str, Any]]:
-        query_embedding = self.vector_memory.create_mock_embedding(query)
-        results = await self.vector_memory.similarity_search(query_embedding, top_k)
-        
-        # Add knowledge base results
-        kb_results = self._search_knowledge_base(query)
-        results.extend(kb_results)
-        
-        return results[:top_k]
+        if self.knowledge:
+            self.knowledge.maybe_refresh()
+        query_embedding = embedder.embed(query)
+        # Deeper candidate lists than top_k give fusion something to reorder
+        depth = top_k * 4
+        vector_hits = await self.vector_memory.similarity_search(query_embedding, depth)
+        vector_hits.extend(await self.knowledge_memory.similarity_search(query_embedding, depth))
+        # Hashed vectors of unrelated texts still score slightly above zero
+        vector_hits = [hit for hit in vector_hits if hit["similarity"] >= self.min_similarity]
+        vector_hits.sort(key=itemgetter("similarity"), reverse=True)
+        lexical_hits = self.knowledge_index.search(query, depth)
+        return self._fuse(vector_hits, lexical_hits, query_embedding)[:top_k]
+    
+    def _fuse(self, vector_hits: List[Dict[str, Any]], lexical_hits: List[Tuple[str, float]],
+              query_embedding: np.ndarray) -> List[Dict[str, Any]]:
+        """Reciprocal rank fusion: each ranking adds 1 / (RRF_K + rank) to a document's score."""
+        results: Dict[str, Dict[str, Any]] = {}
+        for rank, hit in enumerate(vector_hits, 1):
+            results.setdefault(hit["doc_id"], {**hit, "bm25": 0.0, "score": 1 / (RRF_K + rank)})
+        for rank, (doc_id, bm25) in enumerate(lexical_hits, 1):
+            result = results.get(doc_id)
+            if result is None:
+                similarity = float(self.knowledge_memory.get_embedding(doc_id) @ query_embedding)
+                result = results[doc_id] = {
+                    "doc_id": doc_id,
+                    "text": self.knowledge_memory.documents[doc_id],
+                    "similarity": similarity,
+                    "score": 0.0
+                }
+            result["bm25"] = bm25
+            result["score"] += 1 / (RRF_K + rank)
+        return sorted(results.values(), key=itemgetter("score"), reverse=True)
     
     def _load_knowledge_base(self) -> List[Dict[str, Any]]:
         return [
@@ -22,15 +87,3 @@ class Retriever:
             {"topic": "packing", "content": "Pack light and bring essentials only"},
             {"topic": "safety", "content": "Always inform someone about your travel plans"}
         ]
-    
-    def _search_knowledge_base(self, query: str) -> List[Dict[str, Any]]:
-        # Simple keyword matching
-        results = []
-        for item in self.knowledge_base:
-            if any(word.lower() in item["content"].lower() for word in query.split()):
-                results.append({
-                    "doc_id": item["topic"],
-                    "text": item["content"],
-                    "similarity": 0.8
-                })
-        return results
\ No newline at end of file
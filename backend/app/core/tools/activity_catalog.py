@@ -0,0 +1,123 @@
+"""
+Activity Catalog
+Templates for the local itinerary generator, compiled once at import. Each
+description is stored as the literal text around the destination name, so a plan
+is built by joining those parts - no dictionaries or format strings per call.
+
+This is the path every itinerary takes while the LLM is degraded, so it has to
+stay cheap: see benchmarks/itinerary_bench.py.
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+THEMES: Tuple[str, ...] = (
+    "arrival and orientation", "cultural immersion", "adventure and nature",
+    "local experiences", "hidden gems", "relaxation and wellness",
+    "shopping and markets", "historical exploration", "culinary journey", "farewell activities"
+)
+TIMES_OF_DAY: Tuple[str, ...] = ("morning", "afternoon", "evening")
+
+_DESCRIPTIONS: Dict[str, Dict[str, str]] = {
+    "morning": {
+        "arrival and orientation": "Arrive in {destination}, check-in, and explore the city center",
+        "cultural immersion": "Visit {destination}'s main museums and cultural sites",
+        "adventure and nature": "Early morning hike or nature walk in {destination}",
+        "local experiences": "Join a local morning market tour in {destination}",
+        "hidden gems": "Discover lesser-known attractions in {destination}",
+        "relaxation and wellness": "Morning yoga or spa session in {destination}",
+        "shopping and markets": "Explore traditional markets and local crafts in {destination}",
+        "historical exploration": "Tour historical landmarks and monuments in {destination}",
+        "culinary journey": "Food walking tour and cooking class in {destination}",
+        "farewell activities": "Final sightseeing and souvenir shopping in {destination}"
+    },
+    "afternoon": {
+        "arrival and orientation": "Walking tour of {destination}'s main attractions",
+        "cultural immersion": "Explore traditional neighborhoods in {destination}",
+        "adventure and nature": "Outdoor adventure activities around {destination}",
+        "local experiences": "Hands-on cultural workshop in {destination}",
+        "hidden gems": "Visit off-the-beaten-path locations in {destination}",
+        "relaxation and wellness": "Leisure time at parks or wellness centers in {destination}",
+        "shopping and markets": "Shopping districts and local boutiques in {destination}",
+        "historical exploration": "Deep dive into {destination}'s historical sites",
+        "culinary journey": "Restaurant hopping and local food tasting in {destination}",
+        "farewell activities": "Last-minute exploration and photo opportunities in {destination}"
+    },
+    "evening": {
+        "arrival and orientation": "Welcome dinner at a traditional restaurant in {destination}",
+        "cultural immersion": "Traditional cultural show or performance in {destination}",
+        "adventure and nature": "Sunset viewing and evening nature activities in {destination}",
+        "local experiences": "Evening with local families or community events in {destination}",
+        "hidden gems": "Discover {destination}'s secret evening spots",
+        "relaxation and wellness": "Evening relaxation and wellness activities in {destination}",
+        "shopping and markets": "Night markets and evening shopping in {destination}",
+        "historical exploration": "Evening historical walking tour in {destination}",
+        "culinary journey": "Fine dining experience featuring {destination}'s cuisine",
+        "farewell activities": "Farewell dinner and departure preparations in {destination}"
+    }
+}
+
+# (interest, time_of_day) -> kind of activity
+ACTIVITY_TYPES: Dict[Tuple[str, str], str] = {
+    ("culture", "morning"): "museums and historic sites",
+    ("adventure", "morning"): "outdoor adventures",
+    ("food", "morning"): "local breakfast spots",
+    ("nature", "morning"): "parks and gardens",
+    ("shopping", "morning"): "morning markets",
+    ("culture", "afternoon"): "cultural districts",
+    ("adventure", "afternoon"): "adventure activities",
+    ("food", "afternoon"): "food tours",
+    ("nature", "afternoon"): "scenic viewpoints",
+    ("shopping", "afternoon"): "shopping areas",
+    ("culture", "evening"): "cultural performances",
+    ("adventure", "evening"): "sunset activities",
+    ("food", "evening"): "dining experiences",
+    ("nature", "evening"): "evening walks",
+    ("shopping", "evening"): "night markets"
+}
+
+# (time_of_day, theme) -> text before and after each occurrence of the destination
+_COMPILED: Dict[Tuple[str, str], Tuple[str, ...]] = {
+    (time_of_day, theme): tuple(template.split("{destination}"))
+    for time_of_day, templates in _DESCRIPTIONS.items()
+    for theme, template in templates.items()
+}
+
+# One (morning, afternoon, evening) row per theme, in the order days use them
+_DAYS: Tuple[Tuple[Tuple[str, ...], ...], ...] = tuple(
+    tuple(_COMPILED[time_of_day, theme] for time_of_day in TIMES_OF_DAY) for theme in THEMES
+)
+
+
+def describe_activity(destination: str, time_of_day: str, theme: str) -> str:
+    parts = _COMPILED.get((time_of_day, theme))
+    if parts is None:
+        return f"{time_of_day.title()} activities in {destination}"
+    return str(destination).join(parts)
+
+
+def activity_type(interests: Optional[List[str]], time_of_day: str) -> str:
+    """Kind of activity for the first interest the catalog knows at this time of day."""
+    if not interests:
+        return "main attractions"
+    for interest in interests:
+        found = ACTIVITY_TYPES.get((interest, time_of_day))
+        if found:
+            return found
+    return "local attractions"
+
+
+def build_daily_plan(destination: str, duration: int) -> List[Dict[str, Any]]:
+    """One entry per day; days past the last theme repeat it."""
+    destination = str(destination)
+    last = len(_DAYS) - 1
+    plan = []
+    for day in range(1, duration + 1):
+        morning, afternoon, evening = _DAYS[day - 1 if day <= last else last]
+        plan.append({
+            "day": day,
+            "morning": destination.join(morning),
+            "afternoon": destination.join(afternoon),
+            "evening": destination.join(evening),
+            "estimated_cost": 80 + day * 20
+        })
+    return plan
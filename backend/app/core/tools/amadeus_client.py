@@ -0,0 +1,182 @@
+"""
+Amadeus API Client
+OAuth token caching and flight-offers search against the Amadeus self-service API.
+"""
+
+from typing import Dict, Any, List, Optional, Tuple
+import aiohttp
+import asyncio
+import re
+import time
+from .hotel_config import HOTEL_CONFIG, get_environment_config
+
+class AmadeusAuthError(Exception):
+    """Raised when the Amadeus token endpoint rejects the credentials."""
+
+class AmadeusTokenCache:
+    """Caches one client-credentials token and refreshes it before it expires.
+
+    The refresh starts ``refresh_buffer`` seconds ahead of expiry and runs under a
+    lock, so concurrent callers share a single token request. While a refresh is in
+    flight, callers holding a still-valid token keep using it instead of waiting.
+    """
+
+    def __init__(self, client_id: str, client_secret: str, token_url: str,
+                 refresh_buffer: int = HOTEL_CONFIG.TOKEN_REFRESH_BUFFER):
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.token_url = token_url
+        self.refresh_buffer = refresh_buffer
+        self.refresh_count = 0
+        self._token: Optional[str] = None
+        self._expires_at = 0.0
+        self._lock = asyncio.Lock()
+
+    def _is_fresh(self) -> bool:
+        return self._token is not None and time.monotonic() < self._expires_at - self.refresh_buffer
+
+    def _is_valid(self) -> bool:
+        return self._token is not None and time.monotonic() < self._expires_at
+
+    async def get_token(self, session: aiohttp.ClientSession) -> str:
+        """Return a usable access token, requesting a new one only when needed."""
+        if self._is_fresh():
+            return self._token
+        if self._is_valid() and self._lock.locked():
+            return self._token
+
+        async with self._lock:
+            if self._is_fresh():
+                return self._token
+            await self._refresh(session)
+            return self._token
+
+    def invalidate(self) -> None:
+        """Drop the cached token, e.g. after the API answered 401."""
+        self._token = None
+        self._expires_at = 0.0
+
+    async def _refresh(self, session: aiohttp.ClientSession) -> None:
+        data = {
+            "grant_type": "client_credentials",
+            "client_id": self.client_id,
+            "client_secret": self.client_secret
+        }
+        timeout = aiohttp.ClientTimeout(total=HOTEL_CONFIG.REQUEST_TIMEOUT)
+        async with session.post(self.token_url, data=data, timeout=timeout) as response:
+            if response.status != 200:
+                error_text = await response.text()
+                raise AmadeusAuthError(f"{HOTEL_CONFIG.ERROR_MESSAGES['AUTH_FAILED']} {response.status} - {error_text}")
+            payload = await response.json()
+
+        self._token = payload["access_token"]
+        self._expires_at = time.monotonic() + float(payload.get("expires_in", 1799))
+        self.refresh_count += 1
+
+# One token cache per credential pair, shared by every client in the process
+_token_caches: Dict[Tuple[str, str], AmadeusTokenCache] = {}
+
+def get_token_cache(client_id: str, client_secret: str, token_url: str) -> AmadeusTokenCache:
+    """Return the process-wide token cache for these credentials."""
+    key = (client_id, token_url)
+    cache = _token_caches.get(key)
+    if cache is None or cache.client_secret != client_secret:
+        cache = AmadeusTokenCache(client_id, client_secret, token_url)
+        _token_caches[key] = cache
+    return cache
+
+def _parse_duration(iso_duration: str) -> str:
+    """Turn an ISO-8601 duration such as PT6H30M into "6h 30m"."""
+    match = re.match(r"P(?:(\d+)D)?T?(?:(\d+)H)?(?:(\d+)M)?", iso_duration or "")
+    if not match:
+        return ""
+    days, hours, minutes = (int(value or 0) for value in match.groups())
+    return f"{days * 24 + hours}h {minutes}m"
+
+class AmadeusFlightClient:
+    """Async client for the Amadeus flight-offers search endpoint."""
+
+    def __init__(self, client_id: str, client_secret: str, base_url: str = None,
+                 token_url: str = None, is_production: bool = False):
+        environment = get_environment_config(is_production)
+        # Flight offers live under /v2 while the shared config points at /v1
+        self.base_url = (base_url or environment['base_url'].rsplit('/v1', 1)[0]).rstrip('/')
+        self.token_cache = get_token_cache(client_id, client_secret, token_url or environment['token_url'])
+
+    async def search_offers(self, origin: str, destination: str, departure_date: str,
+                            adults: int = 1, max_results: int = 5, currency: str = "USD",
+                            session: aiohttp.ClientSession = None) -> List[Dict[str, Any]]:
+        """Search flight offers and return them in FlightTool's flight format."""
+        params = {
+            "originLocationCode": origin,
+            "destinationLocationCode": destination,
+            "departureDate": departure_date,
+            "adults": adults,
+            "max": max_results,
+            "currencyCode": currency
+        }
+        if session is None:
+            async with aiohttp.ClientSession() as own_session:
+                return await self._search(own_session, params)
+        return await self._search(session, params)
+
+    async def _search(self, session: aiohttp.ClientSession, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        url = f"{self.base_url}/v2/shopping/flight-offers"
+        timeout = aiohttp.ClientTimeout(total=HOTEL_CONFIG.REQUEST_TIMEOUT)
+
+        for attempt in range(2):
+            token = await self.token_cache.get_token(session)
+            headers = {"Authorization": f"Bearer {token}"}
+            async with session.get(url, headers=headers, params=params, timeout=timeout) as response:
+                if response.status == 401 and attempt == 0:
+                    # Token revoked or expired early; fetch a new one and retry once
+                    self.token_cache.invalidate()
+                    continue
+                if response.status == 429:
+                    raise Exception(f"Rate limit: 429 - {HOTEL_CONFIG.ERROR_MESSAGES['RATE_LIMIT']}")
+                if response.status != 200:
+                    error_text = await response.text()
+                    raise Exception(f"Flight API error: {response.status} - {error_text}")
+                payload = await response.json()
+                return self._format_offers(payload)
+        raise AmadeusAuthError(HOTEL_CONFIG.ERROR_MESSAGES['AUTH_FAILED'])
+
+    def _format_offers(self, payload: Dict[str, Any]) -> List[Dict[str, Any]]:
+        dictionaries = payload.get("dictionaries", {})
+        carriers = dictionaries.get("carriers", {})
+        aircraft = dictionaries.get("aircraft", {})
+        flights = []
+
+        for offer in payload.get("data", []):
+            try:
+                itinerary = offer["itineraries"][0]
+                segments = itinerary["segments"]
+                first, last = segments[0], segments[-1]
+                carrier = first["carrierCode"]
+                cabin = (offer.get("travelerPricings") or [{}])[0].get("fareDetailsBySegment", [{}])[0].get("cabin", "ECONOMY")
+
+                flight = {
+                    "id": str(offer.get("id", "")),
+                    "airline": carriers.get(carrier, carrier).title(),
+                    "flight_number": f"{carrier}{first.get('number', '')}",
+                    "price": float(offer["price"]["grandTotal"]),
+                    "currency": offer["price"].get("currency", "USD"),
+                    "origin": first["departure"]["iataCode"],
+                    "destination": last["arrival"]["iataCode"],
+                    "departure_date": first["departure"]["at"][:10],
+                    "departure": first["departure"]["at"][11:16],
+                    "arrival": last["arrival"]["at"][11:16],
+                    "duration": _parse_duration(itinerary.get("duration", "")),
+                    "stops": len(segments) - 1,
+                    "aircraft": aircraft.get(first.get("aircraft", {}).get("code", ""), ""),
+                    "booking_class": cabin.replace("_", " ").title(),
+                    "seats_available": offer.get("numberOfBookableSeats"),
+                    "api_source": "Amadeus API"
+                }
+                if len(segments) > 1:
+                    flight["stopover"] = ", ".join(s["arrival"]["iataCode"] for s in segments[:-1])
+                flights.append(flight)
+            except (KeyError, IndexError, TypeError, ValueError):
+                continue  # Skip malformed offers
+
+        return flights
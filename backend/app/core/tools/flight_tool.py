@@ -1,75 +1,162 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 import aiohttp
-import os
+import asyncio
+from datetime import datetime, timedelta
 from dotenv import load_dotenv
+from ...config import settings, upstream_url, upstream_key
+from .amadeus_client import AmadeusFlightClient
+from .hotel_config import HOTEL_CONFIG, MAJOR_CITY_CODES
+from ..utils.cache import TTLCache
+from ..utils.logger import Logger
+from ..utils.metrics import track_upstream
+from ..utils.rate_limiter import RateLimiter
 
 load_dotenv()
 
+# Shared across FlightTool instances: the quota belongs to the Amadeus credentials, and
+# cached cells let overlapping flexible searches from different users reuse each other
+_amadeus_rate_limiter = RateLimiter(
+    HOTEL_CONFIG.MAX_REQUESTS_PER_MINUTE,
+    period=60.0,
+    max_concurrency=HOTEL_CONFIG.MAX_CONCURRENT_REQUESTS
+)
+_flight_cell_cache = TTLCache(settings.FLIGHT_CACHE_TTL, maxsize=2048, name="flight_cells")
+
+def resolve_location_code(location: str) -> Optional[str]:
+    """Map a city name or IATA code onto the code Amadeus expects."""
+    location = (location or "").strip()
+    if len(location) == 3 and location.isalpha():
+        return location.upper()
+    return MAJOR_CITY_CODES.get(location.lower())
+
+def parse_departure_date(value: Optional[str]) -> Optional[datetime]:
+    """A YYYY-MM-DD date (a time part is ignored), or None if ``value`` is not one."""
+    try:
+        return datetime.strptime(str(value)[:10], '%Y-%m-%d')
+    except ValueError:
+        return None
+
 class FlightTool:
     def __init__(self):
-        self.api_key = os.getenv("FLIGHTS_API_KEY")
-        self.base_url = "https://test.api.amadeus.com/v2"
+        self.logger = Logger("flight_tool")
+        self.api_key = upstream_key("FLIGHTS_API_KEY")
+        self.api_secret = upstream_key("FLIGHTS_API_SECRET")
+        self.base_url = upstream_url("amadeus", "https://test.api.amadeus.com")
+        self.client = AmadeusFlightClient(
+            self.api_key, self.api_secret, base_url=self.base_url,
+            token_url=upstream_url("amadeus", HOTEL_CONFIG.TOKEN_URL)
+        ) if self.api_key and self.api_secret else None
     
-    async def search_flights(self, destination: str, origin: str = "NYC", departure_date: str = None) -> List[Dict[str, Any]]:
+    async def search_flights(self, destination: str, origin: str = "NYC", departure_date: str = None,
+                             adults: int = 1) -> List[Dict[str, Any]]:
         try:
-            if not self.api_key:
-                return self._get_mock_flights(destination)
+            origin_code = resolve_location_code(origin)
+            destination_code = resolve_location_code(destination)
+            if not self.client or not origin_code or not destination_code:
+                with track_upstream("amadeus", "mock"):
+                    return self._get_mock_flights(destination)
+            
+            if not departure_date:
+                departure_date = (datetime.now() + timedelta(days=7)).strftime('%Y-%m-%d')
             
-            # Enhanced flight data with real API structure
             async with aiohttp.ClientSession() as session:
-                # Simulate Amadeus API call structure
-                flights_data = [
-                    {
-                        "airline": "American Airlines",
-                        "flight_number": "AA1234",
-                        "price": 520,
-                        "departure": "09:15",
-                        "arrival": "15:45",
-                        "duration": "6h 30m",
-                        "stops": 0,
-                        "aircraft": "Boeing 777",
-                        "booking_class": "Economy",
-                        "baggage": "1 checked bag included",
-                        "cancellation": "Free cancellation within 24h",
-                        "seat_selection": "Available for $25",
-                        "meal": "Complimentary meal service"
-                    },
-                    {
-                        "airline": "Delta Airlines",
-                        "flight_number": "DL5678",
-                        "price": 485,
-                        "departure": "14:20",
-                        "arrival": "21:50",
-                        "duration": "7h 30m",
-                        "stops": 1,
-                        "stopover": "Atlanta (ATL) - 1h 15m",
-                        "aircraft": "Airbus A330",
-                        "booking_class": "Economy",
-                        "baggage": "1 carry-on + 1 checked bag",
-                        "wifi": "Free WiFi available",
-                        "entertainment": "Personal seatback screens"
-                    },
-                    {
-                        "airline": "United Airlines",
-                        "flight_number": "UA9012",
-                        "price": 610,
-                        "departure": "07:30",
-                        "arrival": "13:15",
-                        "duration": "5h 45m",
-                        "stops": 0,
-                        "aircraft": "Boeing 787 Dreamliner",
-                        "booking_class": "Business",
-                        "baggage": "2 checked bags included",
-                        "lounge_access": "United Club access included",
-                        "seat": "Lie-flat seats",
-                        "meal": "Premium dining service"
-                    }
-                ]
-                
-                return flights_data
+                flights = await self._search_cell(session, origin_code, destination_code, departure_date, adults)
+            if not flights:
+                return self._get_mock_flights(destination)
+            
+            return sorted(flights, key=lambda flight: flight["price"])
         except Exception as e:
             return self._get_mock_flights(destination)
     
+    async def search_flights_flexible(self, destination: str, origins: List[str], departure_date: str = None,
+                                      flex_days: int = 3, adults: int = 1) -> Dict[str, Any]:
+        """Search every origin x date in a +/- ``flex_days`` window and find the cheapest option.
+        
+        Cells run concurrently under the shared Amadeus rate limit and are cached one by
+        one, so grids that overlap with an earlier search only fetch the missing cells.
+        """
+        flex_days = max(0, min(flex_days, settings.FLIGHT_FLEX_MAX_DAYS))
+        origin_codes = []
+        for origin in origins or ["NYC"]:
+            code = resolve_location_code(origin)
+            if code and code not in origin_codes:
+                origin_codes.append(code)
+        origin_codes = origin_codes[:settings.FLIGHT_MAX_ORIGINS]
+        destination_code = resolve_location_code(destination)
+        
+        center = parse_departure_date(departure_date) if departure_date else None
+        if departure_date and center is None:
+            self.logger.warning("Ignoring malformed departure date %r", departure_date)
+        center = center or datetime.now() + timedelta(days=7)
+        today = datetime.now().strftime('%Y-%m-%d')
+        dates = [
+            day for day in (
+                (center + timedelta(days=offset)).strftime('%Y-%m-%d') for offset in range(-flex_days, flex_days + 1)
+            ) if day >= today
+        ]
+        
+        cells = [(origin, day) for origin in origin_codes for day in dates]
+        cached_cells = sum((origin, destination_code, day, adults) in _flight_cell_cache for origin, day in cells)
+        
+        if self.client and destination_code and cells:
+            async with aiohttp.ClientSession() as session:
+                outcomes = await asyncio.gather(
+                    *[self._search_cell(session, origin, destination_code, day, adults) for origin, day in cells],
+                    return_exceptions=True
+                )
+            api_source = "Amadeus API"
+        else:
+            outcomes = [self._get_mock_flights(destination) for _ in cells]
+            api_source = "Mock Data"
+        
+        price_matrix = {origin: {day: None for day in dates} for origin in origin_codes}
+        cheapest = None
+        errors = []
+        for (origin, day), outcome in zip(cells, outcomes):
+            if isinstance(outcome, Exception):
+                errors.append({"origin": origin, "departure_date": day, "error": str(outcome)})
+                continue
+            if not outcome:
+                continue
+            best = min(outcome, key=lambda flight: flight["price"])
+            price_matrix[origin][day] = best["price"]
+            if cheapest is None or best["price"] < cheapest["price"]:
+                cheapest = {"origin": origin, "departure_date": day, "price": best["price"],
+                            "flight": best, "flights": sorted(outcome, key=lambda flight: flight["price"])}
+        
+        return {
+            "destination": destination_code or destination,
+            # Flights of the cheapest cell, or placeholders when no cell had any
+            "flights": cheapest["flights"] if cheapest else self._get_mock_flights(destination),
+            "origins": origin_codes,
+            "dates": dates,
+            "price_matrix": price_matrix,
+            "cheapest": cheapest,
+            "cells_searched": len(cells),
+            "cells_from_cache": cached_cells,
+            "errors": errors,
+            "api_source": api_source
+        }
+    
+    async def _search_cell(self, session: aiohttp.ClientSession, origin: str, destination: str,
+                           departure_date: str, adults: int) -> List[Dict[str, Any]]:
+        """Search one origin/date cell through the shared cache."""
+        async def load() -> List[Dict[str, Any]]:
+            async with _amadeus_rate_limiter:
+                return await self.client.search_offers(
+                    origin=origin,
+                    destination=destination,
+                    departure_date=departure_date,
+                    adults=adults,
+                    session=session
+                )
+        
+        key = (origin, destination, departure_date, adults)
+        with track_upstream("amadeus") as call:
+            if key in _flight_cell_cache:
+                call.outcome = "cached"
+            return await _flight_cell_cache.get_or_load(key, load)
+    
     def _get_mock_flights(self, destination: str) -> List[Dict[str, Any]]:
         return [
             {
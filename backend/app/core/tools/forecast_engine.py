@@ -0,0 +1,100 @@
+"""
+Forecast Engine
+Parses an OpenWeatherMap 3-hourly forecast once into compact arrays and aggregates
+it per day, so each request only slices out the days covering the trip.
+"""
+
+from typing import Dict, Any, List, Optional
+import numpy as np
+
+class ForecastSeries:
+    """Columnar 3-hourly forecast with precomputed daily aggregates."""
+
+    def __init__(self, forecast_list: List[Dict[str, Any]], temp_unit: str = "°C", speed_unit: str = "m/s"):
+        self.temp_unit = temp_unit
+        self.speed_unit = speed_unit
+        count = len(forecast_list)
+        self.timestamps: List[str] = []
+        self.descriptions: List[str] = []
+        self.conditions: List[str] = []
+        self.dates = np.empty(count, dtype="datetime64[D]")
+        self.temp = np.empty(count, dtype=np.float32)
+        self.humidity = np.empty(count, dtype=np.float32)
+        self.wind = np.empty(count, dtype=np.float32)
+        self.condition_codes = np.empty(count, dtype=np.int16)
+
+        condition_lookup: Dict[str, int] = {}
+        for row, item in enumerate(forecast_list):
+            condition = item["weather"][0]["main"]
+            code = condition_lookup.setdefault(condition, len(condition_lookup))
+            if code == len(self.conditions):
+                self.conditions.append(condition)
+            self.timestamps.append(item["dt_txt"])
+            self.descriptions.append(item["weather"][0]["description"].title())
+            self.dates[row] = item["dt_txt"][:10]
+            self.temp[row] = item["main"]["temp"]
+            self.humidity[row] = item["main"]["humidity"]
+            self.wind[row] = item["wind"]["speed"]
+            self.condition_codes[row] = code
+
+        self.days, self.daily = self._aggregate()
+
+    def _aggregate(self):
+        """Daily high/low/dominant condition/means in one pass over the arrays."""
+        if len(self.dates) == 0:
+            return np.empty(0, dtype="datetime64[D]"), []
+
+        # The upstream list is chronological, so each day is a contiguous run
+        starts = np.flatnonzero(np.r_[True, self.dates[1:] != self.dates[:-1]])
+        counts = np.diff(np.r_[starts, len(self.dates)])
+        day_of_row = np.repeat(np.arange(len(starts)), counts)
+
+        highs = np.maximum.reduceat(self.temp, starts)
+        lows = np.minimum.reduceat(self.temp, starts)
+        humidity = np.add.reduceat(self.humidity, starts) / counts
+        wind = np.add.reduceat(self.wind, starts) / counts
+        condition_counts = np.zeros((len(starts), len(self.conditions)), dtype=np.int32)
+        np.add.at(condition_counts, (day_of_row, self.condition_codes), 1)
+        dominant = condition_counts.argmax(axis=1)
+
+        daily = [
+            {
+                "date": str(self.dates[start]),
+                "high_temp": f"{round(float(highs[day]))}{self.temp_unit}",
+                "low_temp": f"{round(float(lows[day]))}{self.temp_unit}",
+                "condition": self.conditions[dominant[day]],
+                "avg_humidity": f"{round(float(humidity[day]))}%",
+                "avg_wind": f"{round(float(wind[day]), 1)} {self.speed_unit}"
+            }
+            for day, start in enumerate(starts)
+        ]
+        return self.dates[starts], daily
+
+    def _window(self, dates: np.ndarray, start_date: Optional[str], end_date: Optional[str]) -> np.ndarray:
+        selected = np.ones(len(dates), dtype=bool)
+        if start_date:
+            selected &= dates >= np.datetime64(start_date[:10], "D")
+        if end_date:
+            selected &= dates <= np.datetime64(end_date[:10], "D")
+        return np.flatnonzero(selected)
+
+    def daily_forecast(self, start_date: str = None, end_date: str = None, limit: int = 5) -> List[Dict[str, Any]]:
+        """Daily summaries, restricted to ``start_date``..``end_date`` when given."""
+        rows = self._window(self.days, start_date, end_date)[:limit]
+        return [self.daily[row] for row in rows]
+
+    def entries(self, start_date: str = None, end_date: str = None, limit: int = 8) -> List[Dict[str, Any]]:
+        """3-hourly entries, restricted to ``start_date``..``end_date`` when given."""
+        rows = self._window(self.dates, start_date, end_date)[:limit]
+        return [
+            {
+                "date": self.timestamps[row][:10],
+                "time": self.timestamps[row][11:],
+                "temp": f"{round(float(self.temp[row]))}{self.temp_unit}",
+                "condition": self.conditions[self.condition_codes[row]],
+                "description": self.descriptions[row],
+                "humidity": f"{round(float(self.humidity[row]))}%",
+                "wind_speed": f"{round(float(self.wind[row]), 2):g} {self.speed_unit}"
+            }
+            for row in rows
+        ]
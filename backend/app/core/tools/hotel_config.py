@@ -4,7 +4,7 @@ Professional configuration management for Amadeus Hotels API integration.
 """
 
 from typing import Dict, List
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 @dataclass
 class HotelAPIConfig:
@@ -23,6 +23,8 @@ class HotelAPIConfig:
     # Search Parameters
     DEFAULT_RESULTS_LIMIT: int = 20
     MAX_RESULTS_LIMIT: int = 50
+    MAX_SEARCH_PAGES: int = 5
+    MAX_CONCURRENT_REQUESTS: int = 5
     DEFAULT_ADULTS: int = 2
     DEFAULT_ROOMS: int = 1
     
@@ -31,23 +33,23 @@ class HotelAPIConfig:
     TOKEN_REFRESH_BUFFER: int = 60  # Refresh token 60 seconds before expiry
     
     # Supported Currencies
-    SUPPORTED_CURRENCIES: List[str] = [
+    SUPPORTED_CURRENCIES: List[str] = field(default_factory=lambda: [
         'USD', 'EUR', 'GBP', 'JPY', 'CAD', 'AUD', 'CHF', 'CNY', 'SEK', 'NZD'
-    ]
+    ])
     
     # Hotel Rating Scale
     MIN_RATING: float = 0.0
     MAX_RATING: float = 5.0
     
     # Search Filters
-    SUPPORTED_AMENITIES: List[str] = [
+    SUPPORTED_AMENITIES: List[str] = field(default_factory=lambda: [
         'WIFI', 'PARKING', 'POOL', 'GYM', 'SPA', 'RESTAURANT', 'BAR',
         'ROOM_SERVICE', 'CONCIERGE', 'BUSINESS_CENTER', 'PET_FRIENDLY',
         'AIRPORT_SHUTTLE', 'LAUNDRY', 'AIR_CONDITIONING'
-    ]
+    ])
     
     # Error Messages
-    ERROR_MESSAGES: Dict[str, str] = {
+    ERROR_MESSAGES: Dict[str, str] = field(default_factory=lambda: {
         'NO_CREDENTIALS': 'Missing API credentials. Please set HOTELS_API_KEY and HOTELS_CLIENT_SECRET.',
         'AUTH_FAILED': 'Authentication with Amadeus API failed.',
         'NO_RESULTS': 'No hotels found for the specified criteria.',
@@ -57,11 +59,26 @@ class HotelAPIConfig:
         'RATE_LIMIT': 'API rate limit exceeded. Please try again later.',
         'INVALID_HOTEL_ID': 'Invalid hotel ID provided.',
         'BOOKING_FAILED': 'Hotel booking could not be completed.'
-    }
+    })
 
 # Global configuration instance
 HOTEL_CONFIG = HotelAPIConfig()
 
+# Common spellings of amenities mapped onto SUPPORTED_AMENITIES
+AMENITY_ALIASES: Dict[str, str] = {
+    'FREE_WIFI': 'WIFI', 'WI_FI': 'WIFI', 'INTERNET': 'WIFI',
+    'SWIMMING_POOL': 'POOL', 'OUTDOOR_POOL': 'POOL', 'INDOOR_POOL': 'POOL',
+    'FITNESS_CENTER': 'GYM', 'FITNESS_CENTRE': 'GYM', 'FITNESS': 'GYM',
+    'FREE_PARKING': 'PARKING', 'PETS_ALLOWED': 'PET_FRIENDLY',
+    'SHUTTLE': 'AIRPORT_SHUTTLE', 'AIRCON': 'AIR_CONDITIONING',
+    'WELLNESS': 'SPA'
+}
+
+def normalize_amenity(name: str) -> str:
+    """Map a free-form amenity name onto the SUPPORTED_AMENITIES vocabulary."""
+    key = str(name).strip().upper().replace('-', '_').replace(' ', '_')
+    return AMENITY_ALIASES.get(key, key)
+
 # Major city codes for fallback
 MAJOR_CITY_CODES: Dict[str, str] = {
     # Europe
@@ -0,0 +1,99 @@
+"""
+Columnar Hotel Result Index
+Keeps a destination's hotel results as NumPy columns so they can be filtered and
+sorted repeatedly without another upstream search.
+"""
+
+from typing import Dict, Any, List, Iterable
+import numpy as np
+from .hotel_config import HOTEL_CONFIG, normalize_amenity
+
+# Bit position of every supported amenity inside HotelIndex.amenity_mask
+AMENITY_BITS: Dict[str, int] = {
+    amenity: 1 << position for position, amenity in enumerate(HOTEL_CONFIG.SUPPORTED_AMENITIES)
+}
+
+SORT_OPTIONS = ("rating", "price", "review_count", "distance")
+
+def amenity_bits(amenities: Iterable[str]) -> int:
+    """Bitmask for the supported amenities in ``amenities``; unknown names are ignored."""
+    bits = 0
+    for amenity in amenities or []:
+        bits |= AMENITY_BITS.get(normalize_amenity(amenity), 0)
+    return bits
+
+def _number(value: Any) -> float:
+    try:
+        return float(value) if value not in (None, "") else np.nan
+    except (TypeError, ValueError):
+        return np.nan
+
+class HotelIndex:
+    """Immutable columnar view over a list of formatted hotels."""
+
+    def __init__(self, hotels: List[Dict[str, Any]]):
+        self.hotels = list(hotels)
+        count = len(self.hotels)
+        self.price = np.empty(count, dtype=np.float64)
+        self.rating = np.empty(count, dtype=np.float64)
+        self.review_count = np.empty(count, dtype=np.float64)
+        self.distance = np.empty(count, dtype=np.float64)
+        self.amenity_mask = np.empty(count, dtype=np.uint32)
+
+        for row, hotel in enumerate(self.hotels):
+            # A price of 0 means the upstream did not quote one
+            self.price[row] = _number(hotel.get('price_per_night')) or np.nan
+            self.rating[row] = _number(hotel.get('rating'))
+            self.review_count[row] = _number(hotel.get('review_count'))
+            self.distance[row] = _number(hotel.get('distance_km'))
+            self.amenity_mask[row] = amenity_bits(hotel.get('amenities', []))
+
+    def __len__(self) -> int:
+        return len(self.hotels)
+
+    def mask(self, min_price: float = None, max_price: float = None, min_rating: float = None,
+             amenities: List[str] = None) -> np.ndarray:
+        """Boolean row mask for the given filters; NaN prices never match a price bound."""
+        selected = np.ones(len(self.hotels), dtype=bool)
+        if min_price is not None:
+            selected &= self.price >= min_price
+        if max_price is not None:
+            selected &= self.price <= max_price
+        if min_rating is not None:
+            selected &= self.rating >= min_rating
+        if amenities:
+            wanted = {normalize_amenity(a) for a in amenities}
+            if not wanted <= AMENITY_BITS.keys():
+                return np.zeros(len(self.hotels), dtype=bool)
+            required = np.uint32(amenity_bits(wanted))
+            selected &= (self.amenity_mask & required) == required
+        return selected
+
+    def order(self, rows: np.ndarray, sort: str = "rating") -> np.ndarray:
+        """Sort row numbers with the same keys HotelTool uses when merging pages."""
+        if sort not in SORT_OPTIONS:
+            raise ValueError(f"Unsupported sort key: {sort}")
+        price = np.nan_to_num(self.price[rows], nan=np.inf)
+        rating = np.nan_to_num(self.rating[rows], nan=0.0)
+        if sort == "rating":
+            keys = (price, -rating)
+        elif sort == "price":
+            keys = (-rating, price)
+        elif sort == "review_count":
+            keys = (-rating, -np.nan_to_num(self.review_count[rows], nan=0.0))
+        else:
+            keys = (-rating, np.nan_to_num(self.distance[rows], nan=np.inf))
+        # lexsort treats the last key as the primary one
+        return rows[np.lexsort(keys)]
+
+    def rows(self, min_price: float = None, max_price: float = None, min_rating: float = None,
+             amenities: List[str] = None, sort: str = "rating", limit: int = None) -> np.ndarray:
+        """Matching row numbers in sorted order."""
+        rows = np.flatnonzero(self.mask(min_price, max_price, min_rating, amenities))
+        ordered = self.order(rows, sort)
+        return ordered[:limit] if limit else ordered
+
+    def query(self, min_price: float = None, max_price: float = None, min_rating: float = None,
+              amenities: List[str] = None, sort: str = "rating", limit: int = None) -> List[Dict[str, Any]]:
+        """Hotels matching the filters, best first."""
+        return [self.hotels[row] for row in self.rows(min_price, max_price, min_rating, amenities, sort, limit)]
@@ -0,0 +1,69 @@
+"""
+Hotel Summary Statistics
+Single implementation of the hotel price/rating summary used by the hotel API and
+the researcher agent, computed over a HotelIndex in one vectorised pass.
+"""
+
+from typing import Dict, Any, List, Union, Optional
+import numpy as np
+from .hotel_index import HotelIndex
+
+PRICE_PERCENTILES = (25, 50, 75, 90)
+
+def _hotel_brief(hotel: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "name": hotel.get('name'),
+        "rating": hotel.get('rating'),
+        "price": hotel.get('price_per_night'),
+        "currency": hotel.get('currency', 'USD')
+    }
+
+def summarize_hotels(source: Union[HotelIndex, List[Dict[str, Any]]],
+                     rows: Optional[np.ndarray] = None) -> Dict[str, Any]:
+    """Summarise hotels from a raw list or a cached index, optionally limited to ``rows``.
+
+    Hotels without a quoted price (0 or missing) are left out of the price statistics
+    but can still be the best-rated hotel.
+    """
+    index = source if isinstance(source, HotelIndex) else HotelIndex(source)
+    if rows is None:
+        rows = np.arange(len(index))
+    if len(rows) == 0:
+        return {"available": False, "total_hotels": 0}
+
+    price = index.price[rows]
+    rating = np.nan_to_num(index.rating[rows], nan=0.0)
+    priced = ~np.isnan(price)
+
+    # Highest rating wins; the cheaper hotel breaks ties
+    best_row = rows[np.lexsort((np.nan_to_num(price, nan=np.inf), -rating))[0]]
+
+    summary = {
+        "available": True,
+        "total_hotels": int(len(rows)),
+        "best_hotel": _hotel_brief(index.hotels[best_row]),
+        "best_value": None,
+        "price_range": {"min": 0, "max": 0, "average": 0, "median": 0, "percentiles": {}}
+    }
+
+    if priced.any():
+        prices = price[priced]
+        stats = np.percentile(prices, (0, *PRICE_PERCENTILES, 100))
+        summary["price_range"] = {
+            "min": round(float(stats[0]), 2),
+            "max": round(float(stats[-1]), 2),
+            "average": round(float(prices.mean()), 2),
+            "median": round(float(stats[2]), 2),
+            "percentiles": {
+                f"p{p}": round(float(value), 2) for p, value in zip(PRICE_PERCENTILES, stats[1:-1])
+            },
+            "priced_hotels": int(priced.sum())
+        }
+
+        value_score = np.where(priced & (rating > 0), rating / np.where(priced, price, 1.0), -np.inf)
+        if np.isfinite(value_score).any():
+            best_value = _hotel_brief(index.hotels[rows[int(np.argmax(value_score))]])
+            best_value["rating_per_100"] = round(float(value_score.max() * 100), 2)
+            summary["best_value"] = best_value
+
+    return summary
@@ -1,26 +1,79 @@
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Callable, Tuple
 import aiohttp
 import asyncio
-import os
+import heapq
+import math
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
+from ...config import upstream_url, upstream_key
+from .hotel_config import HOTEL_CONFIG, normalize_amenity
+from ..utils.metrics import track_upstream
+from ..utils.rate_limiter import RateLimiter
+from ..utils.logger import Logger
 
 load_dotenv()
 
+# Shared by every HotelTool instance since the quota belongs to the API key
+_rate_limiter = RateLimiter(
+    HOTEL_CONFIG.MAX_REQUESTS_PER_MINUTE,
+    period=60.0,
+    max_concurrency=HOTEL_CONFIG.MAX_CONCURRENT_REQUESTS
+)
+
+# api_source of the placeholder hotels returned when the upstream search fails
+FALLBACK_SOURCE = "Cached Data (API rate limited)"
+
+def is_fallback(hotels: List[Dict[str, Any]]) -> bool:
+    """Whether ``hotels`` are placeholders rather than upstream results."""
+    return any(hotel.get("api_source") == FALLBACK_SOURCE for hotel in hotels)
+
+def _price_key(hotel: Dict[str, Any]) -> float:
+    # Unpriced hotels sort after every priced one
+    return hotel['price_per_night'] or math.inf
+
+SORT_KEYS: Dict[str, Callable[[Dict[str, Any]], Tuple[float, ...]]] = {
+    "rating": lambda h: (-h['rating'], _price_key(h)),
+    "price": lambda h: (_price_key(h), -h['rating']),
+    "review_count": lambda h: (-h['review_count'], -h['rating']),
+    "distance": lambda h: (h['distance_km'] if h['distance_km'] is not None else math.inf, -h['rating'])
+}
+
+class _TopK:
+    """Bounded heap keeping the k smallest items by key while results stream in."""
+
+    def __init__(self, k: int, key: Callable[[Dict[str, Any]], Tuple[float, ...]]):
+        self.k = k
+        self.key = key
+        self._heap = []
+        self._seq = 0
+
+    def push(self, item: Dict[str, Any]) -> None:
+        # Negated keys turn heapq's min-heap into a max-heap whose root is the worst kept item
+        entry = (tuple(-v for v in self.key(item)), self._seq, item)
+        self._seq += 1
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, entry)
+        elif entry[0] > self._heap[0][0]:
+            heapq.heapreplace(self._heap, entry)
+
+    def results(self) -> List[Dict[str, Any]]:
+        return [item for _, _, item in sorted(self._heap, key=lambda e: (tuple(-v for v in e[0]), e[1]))]
+
 class HotelTool:
     """Professional hotel search tool using RapidAPI."""
     
     def __init__(self):
-        self.api_key = os.getenv("HOTELS_API_KEY")
+        self.api_key = upstream_key("HOTELS_API_KEY")
         
         if not self.api_key:
             raise ValueError("Missing required API credential: HOTELS_API_KEY")
         
-        self.base_url = "https://booking-com.p.rapidapi.com/v1"
+        self.base_url = upstream_url("rapidapi", "https://booking-com.p.rapidapi.com/v1")
         self.headers = {
             "X-RapidAPI-Key": self.api_key,
             "X-RapidAPI-Host": "booking-com.p.rapidapi.com"
         }
+        self.logger = Logger("hotel_tool")
     
     async def _get_location_id(self, location: str) -> Optional[str]:
         """Get location ID from RapidAPI for hotel search."""
@@ -32,18 +85,18 @@ class HotelTool:
                     "locale": "en-gb"
                 }
                 
-                async with session.get(url, headers=self.headers, params=params) as response:
+                async with _rate_limiter, session.get(url, headers=self.headers, params=params) as response:
                     if response.status == 200:
                         data = await response.json()
                         if data and len(data) > 0:
                             return str(data[0].get('dest_id'))
                     else:
-                        print(f"Location API error: {response.status}")
+                        self.logger.warning("Location API error: %s", response.status, sample=10)
         except Exception as e:
             if "403" in str(e):
-                print(f"⚠️ Location API access denied. Using fallback location data.")
+                self.logger.warning("Location API access denied. Using fallback location data.", sample=10)
             else:
-                print(f"⚠️ Location lookup error: {e}")
+                self.logger.warning("Location lookup error: %s", e, sample=10)
         
         # Fallback to common city IDs
         city_ids = {
@@ -61,8 +114,14 @@ class HotelTool:
         return city_ids.get(location.lower())
     
     async def search_hotels(self, location: str, check_in: str = None, check_out: str = None, 
-                          adults: int = 2, rooms: int = 1) -> List[Dict[str, Any]]:
-        """Search for hotels using RapidAPI Booking.com API."""
+                          adults: int = 2, rooms: int = 1, pages: int = 1, sort_by: str = "rating",
+                          limit: int = None, min_price: float = None, max_price: float = None,
+                          min_rating: float = None, amenities: List[str] = None) -> List[Dict[str, Any]]:
+        """Search for hotels using RapidAPI Booking.com API.
+        
+        With ``pages`` > 1 the result pages are fetched concurrently and merged into the
+        ``limit`` best hotels by ``sort_by`` (rating, price, review_count or distance).
+        """
         
         # Set default dates if not provided
         if not check_in:
@@ -70,29 +129,47 @@ class HotelTool:
         if not check_out:
             check_out = (datetime.now() + timedelta(days=9)).strftime('%Y-%m-%d')
         
-        try:
-            # Get location ID
-            dest_id = await self._get_location_id(location)
-            if not dest_id:
-                # Try direct search without location ID for popular cities
-                print(f"⚠️ Location ID not found for {location}, trying direct search...")
-                return await self._direct_hotel_search(location, check_in, check_out, adults, rooms)
+        if sort_by not in SORT_KEYS:
+            raise ValueError(f"Unsupported sort key: {sort_by}")
+        pages = max(1, min(pages, HOTEL_CONFIG.MAX_SEARCH_PAGES))
+        limit = max(1, min(limit or HOTEL_CONFIG.DEFAULT_RESULTS_LIMIT, HOTEL_CONFIG.MAX_RESULTS_LIMIT))
+        filters = {
+            "min_price": min_price,
+            "max_price": max_price,
+            "min_rating": min_rating,
+            "amenities": {normalize_amenity(a) for a in amenities} if amenities else None
+        }
+        has_filters = any(value for value in filters.values())
+        
+        with track_upstream("rapidapi") as call:
+            try:
+                # Get location ID
+                dest_id = await self._get_location_id(location)
+                if not dest_id:
+                    # Try direct search without location ID for popular cities
+                    self.logger.info("Location ID not found for %s, trying direct search", location)
+                    call.outcome = "mock"
+                    hotels = await self._direct_hotel_search(location, check_in, check_out, adults, rooms)
+                    return self._select_hotels(hotels, sort_by, limit, filters)
             
-            # Search for hotels
-            hotels = await self._search_hotels_api(dest_id, check_in, check_out, adults, rooms)
+                # Search for hotels
+                hotels = await self._search_hotels_api(dest_id, check_in, check_out, adults, rooms,
+                                                       pages=pages, sort_by=sort_by, limit=limit,
+                                                       filters=filters)
             
-            if not hotels:
-                raise Exception(f"No hotels found for {location}")
+                if not hotels and not has_filters:
+                    raise Exception(f"No hotels found for {location}")
             
-            return hotels
+                return hotels
             
-        except Exception as e:
-            error_msg = str(e)
-            if "429" in error_msg or "Too many requests" in error_msg:
-                print(f"⚠️ Hotel API rate limit reached. Using cached data for {location}")
-            else:
-                print(f"⚠️ Hotel search error: {e}")
-            return self._get_mock_hotels(location)
+            except Exception as e:
+                call.outcome = "error"
+                error_msg = str(e)
+                if "429" in error_msg or "Too many requests" in error_msg:
+                    self.logger.warning("Hotel API rate limit reached. Using cached data for %s", location, sample=10)
+                else:
+                    self.logger.error("Hotel search error: %s", e)
+                return self._select_hotels(self._get_mock_hotels(location), sort_by, limit, filters)
     
     async def _direct_hotel_search(self, location: str, check_in: str, check_out: str, 
                                  adults: int, rooms: int) -> List[Dict[str, Any]]:
@@ -101,7 +178,7 @@ class HotelTool:
             # Use a different RapidAPI endpoint or return mock data
             return self._get_mock_hotels(location)
         except Exception as e:
-            print(f"Direct search failed: {e}")
+            self.logger.warning("Direct search failed: %s", e)
             return self._get_mock_hotels(location)
     
     def _get_mock_hotels(self, location: str) -> List[Dict[str, Any]]:
@@ -124,7 +201,7 @@ class HotelTool:
                 "distance_to_center": "0.5 km",
                 "amenities": ["WiFi", "Pool", "Restaurant", "Gym", "Concierge", "Room Service"],
                 "image_url": "",
-                "api_source": "Cached Data (API rate limited)",
+                "api_source": FALLBACK_SOURCE,
                 "search_timestamp": datetime.now().isoformat()
             },
             {
@@ -144,7 +221,7 @@ class HotelTool:
                 "distance_to_center": "2.1 km",
                 "amenities": ["WiFi", "Spa", "Restaurant", "Bar", "Pool", "Beach Access", "Fitness Center"],
                 "image_url": "",
-                "api_source": "Cached Data (API rate limited)",
+                "api_source": FALLBACK_SOURCE,
                 "search_timestamp": datetime.now().isoformat()
             },
             {
@@ -164,79 +241,154 @@ class HotelTool:
                 "distance_to_center": "1.2 km",
                 "amenities": ["WiFi", "Breakfast", "24h Reception"],
                 "image_url": "",
-                "api_source": "Cached Data (API rate limited)",
+                "api_source": FALLBACK_SOURCE,
                 "search_timestamp": datetime.now().isoformat()
             }
         ]
     
     async def _search_hotels_api(self, dest_id: str, check_in: str, check_out: str, 
-                               adults: int, rooms: int) -> List[Dict[str, Any]]:
-        """Search hotels using RapidAPI Booking.com endpoint."""
+                               adults: int, rooms: int, pages: int = 1, sort_by: str = "rating",
+                               limit: int = None, filters: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+        """Search hotels using RapidAPI Booking.com endpoint, one request per result page."""
+        filters = filters or {}
+        params = {
+            "dest_id": dest_id,
+            "dest_type": "city",
+            "order_by": "popularity",
+            "filter_by_currency": "USD",
+            "adults_number": adults,
+            "room_number": rooms,
+            "checkin_date": check_in,
+            "checkout_date": check_out,
+            "locale": "en-gb",
+            "units": "metric"
+        }
+        categories = self._build_category_filters(filters)
+        if categories:
+            params["categories_filter_ids"] = categories
+        
+        top_k = _TopK(limit or HOTEL_CONFIG.DEFAULT_RESULTS_LIMIT, SORT_KEYS[sort_by])
+        seen_ids = set()
+        errors = []
+        
         try:
             async with aiohttp.ClientSession() as session:
-                url = f"{self.base_url}/hotels/search"
-                params = {
-                    "dest_id": dest_id,
-                    "order_by": "popularity",
-                    "filter_by_currency": "USD",
-                    "adults_number": adults,
-                    "room_number": rooms,
-                    "checkin_date": check_in,
-                    "checkout_date": check_out,
-                    "locale": "en-gb",
-                    "units": "metric"
-                }
-                
-                async with session.get(url, headers=self.headers, params=params) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        return self._format_rapidapi_response(data.get('result', []))
-                    elif response.status == 429:
-                        print(f"⚠️ Rate limit exceeded for hotel search. Using fallback data.")
-                        await asyncio.sleep(1)  # Brief delay before fallback
-                        raise Exception(f"Rate limit: 429 - Too many requests")
-                    else:
-                        error_text = await response.text()
-                        raise Exception(f"API error: {response.status} - {error_text}")
-                        
+                fetches = [
+                    self._fetch_results_page(session, {**params, "page_number": page})
+                    for page in range(pages)
+                ]
+                # Merge each page as soon as it arrives instead of waiting for all of them
+                for fetch in asyncio.as_completed(fetches):
+                    try:
+                        page_results = await fetch
+                    except Exception as e:
+                        errors.append(e)
+                        continue
+                    for raw_hotel in page_results:
+                        hotel = self._format_hotel(raw_hotel)
+                        if hotel is None or hotel["id"] in seen_ids:
+                            continue
+                        seen_ids.add(hotel["id"])
+                        if self._matches_filters(hotel, filters):
+                            top_k.push(hotel)
         except Exception as e:
             raise Exception(f"Hotel search API error: {str(e)}")
-    
-    def _format_rapidapi_response(self, hotels_data: List[Dict]) -> List[Dict[str, Any]]:
-        """Format RapidAPI Booking.com response into standardized hotel data."""
-        formatted_hotels = []
-        
-        for hotel in hotels_data[:20]:  # Limit to 20 results
-            try:
-                price = hotel.get('min_total_price', 0)
-                if price:
-                    price = float(price)
-                
-                formatted_hotel = {
-                    "id": str(hotel.get('hotel_id', '')),
-                    "name": hotel.get('hotel_name', 'Unknown Hotel'),
-                    "price_per_night": price,
-                    "currency": hotel.get('currency_code', 'USD'),
-                    "rating": float(hotel.get('review_score', 0)),
-                    "location": hotel.get('city', ''),
-                    "address": hotel.get('address', ''),
-                    "room_type": "Standard",
-                    "amenities": hotel.get('hotel_facilities', [])[:10],
-                    "image_url": hotel.get('main_photo_url', ''),
-                    "distance_from_center": hotel.get('distance_to_cc', 0),
-                    "distance_unit": "KM",
-                    "review_count": hotel.get('review_nr', 0),
-                    "api_source": "RapidAPI Booking.com",
-                    "search_timestamp": datetime.now().isoformat()
-                }
-                formatted_hotels.append(formatted_hotel)
-                
-            except Exception:
-                continue  # Skip malformed hotel data
         
-        # Sort by rating and price
-        formatted_hotels.sort(key=lambda x: (-x['rating'], x['price_per_night']))
-        return formatted_hotels
+        if errors and len(errors) == pages:
+            raise Exception(f"Hotel search API error: {str(errors[0])}")
+        return top_k.results()
+    
+    async def _fetch_results_page(self, session: aiohttp.ClientSession, params: Dict[str, Any]) -> List[Dict]:
+        """Fetch a single result page within the shared rate limit."""
+        url = f"{self.base_url}/hotels/search"
+        async with _rate_limiter:
+            async with session.get(url, headers=self.headers, params=params) as response:
+                if response.status == 200:
+                    data = await response.json()
+                    return data.get('result', [])
+                elif response.status != 429:
+                    error_text = await response.text()
+                    raise Exception(f"API error: {response.status} - {error_text}")
+        # Backs off after releasing the limiter, so other pages are not held up by this one
+        self.logger.warning("Rate limit exceeded for hotel search. Using fallback data.", sample=10)
+        await asyncio.sleep(1)  # Brief delay before fallback
+        raise Exception("Rate limit: 429 - Too many requests")
+    
+    def _build_category_filters(self, filters: Dict[str, Any]) -> str:
+        """Translate price and rating filters into Booking.com categories_filter_ids."""
+        categories = []
+        if filters.get("min_price") is not None or filters.get("max_price") is not None:
+            low = int(filters.get("min_price") or 0)
+            high = int(math.ceil(filters["max_price"])) if filters.get("max_price") is not None else 100000
+            categories.append(f"price::USD-{low}-{high}")
+        if filters.get("min_rating"):
+            # Booking.com only buckets review scores by whole points (60 = 6+, 90 = 9+)
+            categories.append(f"review_score::{int(filters['min_rating']) * 10}")
+        return ",".join(categories)
+    
+    def _matches_filters(self, hotel: Dict[str, Any], filters: Dict[str, Any]) -> bool:
+        """Re-check filters locally; upstream filtering is coarse and amenities are not supported there."""
+        price = hotel['price_per_night']
+        if filters.get("min_price") is not None and (not price or price < filters["min_price"]):
+            return False
+        if filters.get("max_price") is not None and (not price or price > filters["max_price"]):
+            return False
+        if filters.get("min_rating") is not None and hotel['rating'] < filters["min_rating"]:
+            return False
+        if filters.get("amenities"):
+            available = {normalize_amenity(a) for a in hotel.get('amenities', [])}
+            if not filters["amenities"] <= available:
+                return False
+        return True
+    
+    def _select_hotels(self, hotels: List[Dict[str, Any]], sort_by: str, limit: int,
+                       filters: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Apply filters, ordering and limit to an already formatted hotel list."""
+        top_k = _TopK(limit, SORT_KEYS[sort_by])
+        for hotel in hotels:
+            hotel.setdefault('distance_km', self._parse_distance(hotel.get('distance_to_center')))
+            if self._matches_filters(hotel, filters):
+                top_k.push(hotel)
+        return top_k.results()
+    
+    @staticmethod
+    def _parse_distance(value: Any) -> Optional[float]:
+        """Parse distances such as 1.2, "1.2" or "0.5 km" into kilometres."""
+        try:
+            return float(str(value).lower().replace('km', '').strip())
+        except (TypeError, ValueError):
+            return None
+    
+    def _format_hotel(self, hotel: Dict) -> Optional[Dict[str, Any]]:
+        """Format a single RapidAPI Booking.com hotel, or None when it is malformed."""
+        try:
+            price = hotel.get('min_total_price', 0)
+            if price:
+                price = float(price)
+            facilities = hotel.get('hotel_facilities') or []
+            if isinstance(facilities, str):
+                facilities = [f.strip() for f in facilities.split(',') if f.strip()]
+            
+            return {
+                "id": str(hotel.get('hotel_id', '')),
+                "name": hotel.get('hotel_name', 'Unknown Hotel'),
+                "price_per_night": price,
+                "currency": hotel.get('currency_code', 'USD'),
+                "rating": float(hotel.get('review_score') or 0),
+                "location": hotel.get('city', ''),
+                "address": hotel.get('address', ''),
+                "room_type": "Standard",
+                "amenities": facilities[:10],
+                "image_url": hotel.get('main_photo_url', ''),
+                "distance_from_center": hotel.get('distance_to_cc', 0),
+                "distance_km": self._parse_distance(hotel.get('distance_to_cc')),
+                "distance_unit": "KM",
+                "review_count": hotel.get('review_nr') or 0,
+                "api_source": "RapidAPI Booking.com",
+                "search_timestamp": datetime.now().isoformat()
+            }
+        except Exception:
+            return None  # Skip malformed hotel data
     
 
     async def get_hotel_details(self, hotel_id: str) -> Dict[str, Any]:
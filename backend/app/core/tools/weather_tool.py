@@ -1,100 +1,144 @@
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Tuple
 import aiohttp
-import os
+import asyncio
 from datetime import datetime
 from dotenv import load_dotenv
+from ...config import settings, upstream_url, upstream_key
+from ..utils.cache import TTLCache
+from ..utils.logger import Logger
+from ..utils.metrics import track_upstream
+from .forecast_engine import ForecastSeries
 
 load_dotenv()
 
+# Current conditions and parsed forecast per (city, units), shared by every WeatherTool instance
+_weather_cache = TTLCache(settings.WEATHER_CACHE_TTL, maxsize=512, name="weather")
+
+UNIT_SYMBOLS = {
+    "metric": ("°C", "m/s"),
+    "imperial": ("°F", "mph"),
+    "standard": ("K", "m/s")
+}
+
+def parse_window_date(value: Optional[str]) -> Optional[str]:
+    """The YYYY-MM-DD part of ``value`` (a time part is ignored), or None if it is not a date."""
+    try:
+        return datetime.strptime(str(value)[:10], '%Y-%m-%d').strftime('%Y-%m-%d')
+    except ValueError:
+        return None
+
 class WeatherTool:
     def __init__(self):
-        self.api_key = os.getenv("WEATHER_API_KEY")
-        self.base_url = "http://api.openweathermap.org/data/2.5"
+        self.logger = Logger("weather_tool")
+        self.api_key = upstream_key("WEATHER_API_KEY")
+        self.base_url = upstream_url("openweather", "http://api.openweathermap.org/data/2.5")
     
-    async def get_weather(self, location: str) -> Dict[str, Any]:
+    async def get_weather(self, location: str, units: str = "metric", start_date: str = None,
+                          end_date: str = None) -> Dict[str, Any]:
+        """Current weather plus the forecast, limited to ``start_date``..``end_date`` when given."""
+        start_date, end_date = self._window(start_date, end_date)
         try:
             if not self.api_key:
-                return self._get_mock_weather(location)
-                
+                with track_upstream("openweather", "mock"):
+                    return self._get_mock_weather(location)
+            
             async with aiohttp.ClientSession() as session:
-                # Current weather
-                current_url = f"{self.base_url}/weather?q={location}&appid={self.api_key}&units=metric"
-                async with session.get(current_url) as response:
-                    if response.status != 200:
-                        return self._get_mock_weather(location)
-                    current_data = await response.json()
-                
-                # 5-day forecast
-                forecast_url = f"{self.base_url}/forecast?q={location}&appid={self.api_key}&units=metric"
-                async with session.get(forecast_url) as response:
-                    if response.status != 200:
-                        forecast_data = {"list": []}
-                    else:
-                        forecast_data = await response.json()
-                
-                return {
-                    "location": current_data["name"],
-                    "country": current_data["sys"]["country"],
-                    "temperature": f"{round(current_data['main']['temp'])}°C",
-                    "feels_like": f"{round(current_data['main']['feels_like'])}°C",
-                    "condition": current_data["weather"][0]["main"],
-                    "description": current_data["weather"][0]["description"].title(),
-                    "humidity": f"{current_data['main']['humidity']}%",
-                    "pressure": f"{current_data['main']['pressure']} hPa",
-                    "wind_speed": f"{current_data['wind']['speed']} m/s",
-                    "wind_direction": current_data['wind'].get('deg', 0),
-                    "visibility": f"{current_data.get('visibility', 0) / 1000:.1f} km",
-                    "uv_index": "Moderate",  # Would need additional API call
-                    "sunrise": current_data["sys"]["sunrise"],
-                    "sunset": current_data["sys"]["sunset"],
-                    "forecast": [
-                        {
-                            "date": item["dt_txt"].split()[0],
-                            "time": item["dt_txt"].split()[1],
-                            "temp": f"{round(item['main']['temp'])}°C",
-                            "condition": item["weather"][0]["main"],
-                            "description": item["weather"][0]["description"].title(),
-                            "humidity": f"{item['main']['humidity']}%",
-                            "wind_speed": f"{item['wind']['speed']} m/s"
-                        } for item in forecast_data["list"][:8]  # Next 24 hours (3-hour intervals)
-                    ],
-                    "daily_forecast": self._process_daily_forecast(forecast_data.get("list", []))
-                }
+                cached = await self._get_cached_weather(session, location, units)
+            return self._build_weather(cached, start_date, end_date)
         except Exception as e:
             return self._get_mock_weather(location)
     
-    def _process_daily_forecast(self, forecast_list: list) -> list:
-        """Process 5-day forecast into daily summaries"""
-        daily_data = {}
+    async def get_weather_many(self, cities: List[str], units: str = "metric", start_date: str = None,
+                               end_date: str = None) -> Dict[str, Dict[str, Any]]:
+        """Weather for several cities at once, fetched concurrently over one session."""
+        start_date, end_date = self._window(start_date, end_date)
+        unique = {}
+        for city in cities:
+            if city.strip():
+                unique.setdefault(city.strip().lower(), city.strip())
+        unique_cities = list(unique.values())
+        if not self.api_key:
+            with track_upstream("openweather", "mock"):
+                return {city: self._get_mock_weather(city) for city in unique_cities}
         
-        for item in forecast_list:
-            date = item["dt_txt"].split()[0]
-            if date not in daily_data:
-                daily_data[date] = {
-                    "date": date,
-                    "temps": [],
-                    "conditions": [],
-                    "humidity": [],
-                    "wind_speeds": []
-                }
-            
-            daily_data[date]["temps"].append(item["main"]["temp"])
-            daily_data[date]["conditions"].append(item["weather"][0]["main"])
-            daily_data[date]["humidity"].append(item["main"]["humidity"])
-            daily_data[date]["wind_speeds"].append(item["wind"]["speed"])
+        async with aiohttp.ClientSession() as session:
+            outcomes = await asyncio.gather(
+                *[self._get_cached_weather(session, city, units) for city in unique_cities],
+                return_exceptions=True
+            )
         
-        daily_forecast = []
-        for date, data in list(daily_data.items())[:5]:  # 5 days
-            daily_forecast.append({
-                "date": date,
-                "high_temp": f"{round(max(data['temps']))}°C",
-                "low_temp": f"{round(min(data['temps']))}°C",
-                "condition": max(set(data["conditions"]), key=data["conditions"].count),
-                "avg_humidity": f"{round(sum(data['humidity']) / len(data['humidity']))}%",
-                "avg_wind": f"{round(sum(data['wind_speeds']) / len(data['wind_speeds']), 1)} m/s"
-            })
+        return {
+            city: self._get_mock_weather(city) if isinstance(outcome, Exception)
+            else self._build_weather(outcome, start_date, end_date)
+            for city, outcome in zip(unique_cities, outcomes)
+        }
+    
+    def _window(self, start_date: Optional[str], end_date: Optional[str]) -> Tuple[Optional[str], Optional[str]]:
+        """Trip dates to slice the forecast to; a malformed one is ignored rather than
+        failing the lookup or replacing real weather with mock data."""
+        window = []
+        for value in (start_date, end_date):
+            date = parse_window_date(value) if value else None
+            if value and date is None:
+                self.logger.warning("Ignoring malformed forecast date %r", value, sample=10)
+            window.append(date)
+        return window[0], window[1]
+    
+    async def _get_cached_weather(self, session: aiohttp.ClientSession, location: str, units: str) -> Dict[str, Any]:
+        key = (location.strip().lower(), units)
+        with track_upstream("openweather") as call:
+            if key in _weather_cache:
+                call.outcome = "cached"
+            return await _weather_cache.get_or_load(key, lambda: self._fetch_weather(session, location, units))
+    
+    async def _fetch_weather(self, session: aiohttp.ClientSession, location: str, units: str) -> Dict[str, Any]:
+        """Request current weather and the 5-day forecast concurrently and process them once."""
+        params = {"q": location, "appid": self.api_key, "units": units}
+        current_data, forecast_data = await asyncio.gather(
+            self._get_json(session, f"{self.base_url}/weather", params),
+            self._get_json(session, f"{self.base_url}/forecast", params)
+        )
+        if current_data is None:
+            raise Exception(f"Weather API error for {location}")
+        if forecast_data is None:
+            forecast_data = {"list": []}
         
-        return daily_forecast
+        temp_unit, speed_unit = UNIT_SYMBOLS.get(units, UNIT_SYMBOLS["metric"])
+        current = {
+            "location": current_data["name"],
+            "country": current_data["sys"]["country"],
+            "temperature": f"{round(current_data['main']['temp'])}{temp_unit}",
+            "feels_like": f"{round(current_data['main']['feels_like'])}{temp_unit}",
+            "condition": current_data["weather"][0]["main"],
+            "description": current_data["weather"][0]["description"].title(),
+            "humidity": f"{current_data['main']['humidity']}%",
+            "pressure": f"{current_data['main']['pressure']} hPa",
+            "wind_speed": f"{current_data['wind']['speed']} {speed_unit}",
+            "wind_direction": current_data['wind'].get('deg', 0),
+            "visibility": f"{current_data.get('visibility', 0) / 1000:.1f} km",
+            "uv_index": "Moderate",  # Would need additional API call
+            "sunrise": current_data["sys"]["sunrise"],
+            "sunset": current_data["sys"]["sunset"]
+        }
+        return {
+            "current": current,
+            "series": ForecastSeries(forecast_data.get("list", []), temp_unit, speed_unit)
+        }
+    
+    def _build_weather(self, cached: Dict[str, Any], start_date: str = None, end_date: str = None) -> Dict[str, Any]:
+        """Response for one request, slicing the cached forecast to the trip dates."""
+        series = cached["series"]
+        return {
+            **cached["current"],
+            "forecast": series.entries(start_date, end_date),  # 3-hour intervals, at most 24 hours
+            "daily_forecast": series.daily_forecast(start_date, end_date)
+        }
+    
+    async def _get_json(self, session: aiohttp.ClientSession, url: str, params: Dict[str, Any]):
+        async with session.get(url, params=params) as response:
+            if response.status != 200:
+                return None
+            return await response.json()
     
     def _get_mock_weather(self, location: str) -> Dict[str, Any]:
         return {
@@ -0,0 +1,140 @@
+"""
+Admission Control
+Caps how many requests an expensive route works on at once. Requests beyond the cap
+wait in a bounded FIFO queue; when the queue is full, or a request has waited
+``max_wait`` seconds, it is shed with a Retry-After estimated from how fast the
+route has been completing requests. Routes without a controller are never held up.
+"""
+
+import asyncio
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Deque, Dict, List
+
+from ...config import settings
+from .metrics import REGISTRY, _escape
+
+ADMISSION_WAIT_SECONDS = REGISTRY.histogram(
+    "admission_wait_seconds", "Time admitted requests spent queued before starting.", ["route"])
+
+
+class Overloaded(Exception):
+    def __init__(self, route: str, retry_after: int):
+        super().__init__(f"{route} is at capacity, retry in {retry_after}s")
+        self.route = route
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """``max_concurrency`` requests run at once and up to ``max_queue`` wait for a slot."""
+
+    def __init__(self, route: str, max_concurrency: int, max_queue: int, max_wait: float = 30.0):
+        if max_concurrency <= 0 or max_queue < 0:
+            raise ValueError("max_concurrency must be positive and max_queue non-negative")
+        self.route = route
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.in_flight = 0
+        self.rejected = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        # Exponentially weighted mean of how long admitted requests hold a slot
+        self._service_time = 0.0
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    def retry_after(self) -> int:
+        """Seconds until the current queue, plus one more request, should have drained."""
+        if not self._service_time:
+            return max(1, math.ceil(self.max_wait))
+        service_rate = self.max_concurrency / self._service_time
+        return max(1, math.ceil((self.queued + 1) / service_rate))
+
+    def observe(self, seconds: float) -> None:
+        self._service_time = seconds if not self._service_time else 0.8 * self._service_time + 0.2 * seconds
+
+    async def acquire(self) -> None:
+        if self.in_flight < self.max_concurrency and not self._waiters:
+            self.in_flight += 1
+            return
+        if self.queued >= self.max_queue:
+            self.rejected += 1
+            raise Overloaded(self.route, self.retry_after())
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, self.max_wait)
+        except asyncio.TimeoutError:
+            self._abandon(waiter)
+            self.rejected += 1
+            raise Overloaded(self.route, self.retry_after())
+        except BaseException:
+            self._abandon(waiter)
+            raise
+
+    def _abandon(self, waiter: asyncio.Future) -> None:
+        if waiter.done() and not waiter.cancelled():
+            # The slot was handed over just as the waiter gave up; pass it on
+            self.release()
+        else:
+            self._waiters.remove(waiter)
+
+    def release(self) -> None:
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                # The slot moves straight to the next waiter, so in_flight is unchanged
+                waiter.set_result(None)
+                return
+        self.in_flight -= 1
+
+    @asynccontextmanager
+    async def admit(self) -> AsyncIterator[None]:
+        """Hold a slot for the enclosed block; raises Overloaded when the request is shed."""
+        queued_at = time.perf_counter()
+        await self.acquire()
+        started = time.perf_counter()
+        ADMISSION_WAIT_SECONDS.labels(self.route).observe(started - queued_at)
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started)
+            self.release()
+
+
+def parse_limits(spec: str) -> Dict[str, tuple]:
+    """"/api/v1/plan-trip=8:32" -> {"/api/v1/plan-trip": (8, 32)}"""
+    limits = {}
+    for item in (spec or "").split(","):
+        if "=" in item:
+            route, limit = item.split("=", 1)
+            concurrency, _, queue = limit.partition(":")
+            limits[route.strip()] = (int(concurrency), int(queue or 0))
+    return limits
+
+
+controllers: Dict[str, AdmissionController] = {
+    route: AdmissionController(route, concurrency, queue, settings.ADMISSION_MAX_WAIT)
+    for route, (concurrency, queue) in parse_limits(settings.ADMISSION_LIMITS).items()
+}
+
+
+def _collect_admission() -> List[str]:
+    series = [
+        ("admission_in_flight", "gauge", "Requests currently holding an admission slot.", lambda c: c.in_flight),
+        ("admission_queue_depth", "gauge", "Requests waiting for an admission slot.", lambda c: c.queued),
+        ("admission_rejected_total", "counter", "Requests shed with 503 by admission control.", lambda c: c.rejected)
+    ]
+    lines = []
+    for name, kind, documentation, read in series:
+        lines.extend([f"# HELP {name} {documentation}", f"# TYPE {name} {kind}"])
+        lines.extend(f'{name}{{route="{_escape(route)}"}} {read(c)}' for route, c in sorted(controllers.items()))
+    return lines
+
+
+REGISTRY.add_collector(_collect_admission)
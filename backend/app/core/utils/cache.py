@@ -0,0 +1,109 @@
+import asyncio
+import time
+import weakref
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Union
+
+_MISSING = object()
+
+# Every live cache, so /metrics can report hit ratios without each owner registering
+_instances: "weakref.WeakSet[TTLCache]" = weakref.WeakSet()
+
+
+def all_caches() -> List["TTLCache"]:
+    return list(_instances)
+
+
+class TTLCache:
+    """In-process LRU cache whose entries expire ``ttl`` seconds after being stored.
+
+    ``get_or_load`` coalesces concurrent loads of the same key so that only one
+    upstream request is made while the others wait for its result.
+    """
+
+    def __init__(self, ttl: float, maxsize: int = 256, name: str = "cache"):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.name = name
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        _instances.add(self)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._data[key]
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        self._data[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def invalidate(self, key: Hashable) -> None:
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    async def get_or_load(self, key: Hashable, loader: Callable[[], Awaitable[Any]],
+                          ttl: Union[float, Callable[[Any], Optional[float]], None] = None) -> Any:
+        """Return the cached value for ``key``, calling ``loader`` at most once on a miss.
+
+        ``ttl`` may be a function of the loaded value, e.g. to keep fallbacks briefly.
+        """
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        pending = self._inflight.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await loader()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Nobody may be waiting on the future; retrieve the exception to keep asyncio quiet
+            future.exception()
+            raise
+        else:
+            self.set(key, value, ttl(value) if callable(ttl) else ttl)
+            future.set_result(value)
+            return value
+        finally:
+            self._inflight.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "name": self.name,
+            "size": len(self._data),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+    def __contains__(self, key: Hashable) -> bool:
+        """Whether ``key`` holds an unexpired value; does not count as a lookup."""
+        entry = self._data.get(key)
+        return entry is not None and entry[0] >= time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self._data)
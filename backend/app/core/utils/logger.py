@@ -1,28 +1,129 @@
+"""
+Logger
+Structured logging that stays off the request path. Records are handed to a queue
+and written by a background thread, messages use %-style arguments that are only
+formatted when the record is written, and disabled levels return before anything
+is built.
+
+    logger = Logger("hotel_tool")
+    logger.info("Found %d hotels in %s", len(hotels), city, provider="rapidapi")
+    logger.debug("Parsed response", sample=100)  # one in every 100 calls
+
+Levels can be set per module with LOG_LEVELS, e.g. "hotel_tool=WARNING,openai_service=DEBUG".
+"""
+
+import atexit
 import logging
-from datetime import datetime
-from typing import Any
+import logging.handlers
+import queue
+import sys
+from typing import Any, Dict, Optional, Tuple
+
+from ...config import settings
+
+ROOT_LOGGER = "travel_assist"
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+# Calls per (logger name, unformatted message) for sampling. Module-level because tools
+# are often built per request, and a per-instance count would restart every time.
+_sample_counts: Dict[Tuple[str, str], int] = {}
+
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    """Enqueues records as they are; the stock handler formats them on the caller's thread."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+class StructuredFormatter(logging.Formatter):
+    """Appends a record's structured fields as key=value pairs."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        message = super().format(record)
+        fields = getattr(record, "fields", None)
+        if fields:
+            message += " " + " ".join(f"{key}={value!r}" for key, value in fields.items())
+        return message
+
+
+def parse_levels(spec: str) -> Dict[str, str]:
+    """"hotel_tool=WARNING, openai_service=debug" -> {"hotel_tool": "WARNING", ...}"""
+    levels = {}
+    for item in (spec or "").split(","):
+        if "=" in item:
+            name, level = item.split("=", 1)
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def configure_logging(level: Optional[str] = None, levels: Optional[Dict[str, str]] = None,
+                      handler: Optional[logging.Handler] = None) -> None:
+    """(Re)start the background writer. Called on first use with the LOG_* settings;
+    tests pass their own ``handler``."""
+    global _listener
+    shutdown_logging()
+
+    if handler is None:
+        handler = logging.StreamHandler(sys.stderr)
+        handler.setFormatter(StructuredFormatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s"))
+
+    records: "queue.Queue[logging.LogRecord]" = queue.Queue(-1)
+    root = logging.getLogger(ROOT_LOGGER)
+    root.handlers = [_DeferredQueueHandler(records)]
+    root.setLevel(level or settings.LOG_LEVEL)
+    root.propagate = False
+    for name, module_level in (levels if levels is not None else parse_levels(settings.LOG_LEVELS)).items():
+        logging.getLogger(f"{ROOT_LOGGER}.{name}").setLevel(module_level)
+
+    _listener = logging.handlers.QueueListener(records, handler, respect_handler_level=True)
+    _listener.start()
+
+
+def shutdown_logging() -> None:
+    """Stop the background writer after it has written everything queued."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(shutdown_logging)
+
 
 class Logger:
     def __init__(self, name: str = "travel_assist"):
-        self.logger = logging.getLogger(name)
-        self.logger.setLevel(logging.INFO)
-        
-        if not self.logger.handlers:
-            handler = logging.StreamHandler()
-            formatter = logging.Formatter(
-                '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-            )
-            handler.setFormatter(formatter)
-            self.logger.addHandler(handler)
-    
-    def info(self, message: str, **kwargs: Any) -> None:
-        self.logger.info(f"{message} {kwargs if kwargs else ''}")
-    
-    def error(self, message: str, **kwargs: Any) -> None:
-        self.logger.error(f"{message} {kwargs if kwargs else ''}")
-    
-    def warning(self, message: str, **kwargs: Any) -> None:
-        self.logger.warning(f"{message} {kwargs if kwargs else ''}")
-    
-    def debug(self, message: str, **kwargs: Any) -> None:
-        self.logger.debug(f"{message} {kwargs if kwargs else ''}")
\ No newline at end of file
+        if _listener is None:
+            configure_logging()
+        self.name = name
+        self.logger = logging.getLogger(name if name.startswith(ROOT_LOGGER) else f"{ROOT_LOGGER}.{name}")
+
+    def _log(self, level: int, message: str, args: tuple, sample: int, exc_info: Any, fields: Dict[str, Any]) -> None:
+        if not self.logger.isEnabledFor(level):
+            return
+        if sample > 1:
+            # Keyed by the unformatted message, so one call site shares a counter
+            key = (self.logger.name, message)
+            count = _sample_counts.get(key, 0)
+            _sample_counts[key] = count + 1
+            if count % sample:
+                return
+            fields["sampled"] = f"1/{sample}"
+        self.logger.log(level, message, *args, exc_info=exc_info, extra={"fields": fields}, stacklevel=3)
+
+    def info(self, message: str, *args: Any, sample: int = 1, **fields: Any) -> None:
+        self._log(logging.INFO, message, args, sample, None, fields)
+
+    def error(self, message: str, *args: Any, sample: int = 1, exc_info: Any = None, **fields: Any) -> None:
+        self._log(logging.ERROR, message, args, sample, exc_info, fields)
+
+    def warning(self, message: str, *args: Any, sample: int = 1, **fields: Any) -> None:
+        self._log(logging.WARNING, message, args, sample, None, fields)
+
+    def debug(self, message: str, *args: Any, sample: int = 1, **fields: Any) -> None:
+        self._log(logging.DEBUG, message, args, sample, None, fields)
+
+    def is_enabled(self, level: int) -> bool:
+        """For guarding arguments that are expensive to compute."""
+        return self.logger.isEnabledFor(level)
@@ -0,0 +1,234 @@
+"""
+Metrics
+Counters and histograms rendered in the Prometheus text format at /metrics.
+
+Recording is cheap enough to leave on: every labelled series is created once and
+then updated in place (one bisect and two integer/float additions per observation).
+No locks are taken since observations happen on the event loop thread.
+"""
+
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+from .cache import all_caches
+from .tracing import span
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+STORAGE_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _CounterChild:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount: float = 1) -> None:
+        self.value += amount
+
+
+class _HistogramChild:
+    __slots__ = ("upper_bounds", "counts", "sum")
+
+    def __init__(self, upper_bounds: Tuple[float, ...]):
+        self.upper_bounds = upper_bounds
+        # One slot per bucket plus +Inf; cumulated only when rendered
+        self.counts = [0] * (len(upper_bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.upper_bounds, value)] += 1
+        self.sum += value
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values: str):
+        """The series for these label values; hot paths may keep the returned child."""
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}")
+            child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def clear(self) -> None:
+        self._children.clear()
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for values, child in sorted(self._children.items()):
+            lines.extend(self._render_child(values, child))
+        return lines
+
+    def _render_child(self, values, child) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self) -> _CounterChild:
+        return _CounterChild()
+
+    def inc(self, *values: str, amount: float = 1) -> None:
+        self.labels(*values).inc(amount)
+
+    def _render_child(self, values, child) -> List[str]:
+        return [f"{self.name}{_format_labels(self.labelnames, values)} {_format_value(child.value)}"]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self) -> _HistogramChild:
+        return _HistogramChild(self.buckets)
+
+    def observe(self, *values: str, value: float) -> None:
+        self.labels(*values).observe(value)
+
+    def _render_child(self, values, child) -> List[str]:
+        lines = []
+        cumulative = 0
+        for upper, count in zip(self.buckets + (float("inf"),), child.counts):
+            cumulative += count
+            le = f'le="{_format_value(upper)}"'
+            lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, values, le)} {cumulative}")
+        labels = _format_labels(self.labelnames, values)
+        lines.append(f"{self.name}_sum{labels} {_format_value(child.sum)}")
+        lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class Registry:
+    """Holds the process's metrics plus collectors that are evaluated at scrape time."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], Iterable[str]]] = []
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def _register(self, metric: _Metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def add_collector(self, collector: Callable[[], Iterable[str]]) -> None:
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        for collector in self._collectors:
+            lines.extend(collector())
+        return "\n".join(lines) + "\n"
+
+
+def _collect_caches() -> List[str]:
+    caches = sorted(all_caches(), key=lambda cache: cache.name)
+    series = [
+        ("cache_hits_total", "counter", "Cache lookups answered from the cache.", lambda c: c.hits),
+        ("cache_misses_total", "counter", "Cache lookups that missed or found an expired entry.", lambda c: c.misses),
+        ("cache_entries", "gauge", "Entries currently held by the cache.", len),
+        ("cache_hit_ratio", "gauge", "Hits divided by lookups since start-up.",
+         lambda c: c.hits / (c.hits + c.misses) if c.hits + c.misses else 0.0)
+    ]
+    lines = []
+    for name, kind, documentation, read in series:
+        lines.extend([f"# HELP {name} {documentation}", f"# TYPE {name} {kind}"])
+        lines.extend(f'{name}{{cache="{_escape(cache.name)}"}} {_format_value(read(cache))}' for cache in caches)
+    return lines
+
+
+REGISTRY = Registry()
+REGISTRY.add_collector(_collect_caches)
+
+STAGE_SECONDS = REGISTRY.histogram(
+    "travel_plan_stage_seconds", "Duration of each trip-planning stage.", ["stage"])
+UPSTREAM_CALL_SECONDS = REGISTRY.histogram(
+    "upstream_call_seconds", "Tool calls by provider and outcome (live, cached, mock, error).",
+    ["provider", "outcome"])
+LLM_REQUEST_SECONDS = REGISTRY.histogram(
+    "llm_request_seconds", "LLM completion latency.", ["model", "outcome"])
+LLM_TOKENS = REGISTRY.counter(
+    "llm_tokens_total", "Tokens used by LLM completions.", ["model", "kind"])
+PLANS_DEGRADED = REGISTRY.counter(
+    "travel_plan_degraded_total", "Itineraries built from templates because the LLM was degraded.", ["reason"])
+PLAN_UPGRADES = REGISTRY.counter(
+    "travel_plan_upgrades_total", "Background LLM upgrades of degraded itineraries by outcome.", ["outcome"])
+PAST_TRIP_LOOKUPS = REGISTRY.counter(
+    "travel_plan_past_trip_total", "Itinerary requests by past-trip retrieval outcome (reused, exemplar, miss).",
+    ["outcome"])
+STORAGE_SECONDS = REGISTRY.histogram(
+    "storage_operation_seconds", "Reads and writes of the JSON data files.", ["operation", "file"],
+    buckets=STORAGE_BUCKETS)
+
+
+class track_upstream:
+    """Time one tool call; set ``outcome`` on the handle before the block ends.
+
+        with track_upstream("openweather") as call:
+            call.outcome = "cached"
+
+    The outcome defaults to "live" and becomes "error" if the block raises. The call
+    also shows up as a ``tool.<provider>`` span when a trace is active.
+    """
+
+    __slots__ = ("provider", "outcome", "_started", "_span")
+
+    def __init__(self, provider: str, outcome: str = "live"):
+        self.provider = provider
+        self.outcome = outcome
+
+    def __enter__(self) -> "track_upstream":
+        self._span = span(f"tool.{self.provider}").__enter__()
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is not None:
+            self.outcome = "error"
+        UPSTREAM_CALL_SECONDS.labels(self.provider, self.outcome).observe(time.perf_counter() - self._started)
+        self._span.set(outcome=self.outcome)
+        self._span.__exit__(exc_type, exc, tb)
@@ -0,0 +1,138 @@
+"""
+Profiling
+Runs a single request under cProfile when it carries the admin profiling token, and
+stores the result under an id: the raw pstats file for download (snakeviz, pstats)
+plus metadata for listing.
+
+cProfile hooks the event loop thread, so while a profile is recording it also sees
+other requests interleaved on that loop. Only one request is profiled at a time;
+a second profiled request while one is running proceeds unprofiled.
+"""
+
+import cProfile
+import hmac
+import io
+import json
+import os
+import pstats
+import re
+import time
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from ...config import settings
+
+_PROFILE_ID = re.compile(r"^[0-9a-f]{16}$")
+SORT_KEYS = ("cumulative", "tottime", "calls", "ncalls")
+
+
+def is_authorized(token: Optional[str]) -> bool:
+    """Whether ``token`` matches PROFILE_TOKEN; profiling is off while that setting is empty."""
+    return bool(settings.PROFILE_TOKEN and token) and hmac.compare_digest(token, settings.PROFILE_TOKEN)
+
+
+class ProfileStore:
+    """Keeps the newest ``max_profiles`` profiles in ``directory``."""
+
+    def __init__(self, directory: str, max_profiles: int = 50):
+        self.directory = directory
+        self.max_profiles = max_profiles
+
+    def path(self, profile_id: str, suffix: str = ".prof") -> Optional[str]:
+        if not _PROFILE_ID.match(profile_id or ""):
+            return None
+        path = os.path.join(self.directory, f"{profile_id}{suffix}")
+        return path if os.path.exists(path) else None
+
+    def save(self, profiler: cProfile.Profile, meta: Dict[str, Any]) -> str:
+        os.makedirs(self.directory, exist_ok=True)
+        profile_id = uuid.uuid4().hex[:16]
+        profiler.dump_stats(os.path.join(self.directory, f"{profile_id}.prof"))
+        with open(os.path.join(self.directory, f"{profile_id}.json"), "w") as f:
+            json.dump({"id": profile_id, **meta}, f)
+        self._prune()
+        return profile_id
+
+    def _prune(self) -> None:
+        metas = sorted(
+            (entry for entry in os.scandir(self.directory) if entry.name.endswith(".json")),
+            key=lambda entry: entry.stat().st_mtime
+        )
+        for entry in metas[:max(0, len(metas) - self.max_profiles)]:
+            for suffix in (".json", ".prof"):
+                try:
+                    os.remove(entry.path[:-len(".json")] + suffix)
+                except FileNotFoundError:
+                    pass
+
+    def list(self) -> List[Dict[str, Any]]:
+        if not os.path.isdir(self.directory):
+            return []
+        profiles = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".json"):
+                with open(entry.path, "r") as f:
+                    profiles.append(json.load(f))
+        return sorted(profiles, key=lambda profile: profile["created_at"], reverse=True)
+
+    def meta(self, profile_id: str) -> Optional[Dict[str, Any]]:
+        path = self.path(profile_id, ".json")
+        if path is None:
+            return None
+        with open(path, "r") as f:
+            return json.load(f)
+
+    def summary(self, profile_id: str, sort: str = "cumulative", limit: int = 40) -> Optional[str]:
+        """pstats text report of the ``limit`` most expensive functions."""
+        path = self.path(profile_id)
+        if path is None:
+            return None
+        stream = io.StringIO()
+        stats = pstats.Stats(path, stream=stream)
+        stats.sort_stats(sort).print_stats(limit)
+        return stream.getvalue()
+
+
+profile_store = ProfileStore(settings.PROFILE_DIR, settings.PROFILE_MAX_FILES)
+
+
+class profile_request:
+    """Profile the enclosed block unless another profile is already recording.
+
+    ``profile_id`` is set after the block when a profile was stored.
+    """
+
+    _active = False
+
+    def __init__(self, **meta: Any):
+        self.meta = meta
+        self.profile_id: Optional[str] = None
+        self._profiler: Optional[cProfile.Profile] = None
+        self._started = 0.0
+
+    def __enter__(self) -> "profile_request":
+        if profile_request._active:
+            return self
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another profiler or debugger owns the interpreter hook
+            return self
+        profile_request._active = True
+        self._profiler = profiler
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if self._profiler is None:
+            return
+        self._profiler.disable()
+        profile_request._active = False
+        self.meta.update({
+            "created_at": datetime.utcnow().isoformat(),
+            "duration_ms": round((time.perf_counter() - self._started) * 1000, 3),
+            "error": f"{exc_type.__name__}: {exc}" if exc is not None else None
+        })
+        self.profile_id = profile_store.save(self._profiler, self.meta)
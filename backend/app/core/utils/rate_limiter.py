@@ -0,0 +1,53 @@
+import asyncio
+import time
+from typing import Optional
+
+
+class RateLimiter:
+    """Async token-bucket limiter shared by the upstream API tools.
+
+    Allows up to ``rate`` acquisitions per ``period`` seconds, with an optional
+    cap on how many callers may hold a slot concurrently.
+    """
+
+    def __init__(self, rate: int, period: float = 60.0, max_concurrency: Optional[int] = None):
+        if rate <= 0 or period <= 0:
+            raise ValueError("rate and period must be positive")
+        self.rate = rate
+        self.period = period
+        self._tokens = float(rate)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+        self._semaphore = asyncio.Semaphore(max_concurrency) if max_concurrency else None
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.rate, self._tokens + (now - self._updated) * self.rate / self.period)
+        self._updated = now
+
+    async def acquire(self) -> None:
+        """Wait until a request may be sent."""
+        if self._semaphore:
+            await self._semaphore.acquire()
+        try:
+            async with self._lock:
+                self._refill()
+                while self._tokens < 1:
+                    await asyncio.sleep((1 - self._tokens) * self.period / self.rate)
+                    self._refill()
+                self._tokens -= 1
+        except BaseException:
+            if self._semaphore:
+                self._semaphore.release()
+            raise
+
+    def release(self) -> None:
+        if self._semaphore:
+            self._semaphore.release()
+
+    async def __aenter__(self) -> "RateLimiter":
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        self.release()
@@ -0,0 +1,56 @@
+"""
+Stage Timing
+Collects per-request stage durations through a context variable, so services can
+mark stages without threading a timer through every call, and renders them as a
+Server-Timing header.
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, Optional
+
+from .metrics import STAGE_SECONDS
+
+_stage_timings: ContextVar[Optional[Dict[str, float]]] = ContextVar("stage_timings", default=None)
+
+
+def start_timing() -> Dict[str, float]:
+    """Begin collecting stage durations (in milliseconds) for the current request."""
+    timings: Dict[str, float] = {}
+    _stage_timings.set(timings)
+    return timings
+
+
+def current_timings() -> Optional[Dict[str, float]]:
+    return _stage_timings.get()
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Time the enclosed block into the stage histogram, and into the request's
+    timings when ``start_timing`` was called."""
+    timings = _stage_timings.get()
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        STAGE_SECONDS.labels(name).observe(elapsed)
+        if timings is not None:
+            timings[name] = timings.get(name, 0.0) + elapsed * 1000
+
+
+def server_timing_header(timings: Dict[str, float]) -> str:
+    return ", ".join(f"{name};dur={duration:.2f}" for name, duration in timings.items())
+
+
+def parse_server_timing(header: str) -> Dict[str, float]:
+    """Inverse of ``server_timing_header``; metrics without a duration are skipped."""
+    timings: Dict[str, float] = {}
+    for metric in (header or "").split(","):
+        name, *params = [part.strip() for part in metric.split(";")]
+        for param in params:
+            if param.startswith("dur="):
+                timings[name] = float(param[4:])
+    return timings
@@ -0,0 +1,269 @@
+"""
+Tracing
+Request-scoped span trees. Each request opens a trace and the agents, tools, LLM
+calls and storage operations open child spans under whatever span is current, via
+a context variable. Finished traces are kept in memory for /api/v1/debug/traces/{id}
+and handed to a background thread that appends them to a rotating JSON-lines file,
+so a request never waits on the disk.
+"""
+
+import atexit
+import functools
+import json
+import os
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from ...config import settings
+from .logger import Logger
+
+_current_span: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+
+
+class Span:
+    """One timed operation; a context manager that becomes the current span while open."""
+
+    __slots__ = ("trace", "span_id", "parent_id", "name", "attributes", "start_time",
+                 "_started", "duration_ms", "error", "_token")
+
+    def __init__(self, trace: Optional["Trace"], name: str, parent_id: Optional[str] = None,
+                 attributes: Optional[Dict[str, Any]] = None):
+        self.trace = trace
+        self.span_id = uuid.uuid4().hex[:16] if trace else ""
+        self.parent_id = parent_id
+        self.name = name
+        self.attributes = attributes or {}
+        self.start_time = 0.0
+        self._started = 0.0
+        self.duration_ms: Optional[float] = None
+        self.error: Optional[str] = None
+        self._token = None
+
+    def set(self, **attributes: Any) -> None:
+        if self.trace:
+            self.attributes.update(attributes)
+
+    def __enter__(self) -> "Span":
+        if self.trace:
+            self.start_time = time.time()
+            self._started = time.perf_counter()
+            self.trace.spans.append(self)
+            self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if not self.trace:
+            return
+        self.duration_ms = round((time.perf_counter() - self._started) * 1000, 3)
+        if exc is not None:
+            self.error = f"{exc_type.__name__}: {exc}"
+        _current_span.reset(self._token)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start_offset_ms": round((self.start_time - self.trace.root.start_time) * 1000, 3),
+            "duration_ms": self.duration_ms,
+            "attributes": self.attributes,
+            "error": self.error
+        }
+
+
+# Handed out when no trace is active, so instrumented code never has to check
+_NOOP_SPAN = Span(None, "noop")
+
+
+class Trace:
+    def __init__(self, name: str, attributes: Optional[Dict[str, Any]] = None):
+        self.trace_id = uuid.uuid4().hex
+        self.spans: List[Span] = []
+        self.root = Span(self, name, attributes=attributes)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "name": self.root.name,
+            "start_time": datetime.utcfromtimestamp(self.root.start_time).isoformat(),
+            "duration_ms": self.root.duration_ms,
+            "spans": [span.to_dict() for span in self.spans]
+        }
+
+
+def build_tree(trace: Dict[str, Any]) -> Dict[str, Any]:
+    """Nest an exported trace's flat span list under its root span."""
+    nodes = {span["span_id"]: {**span, "children": []} for span in trace["spans"]}
+    roots = []
+    for node in nodes.values():
+        parent = nodes.get(node["parent_id"])
+        (parent["children"] if parent else roots).append(node)
+    return {key: value for key, value in trace.items() if key != "spans"} | {"root": roots[0] if roots else None}
+
+
+class Tracer:
+    """Appends finished traces to a JSONL file, rotated at ``max_bytes`` into ``backups``
+    numbered files, and keeps the latest ``buffer_size`` in memory. The file is written
+    by a background thread started on the first export."""
+
+    def __init__(self, path: str, max_bytes: int = 10_000_000, backups: int = 3,
+                 buffer_size: int = 200, enabled: bool = True):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.buffer_size = buffer_size
+        self.enabled = enabled
+        self._recent: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._file = None
+        # Exported traces waiting to be written; None stops the writer
+        self._queue: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue()
+        self._writer: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.logger = Logger("tracing")
+
+    def _rotate(self) -> None:
+        for n in range(self.backups - 1, 0, -1):
+            if os.path.exists(f"{self.path}.{n}"):
+                os.replace(f"{self.path}.{n}", f"{self.path}.{n + 1}")
+        if self.backups:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+
+    def export(self, trace: Trace) -> None:
+        data = trace.to_dict()
+        self._recent[trace.trace_id] = data
+        while len(self._recent) > self.buffer_size:
+            self._recent.popitem(last=False)
+
+        if self._writer is None:
+            with self._lock:
+                if self._writer is None:
+                    self._writer = threading.Thread(target=self._run, name="trace-writer", daemon=True)
+                    self._writer.start()
+        self._queue.put(data)
+
+    def _run(self) -> None:
+        while True:
+            data = self._queue.get()
+            try:
+                if data is None:
+                    return
+                self._write(json.dumps(data, default=str) + "\n")
+            except Exception as e:
+                # Losing a trace must not stop the writer
+                self.logger.warning("Trace export failed: %s", e, sample=100)
+            finally:
+                self._queue.task_done()
+
+    def _write(self, line: str) -> None:
+        if self._file is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            self._file = open(self.path, "a")
+        if self._file.tell() and self._file.tell() + len(line) > self.max_bytes:
+            self._file.close()
+            self._rotate()
+            self._file = open(self.path, "a")
+        self._file.write(line)
+        # One flush per burst of traces rather than one per trace
+        if self._queue.empty():
+            self._file.flush()
+
+    def flush(self) -> None:
+        """Wait until every exported trace has been written."""
+        if self._writer is not None:
+            self._queue.join()
+
+    def recent(self, limit: int = 50) -> List[Dict[str, Any]]:
+        return [
+            {"trace_id": t["trace_id"], "name": t["name"], "start_time": t["start_time"], "duration_ms": t["duration_ms"]}
+            for t in list(self._recent.values())[-limit:][::-1]
+        ]
+
+    def find(self, trace_id: str) -> Optional[Dict[str, Any]]:
+        """Look a trace up in memory, then in the JSONL file and its rotated backups.
+
+        Reads files and may wait for the writer, so call it off the event loop.
+        """
+        if trace_id in self._recent:
+            return self._recent[trace_id]
+        self.flush()
+        paths = [self.path] + [f"{self.path}.{n}" for n in range(1, self.backups + 1)]
+        for path in paths:
+            if not os.path.exists(path):
+                continue
+            with open(path, "r") as f:
+                for line in f:
+                    if trace_id in line:
+                        trace = json.loads(line)
+                        if trace.get("trace_id") == trace_id:
+                            return trace
+        return None
+
+    def close(self) -> None:
+        """Write what is queued, then stop the writer and close the file."""
+        with self._lock:
+            if self._writer is not None:
+                self._queue.put(None)
+                self._writer.join()
+                self._writer = None
+            if self._file:
+                self._file.close()
+                self._file = None
+
+
+tracer = Tracer(
+    settings.TRACE_FILE,
+    max_bytes=settings.TRACE_MAX_BYTES,
+    backups=settings.TRACE_BACKUPS,
+    buffer_size=settings.TRACE_BUFFER_SIZE,
+    enabled=settings.TRACE_ENABLED
+)
+atexit.register(lambda: tracer.close())
+
+
+class start_trace:
+    """Open a trace whose root span is current until the block ends, then export it."""
+
+    def __init__(self, name: str, **attributes: Any):
+        self.trace = Trace(name, attributes) if tracer.enabled else None
+
+    def __enter__(self) -> Optional[Trace]:
+        if self.trace:
+            self.trace.root.__enter__()
+        return self.trace
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if self.trace:
+            self.trace.root.__exit__(exc_type, exc, tb)
+            tracer.export(self.trace)
+
+
+def span(name: str, **attributes: Any) -> Span:
+    """Child span of the current span, or a no-op span outside a trace."""
+    parent = _current_span.get()
+    if parent is None:
+        return _NOOP_SPAN
+    return Span(parent.trace, name, parent.span_id, attributes)
+
+
+def current_trace_id() -> Optional[str]:
+    parent = _current_span.get()
+    return parent.trace.trace_id if parent else None
+
+
+def traced(name: str):
+    """Decorator wrapping an async function in a span."""
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            with span(name):
+                return await func(*args, **kwargs)
+        return wrapper
+    return decorator
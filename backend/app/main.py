@@ -1,17 +1,27 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 import uvicorn
 import os
 from datetime import datetime
 
 from app.config import settings
 from app.models.schemas import ContactMessage, LoginRequest, RegisterRequest
-from app.services.database import load_data, save_contact_messages, save_users, save_trips
+from app.services.database import load_data, save_contact_messages, save_users, save_trips, dashboard_stats
 from app.services.travel_service import TravelService
+from app.services.trip_index import past_trips
 from app.core.utils.helpers import generate_trip_id, calculate_trip_duration
+from app.core.utils.timing import start_timing, stage, server_timing_header
+from app.core.utils.tracing import start_trace, current_trace_id
+from app.core.utils.profiling import is_authorized, profile_request
+from app.core.utils import admission
 from app.api.routes.trip_routes import router as trip_router
 from app.api.routes.auth_routes import router as auth_router
 from app.api.routes.hotel_routes import router as hotel_router
+from app.api.routes.flight_routes import router as flight_router
+from app.api.routes.weather_routes import router as weather_router
+from app.api.routes.metrics_routes import router as metrics_router
+from app.api.routes.debug_routes import router as debug_router
 
 app = FastAPI(title=settings.PROJECT_NAME, version=settings.VERSION)
 
@@ -26,9 +36,61 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Scrapes, trace lookups and the docs would only crowd out the traces worth reading
+UNTRACED_PATHS = ("/metrics", f"{settings.API_V1_STR}/debug/", "/docs", "/openapi.json")
+
+# Innermost, so queued requests are still traced and shed ones show up as 503s
+@app.middleware("http")
+async def admit_requests(request: Request, call_next):
+    controller = admission.controllers.get(request.url.path)
+    if controller is None:
+        return await call_next(request)
+    try:
+        async with controller.admit():
+            return await call_next(request)
+    except admission.Overloaded as e:
+        return JSONResponse(
+            status_code=503,
+            content={"detail": str(e)},
+            headers={"Retry-After": str(e.retry_after)}
+        )
+
+DEBUG_ROUTES = f"{settings.API_V1_STR}/debug/"
+
+# Registered before trace_requests so it runs inside the trace and can link to it
+@app.middleware("http")
+async def profile_requests(request: Request, call_next):
+    # Reading profiles or traces sends the token too, and must not record (and prune) another profile
+    if request.url.path.startswith(DEBUG_ROUTES) or not is_authorized(request.headers.get("X-Profile-Token")):
+        return await call_next(request)
+    with profile_request(method=request.method, path=request.url.path, trace_id=current_trace_id()) as profile:
+        response = await call_next(request)
+        profile.meta["status_code"] = response.status_code
+    if profile.profile_id:
+        response.headers["X-Profile-Id"] = profile.profile_id
+    else:
+        response.headers["X-Profile-Status"] = "busy"
+    return response
+
+@app.middleware("http")
+async def trace_requests(request: Request, call_next):
+    if request.url.path.startswith(UNTRACED_PATHS):
+        return await call_next(request)
+    with start_trace(f"{request.method} {request.url.path}") as trace:
+        response = await call_next(request)
+        if trace:
+            trace.root.set(status_code=response.status_code)
+    if trace:
+        response.headers["X-Trace-Id"] = trace.trace_id
+    return response
+
 app.include_router(trip_router, prefix=settings.API_V1_STR)
 app.include_router(auth_router, prefix=settings.API_V1_STR)
 app.include_router(hotel_router)
+app.include_router(flight_router, prefix=settings.API_V1_STR)
+app.include_router(weather_router, prefix=settings.API_V1_STR)
+app.include_router(metrics_router)
+app.include_router(debug_router, prefix=settings.API_V1_STR)
 
 @app.get("/")
 async def root():
@@ -71,23 +133,13 @@ async def get_trips():
 @app.get("/api/v1/dashboard/stats")
 async def get_dashboard_stats():
     trips, contact_messages, users = load_data()
-    total_revenue = sum(trip.get('cost_breakdown', {}).get('total', 0) for trip in trips)
-    return {
-        "success": True,
-        "data": {
-            "total_revenue": total_revenue,
-            "total_users": len(users),
-            "total_trips": len(trips),
-            "total_messages": len(contact_messages),
-            "completed_bookings": len(trips),
-            "pending_bookings": 0
-        }
-    }
+    return {"success": True, "data": dashboard_stats(trips, contact_messages, users)}
 
 # Authentication endpoints are now handled by auth_routes.py
 
 @app.post("/api/v1/plan-trip")
-async def plan_trip(trip_request: dict):
+async def plan_trip(trip_request: dict, response: Response):
+    timings = start_timing()
     try:
         # Convert frontend field names to backend format with timestamp
         from datetime import datetime
@@ -99,6 +151,7 @@ async def plan_trip(trip_request: dict):
             "travelers": trip_request.get("travelers", 1),
             "interests": trip_request.get("interests", []),
             "from": trip_request.get("from", ""),
+            "flex_days": trip_request.get("flexDays", 0),
             "travel_style": trip_request.get("travelStyle", "mid-range"),
             "accommodation": trip_request.get("accommodation", "hotel"),
             "transportation": trip_request.get("transportation", "flight"),
@@ -107,6 +160,9 @@ async def plan_trip(trip_request: dict):
             "special_requests": trip_request.get("specialRequests", ""),
             "timestamp": datetime.utcnow().isoformat()
         }
+        if trip_request.get("sessionId"):
+            # Scopes what the agents remember about this planning session
+            backend_request["session_id"] = str(trip_request["sessionId"])
         
         # Plan the trip using travel service
         result = await travel_service.plan_trip(backend_request)
@@ -119,7 +175,8 @@ async def plan_trip(trip_request: dict):
         summary = result.get("summary", {})
         
         # Save trip to database with enhanced information
-        trips, _, _ = load_data()
+        with stage("persistence"):
+            trips, _, _ = load_data()
         trip_data = {
             "id": len(trips) + 1,
             "from": backend_request.get("from", ""),
@@ -155,24 +212,30 @@ async def plan_trip(trip_request: dict):
                 "itinerary_generation": itinerary.get("api_sources", {}),
                 "summary_generation": summary.get("api_sources_used", {})
             },
-            "ai_enhanced": True,
+            "ai_enhanced": not result.get("degraded", False),
+            "degraded": result.get("degraded", False),
             "created_at": datetime.utcnow().isoformat()
         }
         
-        trips.append(trip_data)
-        save_trips(trips)
+        with stage("persistence"):
+            trips.append(trip_data)
+            save_trips(trips)
+            past_trips.add(trip_data)
+        if trip_data["degraded"]:
+            travel_service.schedule_itinerary_upgrade(trip_data["id"], backend_request, result.get("research", {}))
         
         # Get weather and hotel data directly
         from app.core.tools.weather_tool import WeatherTool
         from app.core.tools.hotel_tool import HotelTool
         weather_tool = WeatherTool()
         hotel_tool = HotelTool()
-        weather_data = await weather_tool.get_weather(trip_request.get("destination", ""))
-        hotel_data = await hotel_tool.search_hotels(
-            backend_request.get("destination", ""),
-            backend_request.get("start_date"),
-            backend_request.get("end_date")
-        )
+        with stage("enrichment"):
+            weather_data = await weather_tool.get_weather(trip_request.get("destination", ""))
+            hotel_data = await hotel_tool.search_hotels(
+                backend_request.get("destination", ""),
+                backend_request.get("start_date"),
+                backend_request.get("end_date")
+            )
         
         # Enhanced response with API source information
         enhanced_result = {
@@ -196,6 +259,7 @@ async def plan_trip(trip_request: dict):
             "hotel_recommendations": hotel_recommendations
         }
         
+        response.headers["Server-Timing"] = server_timing_header(timings)
         return {"success": True, "data": enhanced_result}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -30,7 +30,7 @@ class AIService:
                 "sources": [item["doc_id"] for item in relevant_info]
             }
         except Exception as e:
-            self.logger.error(f"Error processing query: {str(e)}")
+            self.logger.error("Error processing query: %s", e)
             return {"response": "I'm sorry, I couldn't process your request.", "confidence": 0.0, "sources": []}
     
     async def _handle_weather_query(self, query: str, context: Dict[str, Any]) -> str:
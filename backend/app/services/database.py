@@ -1,46 +1,59 @@
 import json
 import os
+import time
+from ..core.utils.metrics import STORAGE_SECONDS
+from ..core.utils.tracing import span
 
 TRIPS_FILE = "trips.json"
 CONTACT_FILE = "contact_messages.json"
 USERS_FILE = "users.json"
 
-def load_data():
-    trips = []
-    contact_messages = []
-    users = []
-    
-    if os.path.exists(TRIPS_FILE):
-        try:
-            with open(TRIPS_FILE, 'r') as f:
-                trips = json.load(f)
-        except:
-            trips = []
-    
-    if os.path.exists(CONTACT_FILE):
+def _read(path):
+    if not os.path.exists(path):
+        return []
+    name = os.path.basename(path)
+    started = time.perf_counter()
+    with span("storage.read", file=name):
         try:
-            with open(CONTACT_FILE, 'r') as f:
-                contact_messages = json.load(f)
+            with open(path, 'r') as f:
+                return json.load(f)
         except:
-            contact_messages = []
-    
-    if os.path.exists(USERS_FILE):
+            return []
+        finally:
+            STORAGE_SECONDS.labels("read", name).observe(time.perf_counter() - started)
+
+def _write(path, records):
+    name = os.path.basename(path)
+    started = time.perf_counter()
+    with span("storage.write", file=name, records=len(records)):
         try:
-            with open(USERS_FILE, 'r') as f:
-                users = json.load(f)
-        except:
-            users = []
-    
+            with open(path, 'w') as f:
+                json.dump(records, f, indent=2)
+        finally:
+            STORAGE_SECONDS.labels("write", name).observe(time.perf_counter() - started)
+
+def load_data():
+    trips = _read(TRIPS_FILE)
+    contact_messages = _read(CONTACT_FILE)
+    users = _read(USERS_FILE)
     return trips, contact_messages, users
 
 def save_trips(trips):
-    with open(TRIPS_FILE, 'w') as f:
-        json.dump(trips, f, indent=2)
+    _write(TRIPS_FILE, trips)
 
 def save_contact_messages(contact_messages):
-    with open(CONTACT_FILE, 'w') as f:
-        json.dump(contact_messages, f, indent=2)
+    _write(CONTACT_FILE, contact_messages)
 
 def save_users(users):
-    with open(USERS_FILE, 'w') as f:
-        json.dump(users, f, indent=2)
\ No newline at end of file
+    _write(USERS_FILE, users)
+
+def dashboard_stats(trips, contact_messages, users):
+    total_revenue = sum(trip.get('cost_breakdown', {}).get('total', 0) for trip in trips)
+    return {
+        "total_revenue": total_revenue,
+        "total_users": len(users),
+        "total_trips": len(trips),
+        "total_messages": len(contact_messages),
+        "completed_bookings": len(trips),
+        "pending_bookings": 0
+    }
\ No newline at end of file
@@ -7,29 +7,77 @@ from typing import Dict, Any, List
 import json
 import os
 from datetime import datetime
-from ..core.tools.hotel_tool import HotelTool
+from ..config import settings
+from ..core.tools.hotel_tool import HotelTool, is_fallback
+from ..core.tools.hotel_config import HOTEL_CONFIG
+from ..core.tools.hotel_index import HotelIndex
+from ..core.tools.hotel_summary import summarize_hotels
+from ..core.utils.cache import TTLCache
+from ..core.utils.metrics import track_upstream
+from ..core.utils.logger import Logger
+
+# Destination search results shared by every HotelService instance
+_hotel_index_cache = TTLCache(settings.HOTEL_CACHE_TTL, maxsize=256, name="hotel_index")
 
 class HotelService:
     def __init__(self):
         self.hotel_tool = HotelTool()
         self.trips_file = "trips.json"
+        self.logger = Logger("hotel_service")
     
-    async def search_and_format_hotels(self, destination: str, check_in: str = None, 
-                                     check_out: str = None, travelers: int = 2) -> Dict[str, Any]:
-        """Search hotels and format for frontend consumption."""
-        try:
+    async def get_hotel_index(self, destination: str, check_in: str = None, check_out: str = None,
+                              travelers: int = 2) -> HotelIndex:
+        """Return the cached columnar index for a search, querying the upstream API on a miss."""
+        key = (destination.strip().lower(), check_in, check_out, travelers)
+        
+        async def load() -> HotelIndex:
             hotels = await self.hotel_tool.search_hotels(
                 location=destination,
                 check_in=check_in,
                 check_out=check_out,
                 adults=travelers,
-                rooms=max(1, travelers // 2)
+                rooms=max(1, travelers // 2),
+                pages=settings.HOTEL_SEARCH_PAGES,
+                limit=HOTEL_CONFIG.MAX_RESULTS_LIMIT
+            )
+            return HotelIndex(hotels)
+        
+        def ttl(index: HotelIndex) -> float:
+            # Placeholders from a failed search (rate limit, timeout) are only kept long
+            # enough to stop hammering the API, not for the full cache lifetime
+            return settings.HOTEL_FALLBACK_TTL if is_fallback(index.hotels) else settings.HOTEL_CACHE_TTL
+        
+        if key in _hotel_index_cache:
+            with track_upstream("rapidapi", "cached"):
+                return await _hotel_index_cache.get_or_load(key, load, ttl)
+        return await _hotel_index_cache.get_or_load(key, load, ttl)
+    
+    async def search_and_format_hotels(self, destination: str, check_in: str = None, 
+                                     check_out: str = None, travelers: int = 2,
+                                     min_price: float = None, max_price: float = None,
+                                     min_rating: float = None, amenities: List[str] = None,
+                                     sort: str = "rating", limit: int = None) -> Dict[str, Any]:
+        """Search hotels and format for frontend consumption.
+        
+        Filters and sorting run against the cached index, so narrowing an earlier
+        search does not reach the upstream API again.
+        """
+        try:
+            index = await self.get_hotel_index(destination, check_in, check_out, travelers)
+            rows = index.rows(
+                min_price=min_price,
+                max_price=max_price,
+                min_rating=min_rating,
+                amenities=amenities,
+                sort=sort,
+                limit=limit
             )
             
             return {
                 "success": True,
-                "hotels": hotels,
-                "summary": self._create_hotel_summary(hotels),
+                "hotels": [index.hotels[row] for row in rows],
+                "summary": summarize_hotels(index, rows),
+                "total_available": len(index),
                 "api_source": "RapidAPI Booking.com"
             }
         except Exception as e:
@@ -40,33 +88,6 @@ class HotelService:
                 "summary": None
             }
     
-    def _create_hotel_summary(self, hotels: List[Dict]) -> Dict[str, Any]:
-        """Create hotel summary for trip highlights."""
-        if not hotels:
-            return {"available": False}
-        
-        # Find best hotel by rating
-        best_hotel = max(hotels, key=lambda x: x.get('rating', 0))
-        
-        # Calculate price statistics
-        prices = [h.get('price_per_night', 0) for h in hotels if h.get('price_per_night', 0) > 0]
-        
-        return {
-            "available": True,
-            "total_hotels": len(hotels),
-            "best_hotel": {
-                "name": best_hotel.get('name'),
-                "rating": best_hotel.get('rating'),
-                "price": best_hotel.get('price_per_night'),
-                "currency": best_hotel.get('currency', 'USD')
-            },
-            "price_range": {
-                "min": min(prices) if prices else 0,
-                "max": max(prices) if prices else 0,
-                "average": round(sum(prices) / len(prices), 2) if prices else 0
-            }
-        }
-    
     def update_trip_with_hotels(self, trip_id: int, hotel_data: Dict[str, Any]) -> bool:
         """Update existing trip with hotel information."""
         try:
@@ -114,7 +135,7 @@ class HotelService:
             return True
             
         except Exception as e:
-            print(f"Error updating trip with hotels: {e}")
+            self.logger.error("Error updating trip with hotels: %s", e)
             return False
     
     def get_recent_hotel_searches(self, limit: int = 5) -> List[Dict[str, Any]]:
@@ -141,7 +162,7 @@ class HotelService:
             return recent_hotels
             
         except Exception as e:
-            print(f"Error getting recent hotel searches: {e}")
+            self.logger.error("Error getting recent hotel searches: %s", e)
             return []
     
     async def get_hotel_details_for_frontend(self, hotel_id: str) -> Dict[str, Any]:
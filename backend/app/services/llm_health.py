@@ -0,0 +1,118 @@
+"""
+LLM Health
+Tracks how the LLM provider is coping - queue wait for a completion slot, error rate
+and latency over recent calls - and decides when new plans should skip it and use
+the local template itinerary instead. Once tripped, degraded mode holds for a
+cooldown, after which calls go to the LLM again and the window starts afresh.
+A caller that cannot get a slot within its timeout gets ``SlotTimeout`` and trips
+degraded mode at once, so requests already queued when the LLM browns out fall back too.
+
+Background work (upgrading degraded plans) should only start a call when
+``has_headroom()``: no one is queued, a slot is free and no threshold is close.
+"""
+
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Deque, Optional, Tuple
+
+from ..config import settings
+
+
+class SlotTimeout(Exception):
+    """No completion slot came free within the caller's timeout."""
+
+
+class LLMHealth:
+    def __init__(self, max_concurrency: int = 8, window: int = 20, min_samples: int = 5,
+                 max_error_rate: float = 0.5, max_latency: float = 20.0,
+                 max_queue_wait: float = 5.0, cooldown: float = 30.0):
+        self.max_concurrency = max_concurrency
+        self.min_samples = min_samples
+        self.max_error_rate = max_error_rate
+        self.max_latency = max_latency
+        self.max_queue_wait = max_queue_wait
+        self.cooldown = cooldown
+        self.waiting = 0
+        self.active = 0
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        # (succeeded, seconds) for the most recent calls
+        self._outcomes: Deque[Tuple[bool, float]] = deque(maxlen=window)
+        # Survives the window reset so queue wait can still be estimated after a cooldown
+        self._mean_latency = 0.0
+        self._degraded_until = 0.0
+        self._reason: Optional[str] = None
+
+    @asynccontextmanager
+    async def slot(self, timeout: Optional[float] = None) -> AsyncIterator[None]:
+        """Hold one of ``max_concurrency`` completion slots, waiting at most ``timeout``
+        seconds (None for no limit) before raising SlotTimeout."""
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout)
+        except asyncio.TimeoutError:
+            self._trip("queue_wait", time.monotonic())
+            raise SlotTimeout(f"No LLM slot free within {timeout}s") from None
+        finally:
+            self.waiting -= 1
+        self.active += 1
+        try:
+            yield
+        finally:
+            self.active -= 1
+            self._semaphore.release()
+
+    def record(self, succeeded: bool, seconds: float) -> None:
+        self._outcomes.append((succeeded, seconds))
+        # Failures and timeouts hold a slot just as long, so they count towards queue wait
+        self._mean_latency = seconds if not self._mean_latency else 0.8 * self._mean_latency + 0.2 * seconds
+
+    def expected_queue_wait(self) -> float:
+        return self.waiting * self._mean_latency / self.max_concurrency
+
+    def _evaluate(self, margin: float = 1.0) -> Optional[str]:
+        """The first threshold exceeded once each is scaled by ``margin``."""
+        if self.expected_queue_wait() > margin * self.max_queue_wait:
+            return "queue_wait"
+        if len(self._outcomes) < self.min_samples:
+            return None
+        failures = sum(1 for succeeded, _ in self._outcomes if not succeeded)
+        if failures / len(self._outcomes) > margin * self.max_error_rate:
+            return "error_rate"
+        latencies = sorted(seconds for succeeded, seconds in self._outcomes if succeeded)
+        if latencies and latencies[int(0.9 * (len(latencies) - 1))] > margin * self.max_latency:
+            return "latency"
+        return None
+
+    def _trip(self, reason: str, now: float) -> None:
+        self._reason = reason
+        self._degraded_until = now + self.cooldown
+        self._outcomes.clear()
+
+    def degraded_reason(self) -> Optional[str]:
+        """Why new plans should use the template engine right now, or None."""
+        now = time.monotonic()
+        if now < self._degraded_until:
+            return self._reason
+        reason = self._evaluate()
+        if reason:
+            self._trip(reason, now)
+        return reason
+
+    def has_headroom(self, margin: float = 0.5) -> bool:
+        """Whether a low-priority call can start without delaying live traffic: not
+        degraded, nothing queued, a free slot, and every threshold at under ``margin``."""
+        return (self.degraded_reason() is None and self.waiting == 0
+                and self.active < self.max_concurrency and self._evaluate(margin) is None)
+
+
+llm_health = LLMHealth(
+    max_concurrency=settings.LLM_MAX_CONCURRENCY,
+    window=settings.LLM_DEGRADE_WINDOW,
+    min_samples=settings.LLM_DEGRADE_MIN_SAMPLES,
+    max_error_rate=settings.LLM_DEGRADE_ERROR_RATE,
+    max_latency=settings.LLM_DEGRADE_LATENCY,
+    max_queue_wait=settings.LLM_DEGRADE_QUEUE_WAIT,
+    cooldown=settings.LLM_DEGRADE_COOLDOWN
+)
@@ -1,20 +1,30 @@
 from openai import OpenAI
-import os
+import asyncio
+import time
 from typing import Dict, Any, List
 from dotenv import load_dotenv
+from ..config import settings, upstream_url, upstream_key
+from ..core.utils.metrics import LLM_REQUEST_SECONDS, LLM_TOKENS, PAST_TRIP_LOOKUPS, PLANS_DEGRADED
+from ..core.utils.tracing import span
+from ..core.utils.logger import Logger
+from ..core.tools.activity_catalog import activity_type, build_daily_plan, describe_activity
+from .llm_health import SlotTimeout, llm_health
+from .trip_index import LLM_SOURCE, PAST_TRIP_SOURCE, PastTrip, past_trips
 
 load_dotenv()
 
 class OpenAIService:
     def __init__(self):
-        self.api_key = os.getenv("OPENAI_API_KEY")
+        self.api_key = upstream_key("OPENAI_API_KEY")
         self.client = OpenAI(
-            base_url="https://openrouter.ai/api/v1",
+            base_url=upstream_url("openrouter", "https://openrouter.ai/api/v1"),
             api_key=self.api_key,
         ) if self.api_key else None
+        self.logger = Logger("openai_service")
     
-    async def generate_itinerary(self, trip_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Generate detailed itinerary using OpenAI"""
+    async def generate_itinerary(self, trip_data: Dict[str, Any], allow_degraded: bool = True) -> Dict[str, Any]:
+        """Generate detailed itinerary using OpenAI, or the template engine while the LLM is
+        degraded (unless ``allow_degraded`` is False)."""
         try:
             destination = trip_data.get("destination", "Unknown")
             duration = trip_data.get("duration", 3)
@@ -26,81 +36,121 @@ class OpenAIService:
             preferences = trip_data.get("preferences", {})
             
             if not self.api_key:
-                print("No OpenAI API key found")
+                self.logger.warning("No OpenAI API key found", sample=100)
                 return self._get_mock_itinerary(trip_data)
             
-            print(f"Using OpenAI API key: {self.api_key[:20]}...")
+            # Before the degraded check: reusing a past LLM itinerary needs no LLM call
+            past = past_trips.find(trip_data) if settings.PAST_TRIP_RETRIEVAL else None
+            if past and past_trips.reusable(trip_data, *past):
+                PAST_TRIP_LOOKUPS.labels("reused").inc()
+                return self._get_past_trip_itinerary(trip_data, *past)
             
-            # Create comprehensive prompt for OpenAI
-            prompt = f"""
-            Create a detailed {duration}-day travel itinerary for {destination}.
+            reason = llm_health.degraded_reason() if allow_degraded else None
+            if reason:
+                PLANS_DEGRADED.labels(reason).inc()
+                self.logger.warning("LLM degraded (%s), using template itinerary", reason, sample=20)
+                return self._get_degraded_itinerary(trip_data, reason)
+            PAST_TRIP_LOOKUPS.labels("exemplar" if past else "miss").inc()
             
-            Trip Details:
-            - Duration: {duration} days
-            - Budget: ${budget} total
-            - Travelers: {travelers} people
-            - Travel Style: {travel_style}
-            - Interests: {', '.join(interests) if interests else 'general exploration'}
-            - Weather: {weather.get('condition', 'Pleasant')} {weather.get('temperature', '22°C')}
-            - Special Requests: {preferences.get('special_requests', 'None')}
+            if past:
+                # A similar past itinerary stands in for the worked example and most instructions
+                prompt = self._past_trip_prompt(trip_data, past[0])
+                max_tokens = settings.PAST_TRIP_MAX_TOKENS
+            else:
+                # Create comprehensive prompt for OpenAI
+                prompt = f"""
+                Create a detailed {duration}-day travel itinerary for {destination}.
             
-            For each day, provide:
-            1. Morning activity (9 AM - 12 PM) with specific location and cost
-            2. Afternoon activity (1 PM - 5 PM) with specific location and cost  
-            3. Evening activity (6 PM - 9 PM) with specific location and cost
-            4. Daily estimated cost breakdown
+                Trip Details:
+                - Duration: {duration} days
+                - Budget: ${budget} total
+                - Travelers: {travelers} people
+                - Travel Style: {travel_style}
+                - Interests: {', '.join(interests) if interests else 'general exploration'}
+                - Weather: {weather.get('condition', 'Pleasant')} {weather.get('temperature', '22°C')}
+                - Special Requests: {preferences.get('special_requests', 'None')}
             
-            Make each day unique and progressive. Include:
-            - Specific attraction names, restaurants, and locations
-            - Realistic cost estimates in USD
-            - Local transportation suggestions
-            - Cultural insights and tips
-            - Food recommendations
+                For each day, provide:
+                1. Morning activity (9 AM - 12 PM) with specific location and cost
+                2. Afternoon activity (1 PM - 5 PM) with specific location and cost  
+                3. Evening activity (6 PM - 9 PM) with specific location and cost
+                4. Daily estimated cost breakdown
             
-            IMPORTANT: Respond ONLY with valid JSON in this exact format:
-            {{
-                "daily_plan": [
-                    {{
-                        "day": 1,
-                        "morning": "Visit Swayambhunath Temple (Monkey Temple) for sunrise views and spiritual experience",
-                        "afternoon": "Explore Kathmandu Durbar Square with guided tour of ancient palaces", 
-                        "evening": "Traditional Nepali dinner with cultural dance show at Bhojan Griha",
-                        "estimated_cost": 85
-                    }},
-                    {{
-                        "day": 2,
-                        "morning": "Early morning flight to Pokhara and lakeside exploration",
-                        "afternoon": "Boating on Phewa Lake with views of Annapurna mountains",
-                        "evening": "Sunset from Sarangkot viewpoint with paragliding option",
-                        "estimated_cost": 120
-                    }}
-                ],
-                "recommendations": ["Book domestic flights early", "Carry cash for local markets", "Respect religious customs"]
-            }}
+                Make each day unique and progressive. Include:
+                - Specific attraction names, restaurants, and locations
+                - Realistic cost estimates in USD
+                - Local transportation suggestions
+                - Cultural insights and tips
+                - Food recommendations
             
-            Generate {duration} days exactly. Be specific with locations, costs, and activities.
-            """
+                IMPORTANT: Respond ONLY with valid JSON in this exact format:
+                {{
+                    "daily_plan": [
+                        {{
+                            "day": 1,
+                            "morning": "Visit Swayambhunath Temple (Monkey Temple) for sunrise views and spiritual experience",
+                            "afternoon": "Explore Kathmandu Durbar Square with guided tour of ancient palaces", 
+                            "evening": "Traditional Nepali dinner with cultural dance show at Bhojan Griha",
+                            "estimated_cost": 85
+                        }},
+                        {{
+                            "day": 2,
+                            "morning": "Early morning flight to Pokhara and lakeside exploration",
+                            "afternoon": "Boating on Phewa Lake with views of Annapurna mountains",
+                            "evening": "Sunset from Sarangkot viewpoint with paragliding option",
+                            "estimated_cost": 120
+                        }}
+                    ],
+                    "recommendations": ["Book domestic flights early", "Carry cash for local markets", "Respect religious customs"]
+                }}
+            
+                Generate {duration} days exactly. Be specific with locations, costs, and activities.
+                """
+                max_tokens = 2000
             
             # Use OpenRouter API with DeepSeek model
-            print("Making OpenRouter API request...")
+            self.logger.debug("Making OpenRouter API request")
             try:
-                completion = self.client.chat.completions.create(
-                    extra_headers={
-                        "HTTP-Referer": "https://travel-assistant.com",
-                        "X-Title": "Travel Assistant System",
-                    },
-                    model="deepseek/deepseek-chat-v3.1",
-                    messages=[
-                        {"role": "system", "content": "You are an expert travel planner who creates detailed, personalized itineraries with specific locations, activities, and realistic costs."},
-                        {"role": "user", "content": prompt}
-                    ],
-                    max_tokens=2000,
-                    temperature=0.7
-                )
+                model = "deepseek/deepseek-chat-v3.1"
+                with span("llm.chat_completion", model=model) as llm_span:
+                    started = time.perf_counter()
+                    try:
+                        # Bounded only when a template plan can stand in, so plan latency stays bounded
+                        async with llm_health.slot(settings.LLM_DEGRADE_QUEUE_WAIT if allow_degraded else None):
+                            started = time.perf_counter()
+                            # The OpenAI client is synchronous; keep it off the event loop
+                            completion = await asyncio.wait_for(asyncio.to_thread(
+                                self.client.chat.completions.create,
+                                extra_headers={
+                                    "HTTP-Referer": "https://travel-assistant.com",
+                                    "X-Title": "Travel Assistant System",
+                                },
+                                model=model,
+                                messages=[
+                                    {"role": "system", "content": "You are an expert travel planner who creates detailed, personalized itineraries with specific locations, activities, and realistic costs."},
+                                    {"role": "user", "content": prompt}
+                                ],
+                                max_tokens=max_tokens,
+                                temperature=0.7,
+                                # Frees the worker thread too; wait_for alone would leave it blocked
+                                timeout=settings.LLM_TIMEOUT
+                            ), settings.LLM_TIMEOUT)
+                    except SlotTimeout:
+                        raise
+                    except Exception:
+                        llm_health.record(False, time.perf_counter() - started)
+                        LLM_REQUEST_SECONDS.labels(model, "error").observe(time.perf_counter() - started)
+                        raise
+                    llm_health.record(True, time.perf_counter() - started)
+                    LLM_REQUEST_SECONDS.labels(model, "ok").observe(time.perf_counter() - started)
+                    usage = getattr(completion, "usage", None)
+                    if usage:
+                        LLM_TOKENS.labels(model, "prompt").inc(usage.prompt_tokens or 0)
+                        LLM_TOKENS.labels(model, "completion").inc(usage.completion_tokens or 0)
+                        llm_span.set(prompt_tokens=usage.prompt_tokens, completion_tokens=usage.completion_tokens)
                 
                 ai_response = completion.choices[0].message.content
-                print(f"OpenRouter Response received: {len(ai_response)} characters")
-                print(f"First 200 chars: {ai_response[:200]}...")
+                self.logger.debug("OpenRouter response received: %d characters", len(ai_response), sample=20)
                 
                 # Try to parse JSON first
                 import json
@@ -126,17 +176,18 @@ class OpenAIService:
                     parsed_json = json.loads(clean_response)
                     daily_plan = parsed_json.get("daily_plan", [])
                     recommendations = parsed_json.get("recommendations", [])
-                    print("Successfully parsed JSON response")
+                    self.logger.debug("Parsed JSON itinerary response")
                 except (json.JSONDecodeError, AttributeError):
-                    print("JSON parsing failed, using text parsing")
+                    self.logger.info("JSON parsing failed, using text parsing", sample=10)
                     daily_plan = self._parse_text_response(ai_response, duration, destination, interests)
                     recommendations = self._extract_recommendations_from_text(ai_response)
                 
-                print(f"Generated {len(daily_plan)} days of activities")
+                self.logger.debug("Generated %d days of activities", len(daily_plan))
                 
                 return {
                     "itinerary_generated": True,
-                    "api_source": "DeepSeek Chat v3.1 via OpenRouter",
+                    "api_source": LLM_SOURCE,
+                    "past_trip_id": past[0].trip_id if past else None,
                     "destination": destination,
                     "duration": duration,
                     "ai_content": ai_response,
@@ -145,12 +196,17 @@ class OpenAIService:
                     "recommendations": recommendations
                 }
                     
+            except SlotTimeout:
+                PLANS_DEGRADED.labels("queue_wait").inc()
+                self.logger.warning("No LLM slot within %ss, using template itinerary",
+                                    settings.LLM_DEGRADE_QUEUE_WAIT, sample=20)
+                return self._get_degraded_itinerary(trip_data, "queue_wait")
             except Exception as api_error:
-                print(f"OpenRouter API Request Error: {api_error}")
+                self.logger.error("OpenRouter API request error: %s", api_error)
                 raise Exception(f"Failed to get DeepSeek response: {api_error}")
                 
         except Exception as e:
-            print(f"OpenRouter Service Error: {e}")
+            self.logger.error("OpenRouter service error: %s", e)
             # Force use of DeepSeek - no fallback to mock data
             raise Exception(f"DeepSeek API is required but failed: {e}")
     
@@ -240,120 +296,16 @@ class OpenAIService:
         return activities
     
     def _generate_dynamic_activities(self, destination: str, duration: int, interests: List[str]) -> List[Dict[str, Any]]:
-        """Generate dynamic daily activities based on destination and interests"""
-        activities = []
-        
-        # Dynamic activity templates based on interests and destination
-        base_activities = {
-            "culture": ["Visit museums and galleries", "Explore historic districts", "Attend cultural performances"],
-            "adventure": ["Hiking and outdoor activities", "Adventure sports", "Nature exploration"],
-            "food": ["Food tours and tastings", "Cooking classes", "Local market visits"],
-            "nature": ["Parks and gardens", "Scenic viewpoints", "Wildlife watching"],
-            "shopping": ["Local markets", "Shopping districts", "Artisan workshops"]
-        }
-        
-        # Create varied activities for each day
-        activity_themes = [
-            "arrival and orientation", "cultural immersion", "adventure and nature", 
-            "local experiences", "hidden gems", "relaxation and wellness",
-            "shopping and markets", "historical exploration", "culinary journey", "farewell activities"
-        ]
-        
-        for day in range(1, duration + 1):
-            theme = activity_themes[min(day - 1, len(activity_themes) - 1)]
-            
-            # Create unique, detailed activities
-            morning_activity = self._create_detailed_activity(destination, interests, 'morning', theme, day)
-            afternoon_activity = self._create_detailed_activity(destination, interests, 'afternoon', theme, day)
-            evening_activity = self._create_detailed_activity(destination, interests, 'evening', theme, day)
-            
-            activities.append({
-                "day": day,
-                "morning": morning_activity,
-                "afternoon": afternoon_activity,
-                "evening": evening_activity,
-                "estimated_cost": 80 + (day * 20)
-            })
-        
-        return activities
+        """Generate dynamic daily activities from the precompiled activity catalog"""
+        return build_daily_plan(destination, duration)
     
     def _get_activity_type(self, interests: List[str], time_of_day: str) -> str:
         """Get activity type based on interests and time of day"""
-        if not interests:
-            return "main attractions"
-        
-        activity_map = {
-            "morning": {
-                "culture": "museums and historic sites",
-                "adventure": "outdoor adventures",
-                "food": "local breakfast spots",
-                "nature": "parks and gardens",
-                "shopping": "morning markets"
-            },
-            "afternoon": {
-                "culture": "cultural districts",
-                "adventure": "adventure activities",
-                "food": "food tours",
-                "nature": "scenic viewpoints",
-                "shopping": "shopping areas"
-            },
-            "evening": {
-                "culture": "cultural performances",
-                "adventure": "sunset activities",
-                "food": "dining experiences",
-                "nature": "evening walks",
-                "shopping": "night markets"
-            }
-        }
-        
-        for interest in interests:
-            if interest in activity_map.get(time_of_day, {}):
-                return activity_map[time_of_day][interest]
-        
-        return "local attractions"
+        return activity_type(interests, time_of_day)
     
     def _create_detailed_activity(self, destination: str, interests: List[str], time_of_day: str, theme: str, day: int) -> str:
         """Create detailed activity descriptions"""
-        activity_details = {
-            "morning": {
-                "arrival and orientation": f"Arrive in {destination}, check-in, and explore the city center",
-                "cultural immersion": f"Visit {destination}'s main museums and cultural sites",
-                "adventure and nature": f"Early morning hike or nature walk in {destination}",
-                "local experiences": f"Join a local morning market tour in {destination}",
-                "hidden gems": f"Discover lesser-known attractions in {destination}",
-                "relaxation and wellness": f"Morning yoga or spa session in {destination}",
-                "shopping and markets": f"Explore traditional markets and local crafts in {destination}",
-                "historical exploration": f"Tour historical landmarks and monuments in {destination}",
-                "culinary journey": f"Food walking tour and cooking class in {destination}",
-                "farewell activities": f"Final sightseeing and souvenir shopping in {destination}"
-            },
-            "afternoon": {
-                "arrival and orientation": f"Walking tour of {destination}'s main attractions",
-                "cultural immersion": f"Explore traditional neighborhoods in {destination}",
-                "adventure and nature": f"Outdoor adventure activities around {destination}",
-                "local experiences": f"Hands-on cultural workshop in {destination}",
-                "hidden gems": f"Visit off-the-beaten-path locations in {destination}",
-                "relaxation and wellness": f"Leisure time at parks or wellness centers in {destination}",
-                "shopping and markets": f"Shopping districts and local boutiques in {destination}",
-                "historical exploration": f"Deep dive into {destination}'s historical sites",
-                "culinary journey": f"Restaurant hopping and local food tasting in {destination}",
-                "farewell activities": f"Last-minute exploration and photo opportunities in {destination}"
-            },
-            "evening": {
-                "arrival and orientation": f"Welcome dinner at a traditional restaurant in {destination}",
-                "cultural immersion": f"Traditional cultural show or performance in {destination}",
-                "adventure and nature": f"Sunset viewing and evening nature activities in {destination}",
-                "local experiences": f"Evening with local families or community events in {destination}",
-                "hidden gems": f"Discover {destination}'s secret evening spots",
-                "relaxation and wellness": f"Evening relaxation and wellness activities in {destination}",
-                "shopping and markets": f"Night markets and evening shopping in {destination}",
-                "historical exploration": f"Evening historical walking tour in {destination}",
-                "culinary journey": f"Fine dining experience featuring {destination}'s cuisine",
-                "farewell activities": f"Farewell dinner and departure preparations in {destination}"
-            }
-        }
-        
-        return activity_details.get(time_of_day, {}).get(theme, f"{time_of_day.title()} activities in {destination}")
+        return describe_activity(destination, time_of_day, theme)
     
     def _extract_recommendations_from_text(self, text: str) -> List[str]:
         """Extract recommendations from AI text response"""
@@ -398,6 +350,48 @@ class OpenAIService:
             ]
         }
     
+    def _get_degraded_itinerary(self, trip_data: Dict[str, Any], reason: str) -> Dict[str, Any]:
+        itinerary = self._get_mock_itinerary(trip_data)
+        itinerary.update({
+            "api_source": "Template Engine (LLM degraded)",
+            "degraded": True,
+            "degraded_reason": reason
+        })
+        return itinerary
+
+    def _get_past_trip_itinerary(self, trip_data: Dict[str, Any], past: PastTrip, similarity: float) -> Dict[str, Any]:
+        duration = trip_data.get("duration", 3)
+        daily_plan = past.adapted_plan(duration)
+        self.logger.info("Reusing itinerary of past trip %s (similarity %.2f)", past.trip_id, similarity, sample=10)
+        return {
+            "itinerary_generated": True,
+            "api_source": PAST_TRIP_SOURCE,
+            "past_trip_id": past.trip_id,
+            "past_trip_similarity": round(similarity, 3),
+            "destination": trip_data.get("destination", "Unknown"),
+            "duration": duration,
+            "daily_plan": daily_plan,
+            "total_estimated_cost": sum(day.get("estimated_cost", 100) for day in daily_plan),
+            "recommendations": list(past.recommendations)
+        }
+
+    def _past_trip_prompt(self, trip_data: Dict[str, Any], past: PastTrip) -> str:
+        duration = trip_data.get("duration", 3)
+        interests = trip_data.get("interests", [])
+        weather = trip_data.get("weather", {})
+        preferences = trip_data.get("preferences", {})
+        return f"""
+        Adapt this {past.duration}-day itinerary from a past trip to {trip_data.get('destination', 'Unknown')} into a {duration}-day one.
+        Keep what suits the new trip, replace what does not match its interests, add days if needed.
+
+        {past.exemplar()}
+
+        New trip: ${trip_data.get('budget', 1000)} total, {trip_data.get('travelers', 1)} travelers, {trip_data.get('travel_style', 'mid-range')}, interests: {', '.join(interests) if interests else 'general exploration'}, weather: {weather.get('condition', 'Pleasant')} {weather.get('temperature', '22°C')}, special requests: {preferences.get('special_requests', 'None')}
+
+        Respond ONLY with JSON: {{"daily_plan": [{{"day": 1, "morning": "...", "afternoon": "...", "evening": "...", "estimated_cost": 85}}], "recommendations": ["..."]}}
+        Generate {duration} days exactly.
+        """
+
     async def generate_travel_summary(self, trip_data: Dict[str, Any]) -> str:
         """Generate travel summary using OpenAI"""
         try:
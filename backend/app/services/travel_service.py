@@ -1,7 +1,17 @@
-from typing import Dict, Any
+import asyncio
+import random
+import time
+from datetime import datetime
+from typing import Dict, Any, Set
+from ..config import settings
 from ..core.agents import ResearcherAgent, PlannerAgent, SummarizerAgent
 from ..core.utils.logger import Logger
+from ..core.utils.metrics import PLAN_UPGRADES
+from ..core.utils.timing import stage
 from ..core.utils.helpers import validate_trip_data, generate_trip_id
+from .database import load_data, save_trips
+from .llm_health import llm_health
+from .trip_index import past_trips
 
 class TravelService:
     def __init__(self):
@@ -9,6 +19,10 @@ class TravelService:
         self.planner = PlannerAgent()
         self.summarizer = SummarizerAgent()
         self.logger = Logger("travel_service")
+        # Strong references to background upgrades; the event loop only keeps weak ones
+        self._upgrades: Set[asyncio.Task] = set()
+        # Upgrades running at once, so a backlog cannot crowd out live plans after a cooldown
+        self._upgrade_slots = asyncio.Semaphore(settings.LLM_UPGRADE_CONCURRENCY)
     
     async def plan_trip(self, trip_request: Dict[str, Any]) -> Dict[str, Any]:
         try:
@@ -16,56 +30,43 @@ class TravelService:
                 raise ValueError("Invalid trip data")
             
             trip_id = generate_trip_id()
-            self.logger.info(f"Planning trip {trip_id} for {trip_request.get('destination')}")
+            self.logger.info("Planning trip %s for %s", trip_id, trip_request.get('destination'))
             
             # Enhanced Research phase with all APIs
-            self.logger.info("Starting comprehensive destination research...")
-            research_data = await self.researcher.research_destination(
-                destination=trip_request["destination"],
-                check_in=trip_request.get("start_date"),
-                check_out=trip_request.get("end_date"),
-                travelers=trip_request.get("travelers", 2)
-            )
-            
-            # Add flight search with origin if provided
-            if trip_request.get("from"):
-                research_data["flights"] = await self.researcher.flight_tool.search_flights(
+            self.logger.debug("Starting comprehensive destination research...")
+            # "from" may list several airports, e.g. "NYC, EWR, JFK"
+            origins = [origin.strip() for origin in str(trip_request.get("from") or "").split(",") if origin.strip()]
+            with stage("research"):
+                research_data = await self.researcher.research_destination(
                     destination=trip_request["destination"],
-                    origin=trip_request["from"],
-                    departure_date=trip_request.get("start_date")
+                    check_in=trip_request.get("start_date"),
+                    check_out=trip_request.get("end_date"),
+                    travelers=trip_request.get("travelers", 2),
+                    origins=origins,
+                    flex_days=self._flex_days(trip_request.get("flex_days"))
                 )
             
             # Enhanced Planning phase with AI and memory
-            self.logger.info("Creating AI-powered itinerary...")
-            trip_data = {
-                **trip_request, 
-                **research_data,
-                "preferences": {
-                    "travel_style": trip_request.get("travel_style", "mid-range"),
-                    "accommodation": trip_request.get("accommodation", "hotel"),
-                    "transportation": trip_request.get("transportation", "flight"),
-                    "meal_preference": trip_request.get("meal_preference", "all"),
-                    "activity_level": trip_request.get("activity_level", "moderate"),
-                    "interests": trip_request.get("interests", []),
-                    "special_requests": trip_request.get("special_requests", "")
-                }
-            }
+            self.logger.debug("Creating AI-powered itinerary...")
+            trip_data = self._planning_input(trip_request, research_data)
             
             try:
-                itinerary = await self.planner.create_itinerary(trip_data)
-                self.logger.info("Itinerary created successfully")
+                with stage("itinerary"):
+                    itinerary = await self.planner.create_itinerary(trip_data)
+                self.logger.debug("Itinerary created successfully")
             except Exception as e:
-                self.logger.error(f"Itinerary creation failed: {e}")
+                self.logger.error("Itinerary creation failed: %s", e)
                 raise e
             
             # Enhanced Summary phase with AI insights
-            self.logger.info("Generating AI-powered trip summary...")
+            self.logger.debug("Generating AI-powered trip summary...")
             try:
                 summary_data = {**trip_data, **itinerary}
-                summary = await self.summarizer.summarize_trip(summary_data)
-                self.logger.info("Summary created successfully")
+                with stage("summary"):
+                    summary = await self.summarizer.summarize_trip(summary_data)
+                self.logger.debug("Summary created successfully")
             except Exception as e:
-                self.logger.error(f"Summary creation failed: {e}")
+                self.logger.error("Summary creation failed: %s", e)
                 raise e
             
             # Compile comprehensive result
@@ -76,6 +77,7 @@ class TravelService:
                 "itinerary": itinerary,
                 "summary": summary,
                 "hotel_recommendations": research_data.get("hotel_details", [])[:5],  # Top 5 hotels for frontend
+                "degraded": itinerary.get("degraded", False),
                 "api_integration": {
                     "weather_api": bool(research_data.get("weather")),
                     "flights_api": bool(research_data.get("flights")),
@@ -91,9 +93,78 @@ class TravelService:
                 }
             }
             
-            self.logger.info(f"Trip {trip_id} planned successfully with full AI integration")
+            self.logger.info("Trip %s planned successfully with full AI integration", trip_id)
             return result
             
         except Exception as e:
-            self.logger.error(f"Error planning trip: {str(e)}")
-            return {"status": "error", "message": str(e)}
\ No newline at end of file
+            self.logger.error("Error planning trip: %s", e)
+            return {"status": "error", "message": str(e)}
+    
+    def _flex_days(self, value: Any) -> int:
+        """Requested days either side of the departure date; malformed input searches the exact date."""
+        try:
+            return max(0, int(value or 0))
+        except (TypeError, ValueError):
+            self.logger.warning("Ignoring malformed flex_days %r", value, sample=10)
+            return 0
+    
+    def _planning_input(self, trip_request: Dict[str, Any], research_data: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            **trip_request, 
+            **research_data,
+            "preferences": {
+                "travel_style": trip_request.get("travel_style", "mid-range"),
+                "accommodation": trip_request.get("accommodation", "hotel"),
+                "transportation": trip_request.get("transportation", "flight"),
+                "meal_preference": trip_request.get("meal_preference", "all"),
+                "activity_level": trip_request.get("activity_level", "moderate"),
+                "interests": trip_request.get("interests", []),
+                "special_requests": trip_request.get("special_requests", "")
+            }
+        }
+    
+    def schedule_itinerary_upgrade(self, trip_id: int, trip_request: Dict[str, Any], research_data: Dict[str, Any]) -> bool:
+        """Replace a saved trip's template itinerary with an LLM one once the LLM recovers."""
+        if not settings.LLM_UPGRADE_DEGRADED:
+            return False
+        if len(self._upgrades) >= settings.LLM_UPGRADE_MAX_PENDING:
+            PLAN_UPGRADES.labels("skipped").inc()
+            return False
+        task = asyncio.create_task(self.upgrade_itinerary(trip_id, self._planning_input(trip_request, research_data)))
+        self._upgrades.add(task)
+        task.add_done_callback(self._upgrades.discard)
+        return True
+    
+    async def upgrade_itinerary(self, trip_id: int, trip_data: Dict[str, Any], poll_interval: float = 5.0) -> bool:
+        deadline = time.monotonic() + settings.LLM_UPGRADE_MAX_DELAY
+        async with self._upgrade_slots:
+            # Lower priority than live plans: only start while the LLM has spare capacity
+            while not llm_health.has_headroom():
+                if time.monotonic() > deadline:
+                    PLAN_UPGRADES.labels("expired").inc()
+                    return False
+                # Jittered so waiting upgrades in several workers do not poll in lockstep
+                await asyncio.sleep(poll_interval * random.uniform(0.5, 1.5))
+            
+            try:
+                itinerary = await self.planner.create_itinerary(trip_data, allow_degraded=False)
+            except Exception as e:
+                PLAN_UPGRADES.labels("error").inc()
+                self.logger.warning("Itinerary upgrade for trip %s failed: %s", trip_id, e)
+                return False
+        
+        trips, _, _ = load_data()
+        trip = next((trip for trip in trips if trip.get("id") == trip_id), None)
+        if trip is None:
+            PLAN_UPGRADES.labels("missing").inc()
+            return False
+        trip["itinerary"] = itinerary
+        trip["degraded"] = False
+        trip["ai_enhanced"] = True
+        trip["upgraded_at"] = datetime.utcnow().isoformat()
+        trip.setdefault("api_sources", {})["itinerary_generation"] = itinerary.get("api_sources", {})
+        save_trips(trips)
+        past_trips.add(trip)
+        PLAN_UPGRADES.labels("upgraded").inc()
+        self.logger.info("Upgraded degraded itinerary for trip %s", trip_id)
+        return True
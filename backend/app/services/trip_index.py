@@ -0,0 +1,170 @@
+"""
+Past Trips
+An index over the LLM itineraries saved in trips.json, so a request for a destination
+planned before can start from the most similar earlier trip:
+
+- ``find()`` scores the trips saved for the same destination by how close their
+  duration, interests and travel style are to the request
+- a match at ``reuse_similarity`` that covers the requested days is adapted and
+  returned without an LLM call (see ``reusable()``), unless either trip had special
+  requests, which the plan may have been built around
+- a match at ``exemplar_similarity`` goes into a shorter prompt as a compact exemplar
+
+Trips are grouped by normalized destination, keeping the newest ``per_destination``,
+so a lookup scores a handful of entries. The index is rebuilt when the trips file
+changes on disk (another worker saved a trip) and updated in place by ``add()``.
+"""
+
+from typing import Any, Deque, Dict, List, Optional, Sequence, Tuple
+from collections import deque
+import os
+
+from ..config import settings
+from ..core.utils.logger import Logger
+from . import database
+
+# api_source of itineraries written by the LLM; only these are worth reusing
+LLM_SOURCE = "DeepSeek Chat v3.1 via OpenRouter"
+PAST_TRIP_SOURCE = "Past Trip Adaptation"
+
+def normalize_destination(destination: Any) -> str:
+    """Lowercased city part, so "Paris, France" and " paris" are the same destination."""
+    return str(destination or "").split(",")[0].strip().casefold()
+
+def _interests(trip: Dict[str, Any]) -> frozenset:
+    return frozenset(str(interest).strip().casefold() for interest in trip.get("interests") or [])
+
+def _special_requests(trip_data: Dict[str, Any]) -> str:
+    preferences = trip_data.get("preferences") or {}
+    return str(trip_data.get("special_requests") or preferences.get("special_requests") or "").strip()
+
+class PastTrip:
+    __slots__ = ("trip_id", "duration", "interests", "travel_style", "daily_plan", "recommendations",
+                 "special_requests")
+
+    def __init__(self, trip_id: Any, duration: int, interests: frozenset, travel_style: str,
+                 daily_plan: List[Dict[str, Any]], recommendations: List[str], special_requests: bool = False):
+        self.trip_id = trip_id
+        self.duration = duration
+        self.interests = interests
+        self.travel_style = travel_style
+        self.daily_plan = daily_plan
+        self.recommendations = recommendations
+        # Planned around someone's dietary or accessibility needs: an exemplar only
+        self.special_requests = special_requests
+
+    def adapted_plan(self, duration: int) -> List[Dict[str, Any]]:
+        """The first ``duration`` days, copied so the saved trip is never modified."""
+        return [dict(day, day=n) for n, day in enumerate(self.daily_plan[:duration], 1)]
+
+    def exemplar(self, max_days: int = 5, max_chars: int = 80) -> str:
+        """One short line per day, e.g. "Day 1: Louvre | Le Marais walk | Seine cruise (~$120)"."""
+        lines = []
+        for n, day in enumerate(self.daily_plan[:max_days], 1):
+            slots = [str(day.get(slot, ""))[:max_chars] for slot in ("morning", "afternoon", "evening")]
+            lines.append(f"Day {n}: {' | '.join(slots)} (~${day.get('estimated_cost', 100)})")
+        return "\n".join(lines)
+
+class PastTripIndex:
+    def __init__(self, sources: Sequence[str] = (LLM_SOURCE,), reuse_similarity: float = 0.9,
+                 exemplar_similarity: float = 0.5, per_destination: int = 20):
+        self.sources = frozenset(sources)
+        self.reuse_similarity = reuse_similarity
+        self.exemplar_similarity = exemplar_similarity
+        self.per_destination = per_destination
+        self._trips: Dict[str, Deque[PastTrip]] = {}
+        # (mtime_ns, size) of the trips file the index reflects; None before the first load
+        self._signature: Optional[Tuple[int, int]] = None
+        self.logger = Logger("trip_index")
+
+    def __len__(self) -> int:
+        return sum(map(len, self._trips.values()))
+
+    def _file_signature(self) -> Tuple[int, int]:
+        try:
+            stat = os.stat(database.TRIPS_FILE)
+        except OSError:
+            return (0, 0)
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _sync(self) -> None:
+        signature = self._file_signature()
+        if signature == self._signature:
+            return
+        trips, _, _ = database.load_data()
+        self._trips = {}
+        for trip in trips:
+            self._insert(trip)
+        self._signature = signature
+        self.logger.debug("Indexed %d past trips", len(self))
+
+    def _entry(self, trip: Dict[str, Any]) -> Optional[PastTrip]:
+        itinerary = trip.get("itinerary")
+        if not isinstance(itinerary, dict) or trip.get("degraded") or itinerary.get("degraded"):
+            return None
+        source = (itinerary.get("api_sources") or {}).get("itinerary")
+        daily_plan = [day for day in itinerary.get("daily_plan") or [] if isinstance(day, dict)]
+        if source not in self.sources or not daily_plan:
+            return None
+        return PastTrip(trip.get("id"), len(daily_plan), _interests(trip),
+                        str(trip.get("travel_style") or ""), daily_plan,
+                        list(itinerary.get("recommendations") or []), bool(_special_requests(trip)))
+
+    def _insert(self, trip: Dict[str, Any]) -> None:
+        destination = normalize_destination(trip.get("destination"))
+        entry = self._entry(trip) if destination else None
+        bucket = self._trips.get(destination)
+        if bucket is not None:
+            # An upgraded trip replaces its earlier itinerary
+            for old in [old for old in bucket if old.trip_id == trip.get("id")]:
+                bucket.remove(old)
+        if entry is None:
+            return
+        if bucket is None:
+            bucket = self._trips[destination] = deque(maxlen=self.per_destination)
+        bucket.append(entry)
+
+    def add(self, trip: Dict[str, Any]) -> None:
+        """Index a trip this worker just saved, without re-reading the trips file."""
+        self._sync()
+        self._insert(trip)
+        # The file now holds this trip too, so the next lookup need not reload it
+        self._signature = self._file_signature()
+
+    def similarity(self, past: PastTrip, duration: int, interests: frozenset, travel_style: str) -> float:
+        """0-1: weighted closeness of duration, interest overlap (Jaccard) and travel style."""
+        duration_score = min(past.duration, duration) / max(past.duration, duration, 1)
+        union = past.interests | interests
+        interest_score = len(past.interests & interests) / len(union) if union else 1.0
+        style_score = 1.0 if past.travel_style == travel_style else 0.0
+        return 0.4 * duration_score + 0.45 * interest_score + 0.15 * style_score
+
+    def find(self, trip_data: Dict[str, Any]) -> Optional[Tuple[PastTrip, float]]:
+        """The most similar past trip to the same destination scoring at least
+        ``exemplar_similarity``, with its similarity."""
+        self._sync()
+        bucket = self._trips.get(normalize_destination(trip_data.get("destination")))
+        if not bucket:
+            return None
+        duration = int(trip_data.get("duration") or 3)
+        interests = _interests(trip_data)
+        travel_style = str(trip_data.get("travel_style") or "")
+        # Newest first, so ties go to the most recent itinerary
+        best = max(reversed(bucket), key=lambda past: self.similarity(past, duration, interests, travel_style))
+        score = self.similarity(best, duration, interests, travel_style)
+        return (best, score) if score >= self.exemplar_similarity else None
+
+    def reusable(self, trip_data: Dict[str, Any], past: PastTrip, similarity: float) -> bool:
+        """Whether ``past`` can be returned as is: close enough, long enough, and neither
+        the request nor the past trip had special requests that the other's plan would
+        not fit."""
+        return (similarity >= self.reuse_similarity
+                and past.duration >= int(trip_data.get("duration") or 3)
+                and not past.special_requests
+                and not _special_requests(trip_data))
+
+past_trips = PastTripIndex(
+    reuse_similarity=settings.PAST_TRIP_REUSE_SIMILARITY,
+    exemplar_similarity=settings.PAST_TRIP_EXEMPLAR_SIMILARITY,
+    per_destination=settings.PAST_TRIPS_PER_DESTINATION
+)
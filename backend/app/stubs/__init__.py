@@ -0,0 +1,3 @@
+from .server import StubServer, StubConfig, ProviderProfile, LatencyProfile
+
+__all__ = ["StubServer", "StubConfig", "ProviderProfile", "LatencyProfile"]
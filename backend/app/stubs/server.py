@@ -0,0 +1,297 @@
+"""
+Upstream Stub Server
+Replays recorded RapidAPI, OpenWeatherMap, Amadeus and OpenRouter responses with
+configurable latency, error and rate-limit injection, so the tools can be exercised
+and load-tested without API keys or network access.
+
+Point the app at it with UPSTREAM_STUB_URL=http://127.0.0.1:8099 and run:
+
+    python -m app.stubs.server --port 8099 --latency-ms 120 --rate-limit-rate 0.02
+
+With --record, requests are forwarded to the real upstream and the responses are
+appended to the recordings before being returned.
+"""
+
+from typing import Dict, Any, List, Optional
+from dataclasses import dataclass, field, asdict
+import aiohttp
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+from aiohttp import web
+
+RECORDINGS_DIR = os.path.join(os.path.dirname(__file__), "recordings")
+
+# Real upstream hosts, used when recording
+UPSTREAM_HOSTS: Dict[str, str] = {
+    "rapidapi": "https://booking-com.p.rapidapi.com",
+    "openweather": "http://api.openweathermap.org",
+    "amadeus": "https://test.api.amadeus.com",
+    "openrouter": "https://openrouter.ai"
+}
+
+# Fields that must never end up in a recording: dropped from the match parameters and
+# replaced wherever they appear in a recorded body, e.g. an OAuth token exchange
+SECRET_FIELDS = {"appid", "client_id", "client_secret", "api_key", "key",
+                 "access_token", "id_token", "refresh_token", "password", "authorization"}
+
+_TEMPLATE = re.compile(r"\{\{(\w+)(?:\|([^}]*))?\}\}")
+
+@dataclass
+class LatencyProfile:
+    """Latency distribution in milliseconds.
+
+    ``fixed`` waits ``value_ms``; ``uniform`` draws from value_ms +/- spread;
+    ``normal`` uses value_ms as mean and spread as standard deviation; ``lognormal``
+    uses value_ms as the median and spread as sigma.
+    """
+    distribution: str = "fixed"
+    value_ms: float = 0.0
+    spread: float = 0.0
+
+    def sample(self, rng: random.Random) -> float:
+        if self.distribution == "uniform":
+            delay = rng.uniform(self.value_ms - self.spread, self.value_ms + self.spread)
+        elif self.distribution == "normal":
+            delay = rng.gauss(self.value_ms, self.spread)
+        elif self.distribution == "lognormal":
+            delay = self.value_ms * rng.lognormvariate(0.0, self.spread)
+        else:
+            delay = self.value_ms
+        return max(0.0, delay) / 1000
+
+@dataclass
+class ProviderProfile:
+    latency: LatencyProfile = field(default_factory=LatencyProfile)
+    error_rate: float = 0.0
+    rate_limit_rate: float = 0.0
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ProviderProfile":
+        return cls(
+            latency=LatencyProfile(**data.get("latency", {})),
+            error_rate=data.get("error_rate", 0.0),
+            rate_limit_rate=data.get("rate_limit_rate", 0.0)
+        )
+
+@dataclass
+class StubConfig:
+    default: ProviderProfile = field(default_factory=ProviderProfile)
+    providers: Dict[str, ProviderProfile] = field(default_factory=dict)
+    recordings_dir: str = RECORDINGS_DIR
+    record: bool = False
+    seed: Optional[int] = None
+
+    def profile(self, provider: str) -> ProviderProfile:
+        return self.providers.get(provider, self.default)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "StubConfig":
+        return cls(
+            default=ProviderProfile.from_dict(data.get("default", {})),
+            providers={name: ProviderProfile.from_dict(p) for name, p in data.get("providers", {}).items()},
+            recordings_dir=data.get("recordings_dir", RECORDINGS_DIR),
+            record=data.get("record", False),
+            seed=data.get("seed")
+        )
+
+    @classmethod
+    def from_file(cls, path: str) -> "StubConfig":
+        with open(path, 'r') as f:
+            return cls.from_dict(json.load(f))
+
+class RecordingStore:
+    """Recorded responses per provider, keyed by "METHOD /path"."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._recordings: Dict[str, Dict[str, List[Dict[str, Any]]]] = {}
+
+    def _path(self, provider: str) -> str:
+        return os.path.join(self.directory, f"{provider}.json")
+
+    def entries(self, provider: str, route: str) -> List[Dict[str, Any]]:
+        if provider not in self._recordings:
+            path = self._path(provider)
+            if os.path.exists(path):
+                with open(path, 'r') as f:
+                    self._recordings[provider] = json.load(f)
+            else:
+                self._recordings[provider] = {}
+        return self._recordings[provider].get(route, [])
+
+    def find(self, provider: str, route: str, params: Dict[str, str]) -> Optional[Dict[str, Any]]:
+        """Most specific recording whose ``match`` fields all equal the request's parameters."""
+        best, best_size = None, -1
+        for entry in self.entries(provider, route):
+            match = entry.get("match", {})
+            if len(match) > best_size and all(params.get(k) == str(v) for k, v in match.items()):
+                best, best_size = entry, len(match)
+        return best
+
+    def add(self, provider: str, route: str, entry: Dict[str, Any]) -> None:
+        self.entries(provider, route)
+        self._recordings[provider].setdefault(route, []).append(entry)
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self._path(provider), 'w') as f:
+            json.dump(self._recordings[provider], f, indent=2)
+
+def render(body: Any, params: Dict[str, str]) -> Any:
+    """Fill {{name}} / {{name|default}} placeholders in a recorded body from request parameters."""
+    text = json.dumps(body)
+    text = _TEMPLATE.sub(lambda m: json.dumps(params.get(m.group(1), m.group(2) or ""))[1:-1], text)
+    return json.loads(text)
+
+def redact(value: Any) -> Any:
+    """``value`` with every SECRET_FIELDS entry, at any depth, replaced by a placeholder
+    such as "recorded-access-token"."""
+    if isinstance(value, dict):
+        return {
+            k: f"recorded-{k.lower().replace('_', '-')}" if k.lower() in SECRET_FIELDS else redact(v)
+            for k, v in value.items()
+        }
+    if isinstance(value, list):
+        return [redact(item) for item in value]
+    return value
+
+class StubServer:
+    """aiohttp application replaying recordings under /<provider>/<upstream path>."""
+
+    def __init__(self, config: StubConfig = None):
+        self.config = config or StubConfig()
+        self.store = RecordingStore(self.config.recordings_dir)
+        self.rng = random.Random(self.config.seed)
+        self.stats: Dict[str, Dict[str, int]] = {}
+        self._runner: Optional[web.AppRunner] = None
+        self.url: Optional[str] = None
+
+    def create_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get("/__stub__/stats", self._handle_stats)
+        app.router.add_post("/__stub__/reset", self._handle_reset)
+        app.router.add_route("*", "/{provider}/{path:.*}", self._handle)
+        return app
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Serve in the running event loop and return the base URL."""
+        self._runner = web.AppRunner(self.create_app())
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        bound_port = site._server.sockets[0].getsockname()[1]
+        self.url = f"http://{host}:{bound_port}"
+        return self.url
+
+    async def stop(self) -> None:
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self) -> "StubServer":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.stop()
+
+    def _count(self, provider: str, outcome: str) -> None:
+        counters = self.stats.setdefault(provider, {})
+        counters[outcome] = counters.get(outcome, 0) + 1
+
+    async def _handle_stats(self, request: web.Request) -> web.Response:
+        return web.json_response({"stats": self.stats, "config": asdict(self.config)})
+
+    async def _handle_reset(self, request: web.Request) -> web.Response:
+        self.stats.clear()
+        return web.json_response({"reset": True})
+
+    async def _request_params(self, request: web.Request) -> Dict[str, str]:
+        params = dict(request.query)
+        if request.can_read_body:
+            if request.content_type == "application/json":
+                body = await request.json()
+                if isinstance(body, dict):
+                    params.update({k: str(v) for k, v in body.items() if not isinstance(v, (dict, list))})
+            else:
+                params.update({k: str(v) for k, v in (await request.post()).items()})
+        return params
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        provider = request.match_info["provider"]
+        route = f"{request.method} /{request.match_info['path']}"
+        profile = self.config.profile(provider)
+        self._count(provider, "requests")
+
+        await asyncio.sleep(profile.latency.sample(self.rng))
+
+        roll = self.rng.random()
+        if roll < profile.rate_limit_rate:
+            self._count(provider, "rate_limited")
+            return web.json_response({"message": "Too many requests"}, status=429, headers={"Retry-After": "1"})
+        if roll < profile.rate_limit_rate + profile.error_rate:
+            self._count(provider, "errors")
+            return web.json_response({"message": "Injected upstream error"}, status=500)
+
+        params = await self._request_params(request)
+        if self.config.record:
+            return await self._record(request, provider, route, params)
+
+        entry = self.store.find(provider, route, params)
+        if entry is None:
+            self._count(provider, "unmatched")
+            return web.json_response({"message": f"No recording for {provider} {route}"}, status=404)
+        return web.json_response(render(entry.get("body"), params), status=entry.get("status", 200))
+
+    async def _record(self, request: web.Request, provider: str, route: str,
+                      params: Dict[str, str]) -> web.Response:
+        """Forward the request to the real upstream and store its response."""
+        upstream = f"{UPSTREAM_HOSTS[provider]}/{request.match_info['path']}"
+        headers = {k: v for k, v in request.headers.items() if k.lower() not in ("host", "content-length")}
+        body = await request.read()
+        async with aiohttp.ClientSession() as session:
+            async with session.request(request.method, upstream, params=request.query,
+                                       data=body or None, headers=headers) as response:
+                status = response.status
+                payload = await response.json(content_type=None)
+
+        # Only the redacted copy is stored; the caller gets the real response
+        match = {k: v for k, v in request.query.items() if k.lower() not in SECRET_FIELDS}
+        self.store.add(provider, route, {"match": match, "status": status, "body": redact(payload)})
+        self._count(provider, "recorded")
+        return web.json_response(payload, status=status)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Replay recorded upstream API responses.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--config", help="JSON file with per-provider latency/error settings")
+    parser.add_argument("--recordings", default=RECORDINGS_DIR, help="Directory of recording files")
+    parser.add_argument("--record", action="store_true", help="Proxy to the real APIs and save responses")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Default latency (median for lognormal)")
+    parser.add_argument("--distribution", default="fixed", choices=["fixed", "uniform", "normal", "lognormal"])
+    parser.add_argument("--spread", type=float, default=0.0, help="Uniform half-width, normal std-dev or lognormal sigma")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Fraction of requests answered with 429")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    if args.config:
+        config = StubConfig.from_file(args.config)
+    else:
+        config = StubConfig(default=ProviderProfile(
+            latency=LatencyProfile(args.distribution, args.latency_ms, args.spread),
+            error_rate=args.error_rate,
+            rate_limit_rate=args.rate_limit_rate
+        ))
+    config.recordings_dir = args.recordings
+    config.record = config.record or args.record
+    config.seed = args.seed if args.seed is not None else config.seed
+
+    print(f"Upstream stub server on http://{args.host}:{args.port} (recordings: {config.recordings_dir})")
+    web.run_app(StubServer(config).create_app(), host=args.host, port=args.port, print=None)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,15 @@
+import pytest
+from app.core.utils import profiling, tracing
+from app.core.utils.profiling import ProfileStore
+
+@pytest.fixture(autouse=True, scope="session")
+def _trace_file(tmp_path_factory):
+    # Requests made by tests are traced too; keep their trace file out of the working tree
+    tracing.tracer.path = str(tmp_path_factory.mktemp("traces") / "traces.jsonl")
+    yield
+    tracing.tracer.close()
+
+@pytest.fixture(autouse=True, scope="session")
+def _profile_dir(tmp_path_factory):
+    # Requests sending a valid token are profiled; keep those out of the working tree too
+    profiling.profile_store = ProfileStore(str(tmp_path_factory.mktemp("profiles")))
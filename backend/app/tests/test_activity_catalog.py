@@ -0,0 +1,25 @@
+from app.core.tools.activity_catalog import THEMES, activity_type, build_daily_plan, describe_activity
+
+def test_daily_plan_walks_the_themes_and_repeats_the_last():
+    plan = build_daily_plan("Lisbon", 12)
+
+    assert [day["day"] for day in plan] == list(range(1, 13))
+    assert plan[0] == {
+        "day": 1,
+        "morning": "Arrive in Lisbon, check-in, and explore the city center",
+        "afternoon": "Walking tour of Lisbon's main attractions",
+        "evening": "Welcome dinner at a traditional restaurant in Lisbon",
+        "estimated_cost": 100
+    }
+    assert plan[4]["evening"] == "Discover Lisbon's secret evening spots"
+    assert plan[len(THEMES) - 1]["morning"] == plan[11]["morning"] == "Final sightseeing and souvenir shopping in Lisbon"
+    assert plan[11]["estimated_cost"] == 320
+    assert build_daily_plan("Lisbon", 0) == []
+
+def test_descriptions_and_activity_types():
+    assert describe_activity("Rome", "afternoon", "culinary journey") == "Restaurant hopping and local food tasting in Rome"
+    assert describe_activity("Rome", "night", "hidden gems") == "Night activities in Rome"
+
+    assert activity_type([], "morning") == "main attractions"
+    assert activity_type(["sports", "nature", "food"], "evening") == "evening walks"
+    assert activity_type(["sports"], "evening") == "local attractions"
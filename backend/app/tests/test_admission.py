@@ -0,0 +1,73 @@
+import asyncio
+import pytest
+from fastapi.testclient import TestClient
+from app.core.utils import admission
+from app.core.utils.admission import AdmissionController, Overloaded, parse_limits
+from app.main import app
+
+@pytest.mark.asyncio
+async def test_waiters_are_admitted_in_order_and_the_queue_is_bounded():
+    controller = AdmissionController("/plan", max_concurrency=1, max_queue=2, max_wait=5)
+    order = []
+
+    async def request(n: int, hold: float):
+        async with controller.admit():
+            order.append(n)
+            await asyncio.sleep(hold)
+
+    first = asyncio.create_task(request(0, 0.05))
+    await asyncio.sleep(0)
+    queued = [asyncio.create_task(request(n, 0.01)) for n in (1, 2)]
+    await asyncio.sleep(0)
+    assert (controller.in_flight, controller.queued) == (1, 2)
+
+    with pytest.raises(Overloaded) as shed:
+        await controller.acquire()
+    # One request holding a slot for ~50ms, two queued ahead: a couple of seconds at most
+    assert shed.value.retry_after >= 1 and controller.rejected == 1
+
+    await asyncio.gather(first, *queued)
+    assert order == [0, 1, 2]
+    assert (controller.in_flight, controller.queued) == (0, 0)
+    assert controller.retry_after() == 1
+
+@pytest.mark.asyncio
+async def test_waiters_time_out_or_leave_without_leaking_slots():
+    controller = AdmissionController("/plan", max_concurrency=1, max_queue=4, max_wait=0.02)
+    await controller.acquire()
+
+    with pytest.raises(Overloaded):
+        await controller.acquire()
+    cancelled = asyncio.create_task(controller.acquire())
+    await asyncio.sleep(0)
+    cancelled.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await cancelled
+
+    assert controller.queued == 0
+    controller.release()
+    assert controller.in_flight == 0
+    await controller.acquire()
+    assert controller.in_flight == 1
+
+def test_saturated_route_is_shed_while_cheap_reads_are_served(monkeypatch):
+    controller = AdmissionController("/api/v1/plan-trip", max_concurrency=1, max_queue=0)
+    monkeypatch.setattr(admission, "controllers", {"/api/v1/plan-trip": controller})
+    asyncio.run(controller.acquire())
+    controller.observe(4.0)
+    client = TestClient(app)
+
+    response = client.post("/api/v1/plan-trip", json={"destination": "Paris"})
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "4"
+
+    assert client.get("/api/v1/trips").status_code == 200
+    assert client.get("/api/v1/health").status_code == 200
+
+    metrics = client.get("/metrics").text
+    assert 'admission_in_flight{route="/api/v1/plan-trip"} 1' in metrics
+    assert 'admission_rejected_total{route="/api/v1/plan-trip"} 1' in metrics
+
+def test_parse_limits():
+    assert parse_limits("/api/v1/plan-trip=8:32, /api/v1/trip/plan=4") == {
+        "/api/v1/plan-trip": (8, 32), "/api/v1/trip/plan": (4, 0)}
@@ -0,0 +1,69 @@
+import math
+import pytest
+
+from app.core.rag.bm25 import BM25Index
+from app.core.rag.embedder import tokenize
+from app.core.rag.retriever import Retriever
+
+DOCS = {
+    "lisbon": "Lisbon trams climb the hills; ride tram 28 early",
+    "porto": "Porto wine cellars line the river in Porto",
+    "madrid": "Madrid museums open late; the Prado is free in the evening",
+}
+
+def _brute_force(docs, query, k1=1.5, b=0.75):
+    tokens = {doc_id: tokenize(text) for doc_id, text in docs.items()}
+    average = sum(map(len, tokens.values())) / len(tokens)
+    scores = {}
+    for doc_id, terms in tokens.items():
+        score = 0.0
+        for term in set(tokenize(query)):
+            df = sum(term in other for other in tokens.values())
+            tf = terms.count(term)
+            if tf:
+                idf = math.log(1 + (len(docs) - df + 0.5) / (df + 0.5))
+                score += idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * len(terms) / average))
+        if score:
+            scores[doc_id] = score
+    return scores
+
+def test_scores_match_the_bm25_formula():
+    index = BM25Index()
+    for doc_id, text in DOCS.items():
+        index.add(doc_id, text)
+    query = "Porto river museums"
+    results = dict(index.search(query, 10))
+    assert results.keys() == _brute_force(DOCS, query).keys() == {"porto", "madrid"}
+    for doc_id, score in _brute_force(DOCS, query).items():
+        assert results[doc_id] == pytest.approx(score)
+    assert index.search(query, 1)[0][0] == "porto"
+
+def test_stop_words_match_nothing():
+    index = BM25Index()
+    index.add("lisbon", DOCS["lisbon"])
+    assert index.search("the is in a", 5) == []
+
+def test_replace_and_remove_update_postings():
+    index = BM25Index()
+    for doc_id, text in DOCS.items():
+        index.add(doc_id, text)
+    index.add("porto", "Porto bridges at sunset")
+    assert [doc_id for doc_id, _ in index.search("wine", 5)] == []
+    assert index.search("bridges", 5)[0][0] == "porto"
+
+    assert index.remove("lisbon") and not index.remove("lisbon")
+    assert "tram" not in index._postings and len(index) == 2
+    docs = {doc_id: text for doc_id, text in DOCS.items() if doc_id != "lisbon"}
+    docs["porto"] = "Porto bridges at sunset"
+    assert dict(index.search("Madrid evening", 5)) == pytest.approx(_brute_force(docs, "Madrid evening"))
+
+@pytest.mark.asyncio
+async def test_retriever_fuses_lexical_and_vector_rankings():
+    retriever = Retriever()
+    retriever.add_knowledge(list(DOCS), list(DOCS.values()))
+    results = await retriever.retrieve_relevant_info("tram 28", top_k=2)
+    assert results[0]["doc_id"] == "lisbon"
+    assert results[0]["bm25"] > 0 and results[0]["score"] > 0
+
+    retriever.remove_knowledge("lisbon")
+    assert all(result["doc_id"] != "lisbon" for result in await retriever.retrieve_relevant_info("tram 28"))
@@ -0,0 +1,63 @@
+import pytest
+
+from app.core.memory import conversation_memory as module
+from app.core.memory.conversation_memory import ConversationMemory
+
+@pytest.mark.asyncio
+async def test_sessions_are_separate_ring_buffers():
+    memory = ConversationMemory(max_entries=3)
+    for n in range(5):
+        await memory.store_conversation(f"q{n}", f"a{n}", session_id="alice")
+    await memory.store_plan({"destination": "Lisbon"}, session_id="bob")
+
+    assert [c["user_input"] for c in memory.get_recent_conversations(10, "alice")] == ["q2", "q3", "q4"]
+    assert memory.get_recent_conversations(10, "bob") == []
+    assert memory.get_recent_plans(session_id="bob")[0]["destination"] == "Lisbon"
+    assert memory.get_conversation_context("alice").startswith("User: q2 Agent: a2")
+    assert memory.stats()["entries"] == {"conversations": 3, "plans": 1, "summaries": 0}
+    assert memory.evicted_entries == 2
+
+@pytest.mark.asyncio
+async def test_idle_and_excess_sessions_are_evicted(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(module.time, "monotonic", lambda: now[0])
+    memory = ConversationMemory(session_ttl=60, max_sessions=2)
+    await memory.store_summary({"n": 1}, session_id="a")
+    now[0] += 30
+    await memory.store_summary({"n": 2}, session_id="b")
+    now[0] += 40
+    # "a" has been idle for 70s, "b" for 40s
+    assert memory.stats()["sessions"] == 1
+    assert memory.get_recent_summaries(session_id="a") == []
+
+    await memory.store_summary({"n": 3}, session_id="c")
+    await memory.store_summary({"n": 4}, session_id="d")
+    assert memory.stats()["sessions"] == 2
+    assert memory.get_recent_summaries(session_id="b") == []
+    assert memory.evicted_sessions == 2
+
+@pytest.mark.asyncio
+async def test_byte_budget_evicts_least_recently_used_sessions_first():
+    memory = ConversationMemory(max_bytes=700)
+    for session_id in ("a", "b", "c"):
+        await memory.store_plan({"notes": "x" * 150}, session_id=session_id)
+    memory.get_recent_plans(session_id="a")
+    await memory.store_plan({"notes": "y" * 150}, session_id="d")
+
+    # "b" was least recently used once "a" was read
+    assert memory.get_recent_plans(session_id="b") == []
+    assert memory.get_recent_plans(session_id="a")
+    stats = memory.stats()
+    assert stats["bytes"] <= 700 and stats["sessions"] == 3
+
+    # A single session over budget keeps only what fits, always its newest entry
+    await memory.store_plan({"notes": "z" * 1000}, session_id="d")
+    assert memory.stats()["sessions"] == 1
+    assert [plan["notes"][0] for plan in memory.get_recent_plans(session_id="d")] == ["z"]
+
+@pytest.mark.asyncio
+async def test_end_session_releases_its_entries():
+    memory = ConversationMemory(max_bytes=10_000)
+    await memory.store_conversation("hi", "hello", session_id="a")
+    assert memory.end_session("a") and not memory.end_session("a")
+    assert memory.stats()["sessions"] == 0 and memory.stats()["bytes"] == 0
@@ -0,0 +1,144 @@
+import asyncio
+import json
+import pytest
+from app.services import database, openai_service, travel_service
+from app.services.llm_health import LLMHealth
+from app.services.openai_service import OpenAIService
+from app.services.travel_service import TravelService
+
+def _tripped_health(cooldown: float = 60.0) -> LLMHealth:
+    health = LLMHealth(min_samples=2, max_error_rate=0.5, cooldown=cooldown)
+    health.record(False, 1.0)
+    health.record(False, 1.0)
+    return health
+
+@pytest.mark.asyncio
+async def test_thresholds_trip_degraded_mode_until_the_cooldown_ends():
+    health = LLMHealth(max_concurrency=1, min_samples=3, max_error_rate=0.5,
+                       max_latency=2.0, max_queue_wait=5.0, cooldown=0.05)
+    health.record(True, 0.5)
+    health.record(False, 0.5)
+    assert health.degraded_reason() is None  # too few samples to judge
+    health.record(False, 0.5)
+    assert health.degraded_reason() == "error_rate"
+
+    for _ in range(3):
+        health.record(True, 0.5)
+    assert health.degraded_reason() == "error_rate"  # held for the cooldown
+    await asyncio.sleep(0.06)
+    assert health.degraded_reason() is None
+
+    for seconds in (3.0, 3.0, 3.0):
+        health.record(True, seconds)
+    assert health.degraded_reason() == "latency"
+
+@pytest.mark.asyncio
+async def test_queue_wait_is_estimated_from_waiting_callers():
+    health = LLMHealth(max_concurrency=1, max_queue_wait=1.0)
+    health.record(True, 0.4)
+
+    async def call():
+        async with health.slot():
+            await asyncio.sleep(0.01)
+
+    calls = [asyncio.create_task(call()) for _ in range(5)]
+    await asyncio.sleep(0)
+    assert health.waiting == 4
+    assert health.degraded_reason() == "queue_wait"
+    await asyncio.gather(*calls)
+    assert health.waiting == 0
+
+def test_failed_calls_count_towards_the_queue_wait_estimate():
+    health = LLMHealth(max_concurrency=1)
+    health.record(True, 1.0)
+    health.record(False, 30.0)
+    assert health._mean_latency == pytest.approx(0.8 * 1.0 + 0.2 * 30.0)
+
+@pytest.mark.asyncio
+async def test_plans_queued_past_the_slot_timeout_use_the_template(monkeypatch):
+    health = LLMHealth(max_concurrency=1, cooldown=60.0)
+    monkeypatch.setattr(openai_service, "llm_health", health)
+    monkeypatch.setattr(openai_service.settings, "LLM_DEGRADE_QUEUE_WAIT", 0.01)
+    service = OpenAIService()
+    service.api_key, service.client = "key", None  # any LLM call would fail
+
+    async with health.slot():  # the only slot is busy with a stuck call
+        itinerary = await service.generate_itinerary({"destination": "Lisbon", "duration": 2})
+
+    assert itinerary["degraded"] is True and itinerary["degraded_reason"] == "queue_wait"
+    assert health.waiting == 0 and health.degraded_reason() == "queue_wait"
+
+@pytest.mark.asyncio
+async def test_degraded_itinerary_comes_from_the_template_engine(monkeypatch):
+    monkeypatch.setattr(openai_service, "llm_health", _tripped_health())
+    service = OpenAIService()
+    service.api_key, service.client = "key", None  # any LLM call would fail
+
+    itinerary = await service.generate_itinerary({"destination": "Lisbon", "duration": 4, "interests": ["food"]})
+
+    assert itinerary["degraded"] is True and itinerary["degraded_reason"] == "error_rate"
+    assert len(itinerary["daily_plan"]) == 4
+    assert "Lisbon" in itinerary["daily_plan"][0]["morning"]
+
+@pytest.mark.asyncio
+async def test_degraded_trip_is_upgraded_once_the_llm_recovers(tmp_path, monkeypatch):
+    trips_file = tmp_path / "trips.json"
+    trips_file.write_text(json.dumps([{"id": 7, "degraded": True, "ai_enhanced": False, "itinerary": {"degraded": True}}]))
+    monkeypatch.setattr(database, "TRIPS_FILE", str(trips_file))
+    monkeypatch.setattr(travel_service, "llm_health", _tripped_health(cooldown=0.03))
+
+    service = TravelService()
+    calls = []
+
+    async def create_itinerary(trip_data, allow_degraded=True):
+        calls.append(allow_degraded)
+        return {"daily_plan": [{"day": 1}], "degraded": False, "api_sources": {"itinerary": "LLM"}}
+
+    monkeypatch.setattr(service.planner, "create_itinerary", create_itinerary)
+
+    assert await service.upgrade_itinerary(7, {"destination": "Lisbon"}, poll_interval=0.01)
+    assert calls == [False]
+    [trip] = json.loads(trips_file.read_text())
+    assert trip["degraded"] is False and trip["ai_enhanced"] is True
+    assert trip["itinerary"]["daily_plan"] == [{"day": 1}]
+    assert trip["api_sources"]["itinerary_generation"] == {"itinerary": "LLM"}
+
+@pytest.mark.asyncio
+async def test_upgrades_wait_for_headroom_and_run_one_at_a_time(tmp_path, monkeypatch):
+    trips_file = tmp_path / "trips.json"
+    trips_file.write_text(json.dumps([{"id": n, "degraded": True, "itinerary": {"degraded": True}} for n in (1, 2, 3)]))
+    monkeypatch.setattr(database, "TRIPS_FILE", str(trips_file))
+    health = LLMHealth(max_concurrency=2, max_queue_wait=5.0)
+    monkeypatch.setattr(travel_service, "llm_health", health)
+
+    service = TravelService()
+    running, peak = 0, 0
+
+    async def create_itinerary(trip_data, allow_degraded=True):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return {"daily_plan": [{"day": 1}], "degraded": False, "api_sources": {"itinerary": "LLM"}}
+
+    monkeypatch.setattr(service.planner, "create_itinerary", create_itinerary)
+
+    # A live request is queued for a slot, so background upgrades hold back
+    health.waiting = 1
+    assert not health.has_headroom()
+    upgrades = [asyncio.create_task(service.upgrade_itinerary(n, {}, poll_interval=0.01)) for n in (1, 2, 3)]
+    await asyncio.sleep(0.05)
+    assert running == 0 and peak == 0
+
+    health.waiting = 0
+    assert await asyncio.gather(*upgrades) == [True, True, True]
+    assert peak == 1
+
+def test_headroom_needs_every_threshold_well_clear():
+    health = LLMHealth(max_concurrency=2, min_samples=4, max_error_rate=0.5, max_latency=10.0)
+    assert health.has_headroom()
+    for seconds in (6.0, 6.0, 6.0, 6.0):
+        health.record(True, seconds)
+    # p90 latency is under the limit but over half of it
+    assert health.degraded_reason() is None and not health.has_headroom()
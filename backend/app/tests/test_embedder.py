@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+
+from app.core.rag.embedder import HashingEmbedder
+from app.core.rag.retriever import Retriever
+
+def test_vectors_are_unit_length_and_stable():
+    first, second = HashingEmbedder(dim=64), HashingEmbedder(dim=64)
+    vector = first.embed("Cheap flights to Lisbon")
+    assert vector.shape == (64,) and vector.dtype == np.float32
+    assert np.linalg.norm(vector) == pytest.approx(1.0, abs=1e-6)
+    np.testing.assert_array_equal(vector, second.embed("Cheap flights to Lisbon"))
+    # Only stop words: nothing to hash
+    assert not first.embed("what is the").any()
+
+def test_batch_matches_single_and_uses_the_cache():
+    embedder = HashingEmbedder(cache_size=2)
+    texts = ["museum tickets", "beach hotels", "museum tickets"]
+    batch = embedder.embed_batch(texts)
+    for text, vector in zip(texts, batch):
+        np.testing.assert_allclose(vector, embedder.embed(text), rtol=1e-6)
+    assert embedder._cache.hits >= 3
+
+    cached = embedder._cache.get("beach hotels")
+    with pytest.raises(ValueError):
+        cached[0] = 1.0
+
+def test_shared_words_and_stems_score_higher():
+    embedder = HashingEmbedder()
+    query, related, unrelated = embedder.embed_batch(["booking flights", "book a flight early", "museum opening hours"])
+    # No word in common, only stems
+    assert query @ related > query @ unrelated + 0.1
+
+@pytest.mark.asyncio
+async def test_retriever_finds_the_matching_knowledge():
+    retriever = Retriever()
+    results = await retriever.retrieve_relevant_info("What should I pack?")
+    assert results[0]["doc_id"] == "packing"
+    assert await retriever.retrieve_relevant_info("weather in Paris") == []
@@ -0,0 +1,150 @@
+import asyncio
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from app.core.tools import amadeus_client
+from app.core.tools.amadeus_client import AmadeusFlightClient
+
+def _offer(offer_id: str, price: str, origin: str = "JFK"):
+    return {
+        "id": offer_id,
+        "numberOfBookableSeats": 4,
+        "itineraries": [{
+            "duration": "PT8H5M",
+            "segments": [
+                {"carrierCode": "AF", "number": "7", "aircraft": {"code": "77W"},
+                 "departure": {"iataCode": origin, "at": "2026-11-02T18:30:00"},
+                 "arrival": {"iataCode": "CDG", "at": "2026-11-03T07:35:00"}}
+            ]
+        }],
+        "price": {"grandTotal": price, "currency": "USD"},
+        "travelerPricings": [{"fareDetailsBySegment": [{"cabin": "ECONOMY"}]}]
+    }
+
+@pytest_asyncio.fixture
+async def amadeus_stub():
+    state = {"token_requests": 0, "expires_in": 1799, "search_requests": []}
+
+    async def token(request):
+        form = await request.post()
+        assert form["grant_type"] == "client_credentials"
+        state["token_requests"] += 1
+        await asyncio.sleep(0.05)
+        return web.json_response({
+            "access_token": f"token-{state['token_requests']}",
+            "expires_in": state["expires_in"]
+        })
+
+    async def flight_offers(request):
+        if not request.headers.get("Authorization", "").startswith("Bearer token-"):
+            return web.json_response({"errors": []}, status=401)
+        state["search_requests"].append(dict(request.query))
+        return web.json_response({
+            "data": [_offer("1", "612.40", request.query["originLocationCode"]),
+                     _offer("2", "455.10", request.query["originLocationCode"])],
+            "dictionaries": {"carriers": {"AF": "AIR FRANCE"}, "aircraft": {"77W": "BOEING 777-300ER"}}
+        })
+
+    app = web.Application()
+    app.router.add_post("/v1/security/oauth2/token", token)
+    app.router.add_get("/v2/shopping/flight-offers", flight_offers)
+    server = TestServer(app)
+    await server.start_server()
+    amadeus_client._token_caches.clear()
+    state["base_url"] = str(server.make_url("")).rstrip("/")
+    yield state
+    await server.close()
+
+def _client(stub):
+    return AmadeusFlightClient(
+        "client-id", "client-secret",
+        base_url=stub["base_url"],
+        token_url=f"{stub['base_url']}/v1/security/oauth2/token"
+    )
+
+@pytest.mark.asyncio
+async def test_concurrent_searches_share_one_token_request(amadeus_stub):
+    client = _client(amadeus_stub)
+
+    results = await asyncio.gather(*[
+        client.search_offers("JFK", "PAR", "2026-11-02") for _ in range(10)
+    ])
+
+    assert amadeus_stub["token_requests"] == 1
+    assert len(amadeus_stub["search_requests"]) == 10
+    flight = results[0][0]
+    assert flight["airline"] == "Air France"
+    assert flight["flight_number"] == "AF7"
+    assert flight["price"] == 612.40
+    assert flight["duration"] == "8h 5m"
+    assert flight["aircraft"] == "BOEING 777-300ER"
+
+@pytest.mark.asyncio
+async def test_token_is_refreshed_inside_the_buffer_window(amadeus_stub):
+    amadeus_stub["expires_in"] = 30  # shorter than TOKEN_REFRESH_BUFFER
+    client = _client(amadeus_stub)
+
+    await client.search_offers("JFK", "PAR", "2026-11-02")
+    await client.search_offers("JFK", "PAR", "2026-11-02")
+
+    assert amadeus_stub["token_requests"] == 2
+
+@pytest.mark.asyncio
+async def test_flight_tool_uses_amadeus_and_sorts_by_price(amadeus_stub, monkeypatch):
+    monkeypatch.setenv("FLIGHTS_API_KEY", "client-id")
+    monkeypatch.setenv("FLIGHTS_API_SECRET", "client-secret")
+    from app.core.tools.flight_tool import FlightTool
+
+    tool = FlightTool()
+    tool.client = _client(amadeus_stub)
+    flights = await tool.search_flights("Paris", origin="New York", departure_date="2026-11-02")
+
+    assert [f["price"] for f in flights] == [455.10, 612.40]
+    assert amadeus_stub["search_requests"][0]["originLocationCode"] == "NYC"
+    assert amadeus_stub["search_requests"][0]["destinationLocationCode"] == "PAR"
+
+@pytest.mark.asyncio
+async def test_flexible_search_builds_matrix_and_reuses_cached_cells(amadeus_stub, monkeypatch):
+    from datetime import datetime, timedelta
+    from app.core.tools import flight_tool as flight_tool_module
+
+    monkeypatch.setenv("FLIGHTS_API_KEY", "client-id")
+    monkeypatch.setenv("FLIGHTS_API_SECRET", "client-secret")
+    flight_tool_module._flight_cell_cache.clear()
+    tool = flight_tool_module.FlightTool()
+    tool.client = _client(amadeus_stub)
+    center = (datetime.now() + timedelta(days=30)).strftime('%Y-%m-%d')
+
+    first = await tool.search_flights_flexible("Paris", ["JFK", "EWR"], center, flex_days=1)
+
+    assert len(amadeus_stub["search_requests"]) == 6
+    assert first["origins"] == ["JFK", "EWR"]
+    assert len(first["dates"]) == 3
+    assert all(price == 455.10 for row in first["price_matrix"].values() for price in row.values())
+    assert first["cheapest"]["price"] == 455.10
+    assert first["cells_from_cache"] == 0
+
+    second = await tool.search_flights_flexible("PAR", ["EWR", "LGA"], center, flex_days=1)
+
+    assert len(amadeus_stub["search_requests"]) == 9
+    assert second["cells_from_cache"] == 3
+
+@pytest.mark.asyncio
+async def test_flexible_search_ignores_a_malformed_date():
+    from datetime import datetime, timedelta
+    from app.core.tools.flight_tool import FlightTool
+
+    tool = FlightTool()
+    tool.client = None
+    result = await tool.search_flights_flexible("Paris", ["JFK", "EWR"], "06/01/2026", flex_days=1)
+
+    default = (datetime.now() + timedelta(days=7)).strftime('%Y-%m-%d')
+    assert result["dates"][1] == default and result["cells_searched"] == 6
+    assert result["flights"] == result["cheapest"]["flights"]
+
+def test_malformed_flex_days_search_the_exact_date():
+    from app.services.travel_service import TravelService
+
+    service = TravelService()
+    assert [service._flex_days(value) for value in ("3", 2, None, "", "3 days", -1, [1])] == [3, 2, 0, 0, 0, 0, 0]
@@ -0,0 +1,212 @@
+import asyncio
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from app.core.tools.hotel_tool import HotelTool
+
+def _page(page: int):
+    return [
+        {
+            "hotel_id": page * 10 + i,
+            "hotel_name": f"Hotel {page}-{i}",
+            "min_total_price": 60 + page * 40 + i * 15,
+            "review_score": 6.0 + page + i * 0.3,
+            "review_nr": 100 * (i + 1),
+            "distance_to_cc": f"{1 + i * 0.5}",
+            "hotel_facilities": ["WiFi", "Pool"] if i % 2 else ["WiFi"],
+            "city": "Paris"
+        }
+        for i in range(5)
+    ]
+
+@pytest_asyncio.fixture
+async def hotel_tool(monkeypatch):
+    requested_pages = []
+
+    async def locations(request):
+        return web.json_response([{"dest_id": "-1456928"}])
+
+    async def search(request):
+        page = int(request.query.get("page_number", 0))
+        requested_pages.append(page)
+        return web.json_response({"result": _page(page)})
+
+    app = web.Application()
+    app.router.add_get("/hotels/locations", locations)
+    app.router.add_get("/hotels/search", search)
+    server = TestServer(app)
+    await server.start_server()
+
+    monkeypatch.setenv("HOTELS_API_KEY", "test-key")
+    tool = HotelTool()
+    tool.base_url = str(server.make_url("")).rstrip("/")
+    tool.requested_pages = requested_pages
+    yield tool
+    await server.close()
+
+@pytest.mark.asyncio
+async def test_multi_page_search_merges_top_k(hotel_tool):
+    hotels = await hotel_tool.search_hotels("Paris", pages=3, limit=4)
+
+    assert sorted(hotel_tool.requested_pages) == [0, 1, 2]
+    assert len(hotels) == 4
+    ratings = [h["rating"] for h in hotels]
+    assert ratings == sorted(ratings, reverse=True)
+    assert hotels[0]["name"] == "Hotel 2-4"
+
+@pytest.mark.asyncio
+async def test_search_applies_price_rating_and_amenity_filters(hotel_tool):
+    hotels = await hotel_tool.search_hotels(
+        "Paris", pages=3, sort_by="price", max_price=150, min_rating=7, amenities=["pool"]
+    )
+
+    assert hotels
+    assert all(h["price_per_night"] <= 150 and h["rating"] >= 7 for h in hotels)
+    assert all("Pool" in h["amenities"] for h in hotels)
+    prices = [h["price_per_night"] for h in hotels]
+    assert prices == sorted(prices)
+
+def _formatted(hotel_id, price, rating, amenities, distance=1.0, reviews=100):
+    return {
+        "id": hotel_id,
+        "name": f"Hotel {hotel_id}",
+        "price_per_night": price,
+        "rating": rating,
+        "review_count": reviews,
+        "distance_km": distance,
+        "amenities": amenities
+    }
+
+def test_hotel_index_filters_and_sorts():
+    from app.core.tools.hotel_index import HotelIndex
+
+    index = HotelIndex([
+        _formatted("a", 120.0, 8.5, ["WiFi", "Pool"], distance=3.0),
+        _formatted("b", 90.0, 9.1, ["Free WiFi"], distance=0.5),
+        _formatted("c", 0, 9.8, ["WiFi", "Swimming Pool"]),
+        _formatted("d", 200.0, 7.2, ["Spa"], distance=0.2)
+    ])
+
+    assert [h["id"] for h in index.query()] == ["c", "b", "a", "d"]
+    assert [h["id"] for h in index.query(max_price=150, sort="price")] == ["b", "a"]
+    assert [h["id"] for h in index.query(amenities=["wifi", "pool"])] == ["c", "a"]
+    assert [h["id"] for h in index.query(min_rating=8, sort="distance", limit=2)] == ["b", "c"]
+    assert index.query(amenities=["Helipad"]) == []
+
+@pytest.mark.asyncio
+async def test_service_refilters_cached_index_without_upstream_calls(monkeypatch):
+    monkeypatch.setenv("HOTELS_API_KEY", "test-key")
+    from app.services import hotel_service as hotel_service_module
+
+    service = hotel_service_module.HotelService()
+    calls = []
+
+    async def fake_search(**kwargs):
+        calls.append(kwargs)
+        return [
+            _formatted("a", 120.0, 8.5, ["WiFi", "Pool"]),
+            _formatted("b", 90.0, 9.1, ["WiFi"])
+        ]
+
+    monkeypatch.setattr(service.hotel_tool, "search_hotels", fake_search)
+    hotel_service_module._hotel_index_cache.clear()
+
+    first = await service.search_and_format_hotels("Lisbon", sort="price")
+    second = await service.search_and_format_hotels("lisbon", amenities=["pool"])
+
+    assert len(calls) == 1
+    assert [h["id"] for h in first["hotels"]] == ["b", "a"]
+    assert [h["id"] for h in second["hotels"]] == ["a"]
+    assert second["total_available"] == 2
+
+def test_summary_is_shared_and_ignores_unpriced_hotels():
+    from app.core.tools.hotel_index import HotelIndex
+    from app.core.tools.hotel_summary import summarize_hotels
+
+    hotels = [
+        _formatted("a", 100.0, 8.0, []),
+        _formatted("b", 300.0, 9.0, []),
+        _formatted("c", 0, 9.5, []),
+        _formatted("d", 60.0, 7.8, [])
+    ]
+    summary = summarize_hotels(hotels)
+
+    assert summary["total_hotels"] == 4
+    assert summary["best_hotel"]["name"] == "Hotel c"
+    assert summary["best_value"]["name"] == "Hotel d"
+    assert summary["price_range"]["min"] == 60.0
+    assert summary["price_range"]["max"] == 300.0
+    assert summary["price_range"]["median"] == 100.0
+    assert summary["price_range"]["average"] == round(460 / 3, 2)
+
+    index = HotelIndex(hotels)
+    cheap = summarize_hotels(index, index.rows(max_price=150))
+    assert cheap["total_hotels"] == 2
+    assert cheap["best_hotel"]["name"] == "Hotel a"
+
+@pytest.mark.asyncio
+async def test_fallback_hotels_are_cached_only_briefly(monkeypatch):
+    monkeypatch.setenv("HOTELS_API_KEY", "test-key")
+    from app.services import hotel_service as hotel_service_module
+
+    service = hotel_service_module.HotelService()
+    calls = []
+    failing = True
+
+    async def search(**kwargs):
+        calls.append(kwargs)
+        if failing:
+            # What search_hotels returns after a 429 or timeout
+            return service.hotel_tool._get_mock_hotels(kwargs["location"])
+        return [_formatted("a", 120.0, 8.5, [])]
+
+    monkeypatch.setattr(service.hotel_tool, "search_hotels", search)
+    monkeypatch.setattr(hotel_service_module.settings, "HOTEL_FALLBACK_TTL", 0)
+    hotel_service_module._hotel_index_cache.clear()
+
+    await service.get_hotel_index("Lisbon")
+    await asyncio.sleep(0.001)
+    failing = False
+    index = await service.get_hotel_index("Lisbon")
+    assert len(calls) == 2 and [hotel["id"] for hotel in index.hotels] == ["a"]
+
+    await service.get_hotel_index("Lisbon")
+    assert len(calls) == 2
+
+@pytest.mark.asyncio
+async def test_rate_limited_page_backs_off_without_holding_a_slot(monkeypatch):
+    import aiohttp
+    import time
+    from app.core.tools import hotel_tool as hotel_tool_module
+    from app.core.utils.rate_limiter import RateLimiter
+
+    async def search(request):
+        if request.query["page_number"] == "0":
+            return web.Response(status=429)
+        return web.json_response({"result": _page(1)})
+
+    app = web.Application()
+    app.router.add_get("/hotels/search", search)
+    server = TestServer(app)
+    await server.start_server()
+    monkeypatch.setenv("HOTELS_API_KEY", "test-key")
+    monkeypatch.setattr(hotel_tool_module, "_rate_limiter", RateLimiter(100, period=1.0, max_concurrency=1))
+    tool = HotelTool()
+    tool.base_url = str(server.make_url("")).rstrip("/")
+
+    async def timed(page):
+        started = time.perf_counter()
+        try:
+            return await tool._fetch_results_page(session, {"page_number": page})
+        finally:
+            finished.append((page, time.perf_counter() - started))
+
+    finished = []
+    async with aiohttp.ClientSession() as session:
+        throttled, page = await asyncio.gather(timed(0), timed(1), return_exceptions=True)
+    await server.close()
+
+    assert "429" in str(throttled) and len(page) == 5
+    # The second page got the only slot while the first was still backing off
+    assert finished[0][0] == 1 and finished[0][1] < 0.5
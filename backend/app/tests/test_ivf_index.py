@@ -0,0 +1,90 @@
+import numpy as np
+import pytest
+
+from app.core.memory.ivf_index import IVFIndex
+from app.core.memory.vector_memory import VectorMemory
+
+def _clustered(count, dim=16, clusters=8, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dim))
+    return centers[rng.integers(0, clusters, count)] + 0.3 * rng.standard_normal((count, dim))
+
+def _ids(results):
+    return [[hit["doc_id"] for hit in hits] for hits in results]
+
+def _memory(vectors, nlist=8):
+    memory = VectorMemory(index=IVFIndex(nlist=nlist, nprobe=2, train_size=len(vectors)))
+    doc_ids = [f"doc-{n}" for n in range(len(vectors))]
+    memory.add_batch(doc_ids, doc_ids, vectors)
+    return memory
+
+def test_trains_once_train_size_is_reached():
+    memory = VectorMemory(index=IVFIndex(nlist=4, train_size=100))
+    vectors = _clustered(100)
+    memory.add_batch([f"a{n}" for n in range(99)], ["x"] * 99, vectors[:99])
+    assert not memory.index.trained
+    memory.add("a99", "x", vectors[99])
+    assert memory.index.trained
+
+def test_probing_every_cluster_matches_exact_search():
+    vectors, queries = _clustered(500), _clustered(20, seed=1)
+    exact = VectorMemory()
+    doc_ids = [f"doc-{n}" for n in range(500)]
+    exact.add_batch(doc_ids, doc_ids, vectors)
+    memory = _memory(vectors)
+
+    assert _ids(memory.search_batch(queries, 10, nprobe=8)) == _ids(exact.search_batch(queries, 10))
+
+def test_more_probes_never_lowers_recall():
+    vectors, queries = _clustered(2000, clusters=32), _clustered(50, clusters=32, seed=1)
+    memory = _memory(vectors, nlist=32)
+    truth = _ids(memory.search_batch(queries, 10, nprobe=32))
+    recalls = []
+    for nprobe in (1, 4, 32):
+        found = _ids(memory.search_batch(queries, 10, nprobe=nprobe))
+        recalls.append(sum(len(set(a) & set(b)) for a, b in zip(found, truth)))
+    assert recalls == sorted(recalls)
+    assert recalls[-1] == 500
+
+def test_inserts_after_training_are_searchable():
+    memory = _memory(_clustered(400))
+    vector = np.ones(16)
+    memory.add("late", "added after training", vector)
+
+    hits = memory.search_batch([vector], 1, nprobe=1)[0]
+    assert hits[0]["doc_id"] == "late"
+
+def test_delete_and_replace_leave_no_stale_hits():
+    vectors = _clustered(400)
+    memory = _memory(vectors)
+    memory.delete("doc-0")
+    memory.add("doc-1", "moved", -vectors[1])
+    memory.add("new", "reuses a row", vectors[0])
+
+    hits = memory.search_batch([vectors[0]], 400, nprobe=8)[0]
+    doc_ids = [hit["doc_id"] for hit in hits]
+    assert "doc-0" not in doc_ids
+    assert doc_ids[0] == "new"
+    assert len(doc_ids) == len(set(doc_ids)) == 400
+
+    hits = memory.search_batch([-vectors[1]], 1, nprobe=8)[0]
+    assert hits[0]["doc_id"] == "doc-1"
+
+def test_save_and_load_restore_the_index(tmp_path):
+    vectors, queries = _clustered(400), _clustered(20, seed=1)
+    memory = _memory(vectors)
+    memory.delete("doc-5")
+    memory.save(str(tmp_path))
+
+    loaded = VectorMemory.load(str(tmp_path))
+    assert loaded.index.trained
+    np.testing.assert_array_equal(loaded.index.centroids, memory.index.centroids)
+    assert len(loaded) == 399 and "doc-5" not in loaded
+    assert _ids(loaded.search_batch(queries, 10)) == _ids(memory.search_batch(queries, 10))
+
+    loaded.add("after-load", "x", vectors[5])
+    assert loaded.search_batch([vectors[5]], 1)[0][0]["doc_id"] == "after-load"
+
+def test_rejects_non_positive_parameters():
+    with pytest.raises(ValueError):
+        IVFIndex(nlist=0)
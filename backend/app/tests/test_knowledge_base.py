@@ -0,0 +1,111 @@
+import json
+import os
+import pytest
+
+from app.config import settings
+from app.core.rag.knowledge_base import KnowledgeBase, chunk_markdown
+from app.core.rag.retriever import Retriever
+
+GUIDE = """# Lisbon
+Ride tram 28 early to beat the crowds.
+
+## Food
+Try pasteis de nata in Belem.
+"""
+
+def _write(path, content):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content)
+    # Make the change visible even within the filesystem's timestamp granularity
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+def test_markdown_is_chunked_at_headings_and_by_length():
+    assert chunk_markdown(GUIDE) == ["# Lisbon Ride tram 28 early to beat the crowds.", "## Food Try pasteis de nata in Belem."]
+    long = "# Long\n" + " ".join(f"w{n}" for n in range(25))
+    chunks = chunk_markdown(long, chunk_words=10, overlap=2)
+    assert [len(chunk.split()) for chunk in chunks] == [10, 10, 10, 3]
+    assert chunks[1].split()[:2] == chunks[0].split()[-2:]
+
+@pytest.mark.asyncio
+async def test_refresh_only_reindexes_changed_files(tmp_path):
+    docs = tmp_path / "docs"
+    _write(docs / "guides" / "lisbon.md", GUIDE)
+    _write(docs / "visas.json", json.dumps([{"title": "Schengen visa", "content": "Apply 15 days before departure"}]))
+    retriever = Retriever()
+    knowledge = KnowledgeBase(retriever, str(docs), str(tmp_path / "index"))
+
+    assert knowledge.refresh() == {"files": 2, "chunks": 3, "removed": 0}
+    assert (await retriever.retrieve_relevant_info("schengen visa"))[0]["doc_id"] == "visas.json#0"
+    assert knowledge.refresh()["files"] == 0
+
+    _write(docs / "guides" / "lisbon.md", "# Lisbon\nThe Alfama district is best on foot.")
+    assert knowledge.refresh() == {"files": 1, "chunks": 1, "removed": 0}
+    assert "guides/lisbon.md#1" not in retriever.knowledge_index
+    assert (await retriever.retrieve_relevant_info("Alfama district"))[0]["doc_id"] == "guides/lisbon.md#0"
+
+    os.remove(docs / "visas.json")
+    assert knowledge.refresh()["removed"] == 1
+    assert "visas.json#0" not in retriever.knowledge_memory
+
+@pytest.mark.asyncio
+async def test_saved_indexes_load_without_reindexing(tmp_path, monkeypatch):
+    docs = tmp_path / "docs"
+    _write(docs / "packing.md", "# Packing\nBring a rain jacket for Porto in winter.")
+    KnowledgeBase(Retriever(), str(docs), str(tmp_path / "index")).refresh()
+
+    monkeypatch.setattr(settings, "KNOWLEDGE_BASE_DIR", str(docs))
+    monkeypatch.setattr(settings, "KNOWLEDGE_INDEX_DIR", str(tmp_path / "index"))
+    retriever = Retriever()
+    assert retriever.knowledge.manifest.keys() == {"packing.md"}
+    assert retriever.knowledge.refresh()["files"] == 0
+    results = await retriever.retrieve_relevant_info("rain jacket")
+    assert results[0]["doc_id"] == "packing.md#0" and results[0]["bm25"] > 0
+
+    # Different chunking invalidates the saved indexes
+    assert not KnowledgeBase(Retriever(), str(docs), str(tmp_path / "index"), chunk_words=50).load()
+
+@pytest.mark.asyncio
+async def test_due_refresh_runs_in_the_background_and_swaps_in_a_new_index(tmp_path):
+    docs, index = tmp_path / "docs", tmp_path / "index"
+    _write(docs / "packing.md", "# Packing\nBring a rain jacket for Porto in winter.")
+    retriever = Retriever()
+    knowledge = retriever.knowledge = KnowledgeBase(retriever, str(docs), str(index), refresh_interval=0.01)
+    knowledge.refresh()
+    first = json.loads((index / "manifest.json").read_text())["version"]
+
+    _write(docs / "visas.json", json.dumps([{"title": "Schengen visa", "content": "Apply 15 days before departure"}]))
+    knowledge._last_refresh -= 1
+    await retriever.retrieve_relevant_info("schengen visa")
+    assert knowledge.maybe_refresh() is None  # one refresh at a time
+    await knowledge._refreshing
+    assert (await retriever.retrieve_relevant_info("schengen visa"))[0]["doc_id"] == "visas.json#0"
+
+    # Saved to a new directory; the one it replaced is kept for workers still loading it
+    version = json.loads((index / "manifest.json").read_text())["version"]
+    assert version != first and (index / first).is_dir()
+    reloaded = KnowledgeBase(Retriever(), str(docs), str(index))
+    assert reloaded.load() and reloaded.manifest.keys() == {"packing.md", "visas.json"}
+
+def test_malformed_manifest_and_vanishing_files_do_not_break_startup(tmp_path, monkeypatch):
+    docs, index = tmp_path / "docs", tmp_path / "index"
+    _write(docs / "packing.md", "# Packing\nBring a rain jacket for Porto in winter.")
+    knowledge = KnowledgeBase(Retriever(), str(docs), str(index))
+    knowledge.refresh()
+
+    manifest = json.loads((index / "manifest.json").read_text())
+    for broken in ({"settings": manifest["settings"]}, {**manifest, "files": {"packing.md": {"size": 1}}}, []):
+        (index / "manifest.json").write_text(json.dumps(broken))
+        assert not KnowledgeBase(Retriever(), str(docs), str(index)).load()
+
+    # A file deleted between listing the directory and stat-ing it is skipped
+    _write(docs / "gone.md", "# Gone")
+    stat = os.stat
+
+    def racing_stat(path, *args, **kwargs):
+        if str(path).endswith("gone.md"):
+            raise FileNotFoundError(path)
+        return stat(path, *args, **kwargs)
+
+    monkeypatch.setattr(os, "stat", racing_stat)
+    assert knowledge.refresh() == {"files": 0, "chunks": 0, "removed": 0}
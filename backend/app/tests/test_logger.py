@@ -0,0 +1,63 @@
+import logging
+import threading
+import pytest
+from app.core.utils.logger import Logger, StructuredFormatter, configure_logging, parse_levels, shutdown_logging
+
+class _Capture(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.setFormatter(StructuredFormatter("%(name)s %(levelname)s %(message)s"))
+        self.lines = []
+        self.threads = set()
+
+    def emit(self, record):
+        self.threads.add(threading.current_thread())
+        self.lines.append(self.format(record))
+
+class _Expensive:
+    def __init__(self):
+        self.formatted = 0
+
+    def __str__(self):
+        self.formatted += 1
+        return "expensive"
+
+@pytest.fixture
+def captured():
+    handler = _Capture()
+    configure_logging("INFO", {"noisy": "WARNING"}, handler=handler)
+    yield handler
+    configure_logging()
+
+def test_records_are_formatted_lazily_on_the_writer_thread(captured):
+    log = Logger("travel_service")
+    skipped, written = _Expensive(), _Expensive()
+
+    log.debug("Disabled %s", skipped)
+    log.info("Planning trip %s", written, destination="Paris")
+    shutdown_logging()
+
+    assert skipped.formatted == 0
+    assert captured.threads and threading.current_thread() not in captured.threads
+    assert captured.lines == ["travel_assist.travel_service INFO Planning trip expensive destination='Paris'"]
+
+def test_module_levels_and_sampling(captured):
+    noisy = Logger("noisy")
+    noisy.info("Dropped by the module level")
+    noisy.warning("Kept")
+    for n in range(7):
+        # A new instance per call, as with tools built per request, shares the count
+        Logger("quiet").info("Retry %d", n, sample=3)
+    shutdown_logging()
+
+    assert captured.lines == [
+        "travel_assist.noisy WARNING Kept",
+        "travel_assist.quiet INFO Retry 0 sampled='1/3'",
+        "travel_assist.quiet INFO Retry 3 sampled='1/3'",
+        "travel_assist.quiet INFO Retry 6 sampled='1/3'",
+    ]
+
+def test_parse_levels():
+    assert parse_levels(" hotel_tool=warning, openai_service=DEBUG,bogus") == {
+        "hotel_tool": "WARNING", "openai_service": "DEBUG"}
+    assert parse_levels("") == {}
@@ -0,0 +1,105 @@
+import numpy as np
+import pytest
+
+from app.core.memory.ivf_index import IVFIndex
+from app.core.memory.mapped_memory import MappedVectorMemory
+from app.core.memory.vector_memory import VectorMemory
+
+def _ids(results):
+    return [[hit["doc_id"] for hit in hits] for hits in results]
+
+def test_matches_in_memory_search_and_survives_reopen(tmp_path):
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((300, 16))
+    doc_ids = [f"doc-{n}" for n in range(300)]
+    texts = [f"text {n} é" for n in range(300)]
+    memory, mapped = VectorMemory(), MappedVectorMemory(str(tmp_path), initial_capacity=8)
+    for store in (memory, mapped):
+        store.add_batch(doc_ids, texts, vectors)
+        store.delete("doc-7")
+        store.add("doc-8", "replaced", -vectors[8])
+
+    queries = rng.standard_normal((10, 16))
+    assert mapped.search_batch(queries, 5) == memory.search_batch(queries, 5)
+    mapped.close()
+
+    reopened = MappedVectorMemory(str(tmp_path))
+    assert len(reopened) == 299 and "doc-7" not in reopened
+    assert reopened.search_batch(queries, 5) == memory.search_batch(queries, 5)
+    assert reopened.search_batch([-vectors[8]], 1)[0][0]["text"] == "replaced"
+
+    # The deleted document's row is reused rather than growing the files
+    used = reopened._used
+    reopened.add("doc-new", "new", vectors[7])
+    assert reopened._used == used
+
+def test_reader_sees_writer_changes(tmp_path):
+    rng = np.random.default_rng(1)
+    writer = MappedVectorMemory(str(tmp_path), dim=8, initial_capacity=4)
+    writer.add_batch(["a", "b"], ["A", "B"], rng.standard_normal((2, 8)))
+    reader = MappedVectorMemory(str(tmp_path), readonly=True)
+    assert len(reader) == 2
+
+    # Forces the files to grow past what the reader has mapped
+    vectors = rng.standard_normal((100, 8))
+    writer.add_batch([f"n{n}" for n in range(100)], ["n"] * 100, vectors)
+    writer.delete("a")
+    assert len(reader) == 101 and "a" not in reader and "n99" in reader
+    assert reader.search_batch([vectors[42]], 1)[0][0]["doc_id"] == "n42"
+
+    with pytest.raises(PermissionError):
+        reader.add("c", "C", vectors[0])
+
+def test_trained_index_is_reloaded_on_open(tmp_path):
+    rng = np.random.default_rng(2)
+    vectors = rng.standard_normal((400, 8))
+    writer = MappedVectorMemory(str(tmp_path), index=IVFIndex(nlist=4, train_size=400))
+    writer.add_batch([f"d{n}" for n in range(400)], ["x"] * 400, vectors)
+    writer.flush()
+
+    reader = MappedVectorMemory(str(tmp_path), readonly=True)
+    assert reader.index.trained
+    np.testing.assert_array_equal(reader.index.centroids, writer.index.centroids)
+    assert _ids(reader.search_batch(vectors[:5], 3, nprobe=1)) == _ids(writer.search_batch(vectors[:5], 3, nprobe=1))
+
+def test_open_checks_the_store(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        MappedVectorMemory(str(tmp_path / "missing"), readonly=True)
+    MappedVectorMemory(str(tmp_path), dim=8)
+    with pytest.raises(ValueError):
+        MappedVectorMemory(str(tmp_path), dim=16)
+
+def test_reader_index_covers_rows_written_after_open(tmp_path):
+    rng = np.random.default_rng(3)
+    vectors = rng.standard_normal((400, 8))
+    writer = MappedVectorMemory(str(tmp_path), index=IVFIndex(nlist=4, train_size=400))
+    writer.add_batch([f"d{n}" for n in range(400)], ["x"] * 400, vectors)
+    reader = MappedVectorMemory(str(tmp_path), readonly=True)
+    assert reader.index.trained
+    saved = (tmp_path / "index.npz").stat().st_mtime_ns
+
+    late = rng.standard_normal(8)
+    writer.add("late", "L", late)
+    # A deleted row is re-used for a vector that may fall in another cluster
+    writer.delete("d3")
+    writer.add("reused", "R", -vectors[3])
+    for query, doc_id in ((late, "late"), (-vectors[3], "reused")):
+        assert reader.search_batch([query], 1, nprobe=4)[0][0]["doc_id"] == doc_id
+        assert _ids(reader.search_batch([query], 3, nprobe=1)) == _ids(writer.search_batch([query], 3, nprobe=1))
+    # Small writes do not rewrite the whole index; readers assign the new rows themselves
+    assert (tmp_path / "index.npz").stat().st_mtime_ns == saved
+
+def test_replacement_takes_a_fresh_row(tmp_path):
+    rng = np.random.default_rng(4)
+    writer = MappedVectorMemory(str(tmp_path), dim=8)
+    writer.add_batch(["a", "b"], ["A", "B"], rng.standard_normal((2, 8)))
+    reader = MappedVectorMemory(str(tmp_path), readonly=True)
+    old_row = writer._rows["a"]
+
+    replacement = rng.standard_normal(8)
+    writer.add("a", "A2", replacement)
+    # The old row is retired only after the new one is complete, and is then reused
+    assert writer._rows["a"] != old_row and not writer._live[old_row]
+    assert len(reader) == 2 and reader.search_batch([replacement], 1)[0][0]["text"] == "A2"
+    writer.add("c", "C", rng.standard_normal(8))
+    assert writer._rows["c"] == old_row
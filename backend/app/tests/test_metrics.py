@@ -0,0 +1,64 @@
+import pytest
+from fastapi.testclient import TestClient
+from app.core.utils.cache import TTLCache
+from app.core.utils.metrics import Registry, track_upstream, UPSTREAM_CALL_SECONDS
+from app.core.utils.timing import stage
+from app.main import app
+from app.services import database
+
+def test_histogram_and_counter_exposition():
+    registry = Registry()
+    latency = registry.histogram("demo_seconds", "Demo latency.", ["route"], buckets=[0.1, 1.0])
+    requests = registry.counter("demo_requests_total", "Demo requests.", ["route"])
+
+    for value in (0.05, 0.1, 0.5, 3.0):
+        latency.labels('/a"b').observe(value)
+    requests.inc("/a", amount=2)
+
+    lines = registry.render().splitlines()
+
+    assert "# TYPE demo_seconds histogram" in lines
+    assert 'demo_seconds_bucket{route="/a\\"b",le="0.1"} 2' in lines
+    assert 'demo_seconds_bucket{route="/a\\"b",le="1.0"} 3' in lines
+    assert 'demo_seconds_bucket{route="/a\\"b",le="+Inf"} 4' in lines
+    assert 'demo_seconds_sum{route="/a\\"b"} 3.65' in lines
+    assert 'demo_seconds_count{route="/a\\"b"} 4' in lines
+    assert 'demo_requests_total{route="/a"} 2' in lines
+    with pytest.raises(ValueError):
+        latency.labels("/a", "extra")
+
+def test_track_upstream_outcomes():
+    before = {outcome: UPSTREAM_CALL_SECONDS.labels("demo", outcome).counts[:] for outcome in ("cached", "error")}
+
+    with track_upstream("demo") as call:
+        call.outcome = "cached"
+    with pytest.raises(RuntimeError):
+        with track_upstream("demo"):
+            raise RuntimeError("upstream down")
+
+    for outcome in ("cached", "error"):
+        assert sum(UPSTREAM_CALL_SECONDS.labels("demo", outcome).counts) == sum(before[outcome]) + 1
+
+def test_metrics_endpoint_reports_stages_storage_and_caches(tmp_path, monkeypatch):
+    trips_file = tmp_path / "trips.json"
+    trips_file.write_text("[]")
+    monkeypatch.setattr(database, "TRIPS_FILE", str(trips_file))
+    monkeypatch.setattr(database, "CONTACT_FILE", str(tmp_path / "contact_messages.json"))
+    monkeypatch.setattr(database, "USERS_FILE", str(tmp_path / "users.json"))
+    cache = TTLCache(60, name="metrics_test")
+    cache.set("a", 1)
+    cache.get("a")
+    cache.get("b")
+    with stage("research"):
+        pass
+    database.load_data()
+
+    response = TestClient(app).get("/metrics")
+    body = response.text
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert 'travel_plan_stage_seconds_count{stage="research"}' in body
+    assert 'storage_operation_seconds_count{operation="read",file="trips.json"}' in body
+    assert 'cache_hit_ratio{cache="metrics_test"} 0.5' in body
+    assert 'cache_entries{cache="metrics_test"} 1' in body
@@ -0,0 +1,140 @@
+import json
+from types import SimpleNamespace
+import pytest
+from app.config import settings
+from app.services import database, openai_service
+from app.services.llm_health import LLMHealth
+from app.services.openai_service import OpenAIService
+from app.services.trip_index import LLM_SOURCE, PAST_TRIP_SOURCE, PastTripIndex
+
+def _trip(trip_id, destination, days, interests, source=LLM_SOURCE, travel_style="mid-range", degraded=False,
+          special_requests=""):
+    daily_plan = [{"day": n, "morning": f"{destination} sight {n}", "afternoon": f"{destination} walk {n}",
+                   "evening": f"{destination} dinner {n}", "estimated_cost": 100 + n} for n in range(1, days + 1)]
+    return {
+        "id": trip_id, "destination": destination, "interests": interests, "travel_style": travel_style,
+        "degraded": degraded, "special_requests": special_requests,
+        "itinerary": {"daily_plan": daily_plan, "recommendations": [f"Tip for trip {trip_id}"],
+                      "api_sources": {"itinerary": source}}
+    }
+
+@pytest.fixture
+def trips_file(tmp_path, monkeypatch):
+    path = tmp_path / "trips.json"
+    path.write_text(json.dumps([
+        _trip(1, "Paris", 5, ["food", "art"]),
+        _trip(2, "Paris, France", 3, ["nightlife"]),
+        _trip(3, "Paris", 5, ["food", "art"], source="Enhanced Dynamic Generation"),
+        _trip(4, "Paris", 5, ["food", "art"], degraded=True),
+        _trip(5, "Lisbon", 4, ["food"])
+    ]))
+    monkeypatch.setattr(database, "TRIPS_FILE", str(path))
+    return path
+
+def test_find_scores_llm_itineraries_for_the_same_destination(trips_file):
+    index = PastTripIndex()
+    assert len(index) == 0 and index.find({"destination": "Rome", "duration": 3}) is None
+    assert len(index) == 3  # templates and degraded plans are not indexed
+
+    past, similarity = index.find({"destination": " paris ", "duration": 4, "interests": ["Art", "food"],
+                                   "travel_style": "mid-range"})
+    assert past.trip_id == 1 and similarity == pytest.approx(0.4 * 4 / 5 + 0.45 + 0.15)
+
+    past, _ = index.find({"destination": "Paris", "duration": 3, "interests": ["nightlife"], "travel_style": "mid-range"})
+    assert past.trip_id == 2
+    assert index.find({"destination": "Paris", "duration": 10, "interests": ["hiking"], "travel_style": "luxury"}) is None
+
+def test_reuse_needs_enough_days_and_no_special_requests(trips_file):
+    index = PastTripIndex(reuse_similarity=0.9)
+    request = {"destination": "Paris", "duration": 4, "interests": ["food", "art"], "travel_style": "mid-range"}
+    assert index.reusable(request, *index.find(request))
+    assert not index.reusable(dict(request, special_requests="wheelchair access"), *index.find(request))
+    longer = dict(request, duration=6)
+    assert not index.reusable(longer, *index.find(longer))
+
+    # A plan built around someone else's special requests is only an exemplar
+    index.add(_trip(7, "Paris", 5, ["food", "art"], special_requests="vegan meals only"))
+    past, similarity = index.find(request)
+    assert past.trip_id == 7 and past.special_requests and not index.reusable(request, past, similarity)
+    index.add(_trip(7, "Paris", 5, ["food", "art"]))
+
+    past, _ = index.find(request)
+    plan = past.adapted_plan(2)
+    assert [day["day"] for day in plan] == [1, 2]
+    plan[0]["morning"] = "changed"
+    assert past.daily_plan[0]["morning"] == "Paris sight 1"
+
+def test_index_follows_the_trips_file(trips_file):
+    index = PastTripIndex()
+    assert index.find({"destination": "Tokyo", "duration": 3}) is None
+
+    trips = json.loads(trips_file.read_text())
+    trips.append(_trip(6, "Tokyo", 3, []))
+    trips_file.write_text(json.dumps(trips))
+    assert index.find({"destination": "Tokyo", "duration": 3})[0].trip_id == 6
+
+    # An upgraded trip replaces its earlier itinerary
+    index.add(_trip(6, "Tokyo", 2, ["anime"]))
+    past, _ = index.find({"destination": "Tokyo", "duration": 2, "interests": ["anime"]})
+    assert len(index) == 4 and past.duration == 2
+
+def _service(monkeypatch, index, content=None):
+    monkeypatch.setattr(openai_service, "llm_health", LLMHealth())
+    monkeypatch.setattr(openai_service, "past_trips", index)
+    calls = []
+
+    def create(**kwargs):
+        calls.append(kwargs)
+        if content is None:
+            raise AssertionError("the LLM should not be called")
+        return SimpleNamespace(usage=None, choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+    service = OpenAIService()
+    service.api_key = "key"
+    service.client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    return service, calls
+
+@pytest.mark.asyncio
+async def test_close_past_trip_is_returned_without_an_llm_call(trips_file, monkeypatch):
+    service, calls = _service(monkeypatch, PastTripIndex(reuse_similarity=0.9))
+
+    itinerary = await service.generate_itinerary({"destination": "Paris", "duration": 4, "interests": ["food", "art"],
+                                                  "travel_style": "mid-range"})
+
+    assert calls == []
+    assert itinerary["api_source"] == PAST_TRIP_SOURCE and itinerary["past_trip_id"] == 1
+    assert len(itinerary["daily_plan"]) == 4
+    assert itinerary["total_estimated_cost"] == 101 + 102 + 103 + 104
+    assert itinerary["recommendations"] == ["Tip for trip 1"]
+
+@pytest.mark.asyncio
+async def test_similar_past_trip_shortens_the_prompt(trips_file, monkeypatch):
+    response = json.dumps({"daily_plan": [{"day": n, "morning": "m", "afternoon": "a", "evening": "e",
+                                           "estimated_cost": 90} for n in (1, 2, 3, 4, 5, 6)],
+                           "recommendations": ["r"]})
+    service, calls = _service(monkeypatch, PastTripIndex(reuse_similarity=0.9), response)
+
+    itinerary = await service.generate_itinerary({"destination": "Paris", "duration": 6, "interests": ["food"],
+                                                  "travel_style": "mid-range"})
+
+    assert itinerary["api_source"] == LLM_SOURCE and itinerary["past_trip_id"] == 1
+    prompt = calls[0]["messages"][1]["content"]
+    assert "Day 1: Paris sight 1 | Paris walk 1 | Paris dinner 1 (~$101)" in prompt
+    assert "Swayambhunath" not in prompt
+    assert calls[0]["max_tokens"] == settings.PAST_TRIP_MAX_TOKENS
+
+    await service.generate_itinerary({"destination": "Kyoto", "duration": 3})
+    assert calls[1]["max_tokens"] == 2000 and "Swayambhunath" in calls[1]["messages"][1]["content"]
+
+@pytest.mark.asyncio
+async def test_past_trip_is_reused_while_the_llm_is_degraded(trips_file, monkeypatch):
+    service, calls = _service(monkeypatch, PastTripIndex(reuse_similarity=0.9))
+    monkeypatch.setattr(openai_service.llm_health, "degraded_reason", lambda: "error_rate")
+
+    reused = await service.generate_itinerary({"destination": "Paris", "duration": 4, "interests": ["food", "art"],
+                                               "travel_style": "mid-range"})
+    degraded = await service.generate_itinerary({"destination": "Kyoto", "duration": 3})
+
+    assert calls == []
+    assert reused["api_source"] == PAST_TRIP_SOURCE
+    assert degraded.get("degraded") is True
@@ -0,0 +1,60 @@
+import pstats
+import pytest
+from fastapi.testclient import TestClient
+from app.config import settings
+from app.core.utils import profiling
+from app.core.utils.profiling import ProfileStore, profile_request
+from app.main import app
+
+TOKEN = "test-profile-token"
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    test_store = ProfileStore(str(tmp_path / "profiles"), max_profiles=2)
+    monkeypatch.setattr(profiling, "profile_store", test_store)
+    monkeypatch.setattr(settings, "PROFILE_TOKEN", TOKEN)
+    return test_store
+
+def test_only_requests_with_the_token_are_profiled(store, tmp_path):
+    client = TestClient(app)
+
+    assert "X-Profile-Id" not in client.get("/api/v1/trips").headers
+    assert "X-Profile-Id" not in client.get("/api/v1/trips", headers={"X-Profile-Token": "wrong"}).headers
+    assert store.list() == []
+
+    response = client.get("/api/v1/trips", headers={"X-Profile-Token": TOKEN})
+    profile_id = response.headers["X-Profile-Id"]
+    [meta] = store.list()
+    assert meta["id"] == profile_id
+    assert meta["path"] == "/api/v1/trips" and meta["status_code"] == 200
+    assert meta["trace_id"] == response.headers.get("X-Trace-Id")
+
+    summary = client.get(f"/api/v1/debug/profiles/{profile_id}?sort=cumulative&limit=500", headers={"X-Profile-Token": TOKEN})
+    assert summary.status_code == 200
+    assert "load_data" in summary.text
+
+    download = client.get(f"/api/v1/debug/profiles/{profile_id}/download", headers={"X-Profile-Token": TOKEN})
+    path = tmp_path / "download.prof"
+    path.write_bytes(download.content)
+    assert pstats.Stats(str(path)).total_calls > 0
+
+def test_profile_routes_require_the_token(store, monkeypatch):
+    client = TestClient(app)
+    assert client.get("/api/v1/debug/profiles").status_code == 403
+    assert client.get("/api/v1/debug/profiles", headers={"X-Profile-Token": TOKEN}).status_code == 200
+    assert client.get("/api/v1/debug/profiles/../../etc", headers={"X-Profile-Token": TOKEN}).status_code == 404
+
+    monkeypatch.setattr(settings, "PROFILE_TOKEN", "")
+    assert client.get("/api/v1/debug/profiles", headers={"X-Profile-Token": ""}).status_code == 403
+    assert "X-Profile-Id" not in client.get("/api/v1/trips", headers={"X-Profile-Token": ""}).headers
+
+def test_one_profile_at_a_time_and_old_profiles_are_pruned(store):
+    with profile_request(path="/outer") as outer:
+        with profile_request(path="/inner") as inner:
+            pass
+    assert inner.profile_id is None and outer.profile_id is not None
+
+    for n in range(3):
+        with profile_request(path=f"/{n}"):
+            sum(range(1000))
+    assert [meta["path"] for meta in store.list()] == ["/2", "/1"]
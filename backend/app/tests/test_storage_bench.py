@@ -0,0 +1,62 @@
+import json
+import random
+from app.services import database
+from benchmarks.data_generator import generate_dataset, generate_trip, parse_scale
+from benchmarks.storage_bench import FileBackend, benchmark_backend, validate_backend
+
+# Top-level keys main.plan_trip writes for every trip
+PLAN_TRIP_KEYS = {
+    "id", "from", "destination", "start_date", "end_date", "budget", "travelers", "travel_style",
+    "accommodation", "transportation", "meal_preference", "activity_level", "special_requests",
+    "interests", "plan", "itinerary", "summary", "trip_request", "cost_breakdown",
+    "hotel_recommendations", "api_sources", "ai_enhanced", "created_at"
+}
+
+class _DroppingBackend(FileBackend):
+    """Loses the last user, as a broken replacement store might."""
+
+    name = "dropping"
+
+    def load_data(self):
+        trips, messages, users = super().load_data()
+        return trips, messages, users[:-1]
+
+    def get_user_by_email(self, email):
+        return None
+
+def test_generated_dataset_matches_plan_trip_shape(tmp_path):
+    paths = generate_dataset(str(tmp_path), 40, seed=3)
+
+    with open(paths["trips"]) as f:
+        trips = json.load(f)
+    with open(paths["users"]) as f:
+        users = json.load(f)
+
+    assert len(trips) == 40 and len(users) == 8
+    assert set(trips[0]) == PLAN_TRIP_KEYS
+    assert [t["id"] for t in trips] == list(range(1, 41))
+    assert len(trips[0]["itinerary"]["daily_plan"]) == trips[0]["itinerary"]["duration"]
+    assert len({u["email"] for u in users}) == len(users)
+    assert generate_trip(random.Random(5), 1) == generate_trip(random.Random(5), 1)
+    assert parse_scale("10k") == 10_000 and parse_scale("1m") == 1_000_000 and parse_scale("250") == 250
+
+def test_file_backend_validation_and_timings(tmp_path):
+    generate_dataset(str(tmp_path), 30, seed=3)
+    previous = database.TRIPS_FILE
+    reference = FileBackend(str(tmp_path))
+    try:
+        trips, _, users = reference.load_data()
+        trip_ids, emails = [trips[5]["id"], -1], [users[-1]["email"]]
+
+        assert reference.get_trip(trip_ids[0]) == trips[5]
+        assert reference.dashboard_stats()["total_trips"] == 30
+        assert validate_backend(reference, reference, trip_ids, emails) == []
+        problems = validate_backend(_DroppingBackend(str(tmp_path)), reference, trip_ids, emails)
+        assert problems == ["load_data users: 5 records, expected 6", f"user_by_email {emails[0]}: mismatch"]
+
+        timings = benchmark_backend(reference, trip_ids, emails, repeats=2)
+        assert set(timings) == {"load_data", "save_trips", "trip_by_id", "user_by_email", "dashboard_stats"}
+        assert reference.load_data()[0] == trips
+    finally:
+        reference.close()
+    assert database.TRIPS_FILE == previous
@@ -0,0 +1,105 @@
+import aiohttp
+import asyncio
+import pytest
+import pytest_asyncio
+from app.config import settings, upstream_url
+from app.core.tools import flight_tool as flight_tool_module
+from app.core.tools import weather_tool as weather_tool_module
+from app.core.tools.hotel_tool import HotelTool
+from app.stubs import StubServer, StubConfig, ProviderProfile, LatencyProfile
+
+@pytest_asyncio.fixture
+async def stub(monkeypatch):
+    for env_var in ("HOTELS_API_KEY", "WEATHER_API_KEY", "FLIGHTS_API_KEY", "FLIGHTS_API_SECRET"):
+        monkeypatch.delenv(env_var, raising=False)
+    server = StubServer(StubConfig(seed=1))
+    url = await server.start()
+    monkeypatch.setattr(settings, "UPSTREAM_STUB_URL", url)
+    weather_tool_module._weather_cache.clear()
+    flight_tool_module._flight_cell_cache.clear()
+    yield server
+    await server.stop()
+
+def test_upstream_url_maps_provider_paths(monkeypatch):
+    monkeypatch.setattr(settings, "UPSTREAM_STUB_URL", "")
+    assert upstream_url("rapidapi", "https://booking-com.p.rapidapi.com/v1") == "https://booking-com.p.rapidapi.com/v1"
+
+    monkeypatch.setattr(settings, "UPSTREAM_STUB_URL", "http://127.0.0.1:8099/")
+    assert upstream_url("rapidapi", "https://booking-com.p.rapidapi.com/v1") == "http://127.0.0.1:8099/rapidapi/v1"
+    assert upstream_url("amadeus", "https://test.api.amadeus.com") == "http://127.0.0.1:8099/amadeus"
+
+@pytest.mark.asyncio
+async def test_tools_replay_recordings(stub):
+    hotels = await HotelTool().search_hotels("Lisbon", "2026-10-19", "2026-10-22", pages=2, limit=5)
+    weather = await weather_tool_module.WeatherTool().get_weather("Lisbon", start_date="2026-10-20",
+                                                                  end_date="2026-10-21")
+    flights = await flight_tool_module.FlightTool().search_flights("PAR", origin="NYC", departure_date="2026-10-19")
+
+    assert len(hotels) == 5
+    assert len({hotel["id"] for hotel in hotels}) == 5
+    assert [h["rating"] for h in hotels] == sorted((h["rating"] for h in hotels), reverse=True)
+    assert weather["location"].startswith("Lisbon")
+    assert [day["date"] for day in weather["daily_forecast"]] == ["2026-10-20", "2026-10-21"]
+    assert [f["price"] for f in flights] == [389.7, 468.9, 512.3]
+    assert flights[0]["origin"] == "NYC" and flights[0]["destination"] == "PAR"
+    assert flights[0]["departure_date"] == "2026-10-19"
+    assert stub.stats["rapidapi"]["requests"] == 3
+
+@pytest.mark.asyncio
+async def test_injected_rate_limit_triggers_fallback(stub):
+    stub.config.providers["amadeus"] = ProviderProfile(rate_limit_rate=1.0)
+
+    flights = await flight_tool_module.FlightTool().search_flights("PAR", origin="NYC", departure_date="2026-10-19")
+
+    assert stub.stats["amadeus"]["rate_limited"] >= 1
+    assert flights and all(flight.get("api_source") != "Amadeus API" for flight in flights)
+
+@pytest.mark.asyncio
+async def test_latency_injection_and_control_endpoints(stub):
+    stub.config.default = ProviderProfile(latency=LatencyProfile("fixed", 50.0))
+
+    async with aiohttp.ClientSession() as session:
+        loop_time = asyncio.get_running_loop().time
+        started = loop_time()
+        async with session.get(f"{stub.url}/openweather/data/2.5/weather", params={"q": "Oslo"}) as response:
+            body = await response.json()
+        elapsed = loop_time() - started
+        async with session.get(f"{stub.url}/openweather/data/2.5/unknown") as response:
+            assert response.status == 404
+        async with session.get(f"{stub.url}/__stub__/stats") as response:
+            stats = (await response.json())["stats"]
+
+    assert body["name"] == "Oslo"
+    assert elapsed >= 0.05
+    assert stats["openweather"] == {"requests": 2, "unmatched": 1}
+
+@pytest.mark.asyncio
+async def test_recordings_never_hold_secrets(tmp_path, monkeypatch):
+    from aiohttp import web
+    from aiohttp.test_utils import TestServer
+    from app.stubs import server as stub_server
+
+    async def token(request):
+        return web.json_response({"type": "amadeusOAuth2Token", "access_token": "real-token",
+                                  "nested": [{"id_token": "real-id"}], "expires_in": 1799})
+
+    upstream_app = web.Application()
+    upstream_app.router.add_post("/v1/security/oauth2/token", token)
+    upstream = TestServer(upstream_app)
+    await upstream.start_server()
+    monkeypatch.setitem(stub_server.UPSTREAM_HOSTS, "amadeus", str(upstream.make_url("")).rstrip("/"))
+    recorder = StubServer(StubConfig(recordings_dir=str(tmp_path), record=True))
+    url = await recorder.start()
+    try:
+        async with aiohttp.ClientSession() as session:
+            async with session.post(f"{url}/amadeus/v1/security/oauth2/token?client_id=abc",
+                                    data={"grant_type": "client_credentials", "client_secret": "s"}) as response:
+                assert (await response.json())["access_token"] == "real-token"
+    finally:
+        await recorder.stop()
+        await upstream.close()
+
+    recording = (tmp_path / "amadeus.json").read_text()
+    assert "real-token" not in recording and "real-id" not in recording and "abc" not in recording
+    [entry] = stub_server.RecordingStore(str(tmp_path)).entries("amadeus", "POST /v1/security/oauth2/token")
+    assert entry["body"]["access_token"] == "recorded-access-token" and entry["body"]["expires_in"] == 1799
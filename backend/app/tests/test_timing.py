@@ -0,0 +1,63 @@
+import asyncio
+import pytest
+from app.core.utils.timing import start_timing, stage, current_timings, server_timing_header, parse_server_timing
+from benchmarks.plan_trip_bench import compare_results, summarize
+
+@pytest.mark.asyncio
+async def test_stages_accumulate_per_request_context():
+    async def request(delay: float):
+        timings = start_timing()
+        with stage("research"):
+            await asyncio.sleep(delay)
+        with stage("research"):
+            await asyncio.sleep(delay)
+        with stage("persistence"):
+            pass
+        return timings
+
+    fast, slow = await asyncio.gather(
+        asyncio.create_task(request(0.01)),
+        asyncio.create_task(request(0.03))
+    )
+
+    assert list(fast) == ["research", "persistence"]
+    assert 20 <= fast["research"] < slow["research"]
+    assert slow["research"] >= 60
+    assert current_timings() is None
+
+def test_stage_outside_request_is_noop():
+    with stage("research"):
+        pass
+    assert current_timings() is None
+
+def test_server_timing_round_trip():
+    header = server_timing_header({"research": 120.456, "summary": 0.5})
+
+    assert header == "research;dur=120.46, summary;dur=0.50"
+    assert parse_server_timing(header + ', cache;desc="hit"') == {"research": 120.46, "summary": 0.5}
+
+def _run(throughput: float, total_p95: float, research_p95: float):
+    return {"levels": {"4": {
+        "throughput_rps": throughput,
+        "latency_ms": {
+            "total": {"p50": 100.0, "p95": total_p95, "p99": 300.0},
+            "research": {"p50": 50.0, "p95": research_p95, "p99": 90.0}
+        }
+    }}}
+
+def test_compare_results_flags_regressions_beyond_threshold():
+    baseline = _run(10.0, 200.0, 0.4)
+
+    assert compare_results(_run(9.5, 220.0, 0.4), baseline, threshold=0.15) == []
+    regressions = compare_results(_run(8.0, 260.0, 0.9), baseline, threshold=0.15)
+
+    assert len(regressions) == 2
+    assert regressions[0].startswith("c=4 throughput")
+    assert regressions[1].startswith("c=4 total p95: 200.0ms -> 260.0ms")
+
+def test_summarize_percentiles():
+    stats = summarize([float(v) for v in range(1, 101)])
+
+    assert stats["p50"] == 50.5
+    assert stats["p99"] == pytest.approx(99.01)
+    assert stats["max"] == 100.0
@@ -0,0 +1,90 @@
+import asyncio
+import pytest
+from contextlib import nullcontext
+from fastapi.testclient import TestClient
+from app.config import settings
+from app.core.utils import profiling, tracing
+from app.core.utils.tracing import Tracer, start_trace, span, traced, build_tree
+from app.main import app
+
+@pytest.fixture
+def tracer(tmp_path, monkeypatch):
+    test_tracer = Tracer(str(tmp_path / "traces.jsonl"), max_bytes=4000, backups=2, buffer_size=2)
+    monkeypatch.setattr(tracing, "tracer", test_tracer)
+    yield test_tracer
+    test_tracer.close()
+
+@traced("agent_call")
+async def _agent(delay: float):
+    with span("tool.demo", city="Paris") as tool_span:
+        await asyncio.sleep(delay)
+        tool_span.set(outcome="live")
+
+@pytest.mark.asyncio
+async def test_spans_nest_under_the_current_span(tracer):
+    with start_trace("POST /plan") as trace:
+        await asyncio.gather(_agent(0.01), _agent(0.02))
+        with span("storage.write"):
+            pass
+
+    tree = build_tree(tracer.find(trace.trace_id))
+    root = tree["root"]
+
+    assert root["name"] == "POST /plan" and root["duration_ms"] >= 20
+    assert [child["name"] for child in root["children"]] == ["agent_call", "agent_call", "storage.write"]
+    tool = root["children"][1]["children"][0]
+    assert tool["name"] == "tool.demo"
+    assert tool["attributes"] == {"city": "Paris", "outcome": "live"}
+    assert tool["duration_ms"] >= 20
+
+def test_spans_outside_a_trace_are_noops(tracer):
+    with span("storage.read") as orphan:
+        orphan.set(file="trips.json")
+    assert orphan.attributes == {}
+    assert tracing.current_trace_id() is None
+
+def test_errors_are_recorded_and_old_traces_read_back_from_rotated_files(tracer):
+    trace_ids = []
+    for n in range(12):
+        with pytest.raises(ValueError) if n == 0 else nullcontext():
+            with start_trace("GET /trips", n=n) as trace:
+                trace_ids.append(trace.trace_id)
+                with span("storage.read", file="trips.json"):
+                    if n == 0:
+                        raise ValueError("corrupt file")
+
+    assert len(tracer.recent()) == 2
+    first = tracer.find(trace_ids[0])
+    assert first is not None
+    assert first["spans"][1]["error"] == "ValueError: corrupt file"
+    assert tracer.find("0" * 32) is None
+
+def test_requests_are_traced_and_viewable(tracer, monkeypatch):
+    monkeypatch.setattr(settings, "PROFILE_TOKEN", "test-token")
+    client = TestClient(app, headers={"X-Profile-Token": "test-token"})
+
+    response = client.get("/api/v1/trips")
+    trace_id = response.headers["X-Trace-Id"]
+    profiles = len(profiling.profile_store.list())
+    trace_response = client.get(f"/api/v1/debug/traces/{trace_id}")
+    trace = trace_response.json()["data"]
+    # Viewing a trace is not itself profiled, so it cannot prune the profiles being inspected
+    assert "X-Profile-Id" not in trace_response.headers and len(profiling.profile_store.list()) == profiles
+
+    assert trace["root"]["name"] == "GET /api/v1/trips"
+    assert trace["root"]["attributes"]["status_code"] == 200
+    assert {child["name"] for child in trace["root"]["children"]} == {"storage.read"}
+    assert client.get("/api/v1/debug/traces").json()["data"]["traces"][0]["trace_id"] == trace_id
+    assert client.get("/api/v1/debug/traces/unknown").status_code == 404
+    assert "X-Trace-Id" not in client.get("/metrics").headers
+
+    for path in ("/api/v1/debug/traces", f"/api/v1/debug/traces/{trace_id}"):
+        assert client.get(path, headers={"X-Profile-Token": "wrong"}).status_code == 403
+
+def test_traces_are_written_off_the_calling_thread(tracer):
+    with start_trace("GET /trips") as trace:
+        pass
+    assert tracer._writer is not None and tracer._writer.is_alive()
+    tracer.flush()
+    with open(tracer.path) as f:
+        assert trace.trace_id in f.read()
@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+from app.core.memory.vector_memory import VectorMemory
+
+def _brute_force(vectors, query, k):
+    unit = {doc_id: v / np.linalg.norm(v) for doc_id, v in vectors.items()}
+    q = query / np.linalg.norm(query)
+    return sorted(unit, key=lambda doc_id: -float(unit[doc_id] @ q))[:k]
+
+def test_top_k_matches_brute_force_after_growth_and_deletes():
+    rng = np.random.default_rng(0)
+    memory = VectorMemory(initial_capacity=4)
+    vectors = {f"d{n}": rng.standard_normal(16).astype(np.float32) for n in range(60)}
+    memory.add_batch(list(vectors), list(vectors), list(vectors.values()))
+    for n in range(0, 60, 3):
+        assert memory.delete(f"d{n}")
+        del vectors[f"d{n}"]
+    assert not memory.delete("d0")
+
+    # New documents reuse freed rows instead of growing the matrix
+    capacity = len(memory._matrix)
+    vectors["new"] = rng.standard_normal(16).astype(np.float32)
+    memory.add("new", "new", vectors["new"])
+    assert len(memory) == 41 and len(memory._matrix) == capacity
+
+    queries = rng.standard_normal((5, 16))
+    for query, hits in zip(queries, memory.search_batch(queries, top_k=7)):
+        assert [hit["doc_id"] for hit in hits] == _brute_force(vectors, query, 7)
+        assert hits[0]["similarity"] >= hits[-1]["similarity"]
+
+@pytest.mark.asyncio
+async def test_store_replace_and_search():
+    memory = VectorMemory()
+    await memory.store_embedding("paris", "Paris guide", [1.0, 0.0, 0.0])
+    await memory.store_embedding("rome", "Rome guide", [0.0, 2.0, 0.0])
+    await memory.store_embedding("paris", "Paris guide v2", [0.0, 0.0, 3.0])
+
+    hits = await memory.similarity_search([0.0, 0.1, 1.0], top_k=5)
+    assert [hit["doc_id"] for hit in hits] == ["paris", "rome"]
+    assert hits[0]["text"] == "Paris guide v2"
+    assert hits[0]["similarity"] == pytest.approx(1 / np.sqrt(1.01), rel=1e-5)
+    assert np.linalg.norm(memory.get_embedding("rome")) == pytest.approx(1.0)
+
+    with pytest.raises(ValueError):
+        memory.add("oslo", "Oslo", [1.0, 0.0])
+    assert await VectorMemory().similarity_search([1.0, 0.0]) == []
@@ -0,0 +1,130 @@
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from app.core.tools import weather_tool as weather_tool_module
+
+def _current(city: str):
+    return {
+        "name": city,
+        "sys": {"country": "XX", "sunrise": 1, "sunset": 2},
+        "main": {"temp": 21.4, "feels_like": 20.9, "humidity": 60, "pressure": 1012},
+        "weather": [{"main": "Clouds", "description": "broken clouds"}],
+        "wind": {"speed": 3.1, "deg": 200},
+        "visibility": 10000
+    }
+
+def _forecast():
+    entries = []
+    for day in (18, 19):
+        for hour, condition, temp in ((0, "Rain", 12.0), (9, "Clouds", 17.0), (15, "Clouds", 21.0)):
+            entries.append({
+                "dt_txt": f"2026-10-{day} {hour:02d}:00:00",
+                "main": {"temp": temp, "humidity": 70},
+                "weather": [{"main": condition, "description": condition.lower()}],
+                "wind": {"speed": 4.0}
+            })
+    return {"list": entries}
+
+@pytest_asyncio.fixture
+async def weather_stub(monkeypatch):
+    requests = []
+
+    async def current(request):
+        requests.append(("weather", request.query["q"]))
+        return web.json_response(_current(request.query["q"]))
+
+    async def forecast(request):
+        requests.append(("forecast", request.query["q"]))
+        return web.json_response(_forecast())
+
+    app = web.Application()
+    app.router.add_get("/weather", current)
+    app.router.add_get("/forecast", forecast)
+    server = TestServer(app)
+    await server.start_server()
+
+    monkeypatch.setenv("WEATHER_API_KEY", "test-key")
+    weather_tool_module._weather_cache.clear()
+    tool = weather_tool_module.WeatherTool()
+    tool.base_url = str(server.make_url("")).rstrip("/")
+    yield tool, requests
+    await server.close()
+
+@pytest.mark.asyncio
+async def test_weather_many_dedupes_and_serves_from_cache(weather_stub):
+    tool, requests = weather_stub
+
+    first = await tool.get_weather_many(["Paris", "paris ", "London"])
+
+    assert set(first) == {"Paris", "London"}
+    assert sorted(requests) == sorted([("weather", "Paris"), ("forecast", "Paris"),
+                                       ("weather", "London"), ("forecast", "London")])
+    assert first["Paris"]["temperature"] == "21°C"
+    assert first["Paris"]["daily_forecast"][0]["condition"] == "Clouds"
+
+    second = await tool.get_weather_many(["London", "PARIS"])
+    single = await tool.get_weather("paris")
+
+    assert len(requests) == 4
+    assert second["London"] == first["London"]
+    assert single["location"] == "Paris"
+
+@pytest.mark.asyncio
+async def test_units_are_part_of_the_cache_key(weather_stub):
+    tool, requests = weather_stub
+
+    metric = await tool.get_weather("Paris")
+    imperial = await tool.get_weather("Paris", units="imperial")
+
+    assert len(requests) == 4
+    assert metric["temperature"].endswith("°C")
+    assert imperial["temperature"].endswith("°F")
+
+def test_forecast_engine_aggregates_days_and_slices_to_trip_dates():
+    from app.core.tools.forecast_engine import ForecastSeries
+
+    series = ForecastSeries(_forecast()["list"])
+    daily = series.daily_forecast()
+
+    assert [day["date"] for day in daily] == ["2026-10-18", "2026-10-19"]
+    assert daily[0] == {
+        "date": "2026-10-18",
+        "high_temp": "21°C",
+        "low_temp": "12°C",
+        "condition": "Clouds",
+        "avg_humidity": "70%",
+        "avg_wind": "4.0 m/s"
+    }
+    assert [day["date"] for day in series.daily_forecast("2026-10-19", "2026-10-25")] == ["2026-10-19"]
+    assert [entry["time"] for entry in series.entries("2026-10-19")] == ["00:00:00", "09:00:00", "15:00:00"]
+    assert series.entries("2026-11-01") == []
+
+@pytest.mark.asyncio
+async def test_trip_dates_slice_cached_forecast(weather_stub):
+    tool, requests = weather_stub
+
+    full = await tool.get_weather("Paris")
+    trip = await tool.get_weather("Paris", start_date="2026-10-19", end_date="2026-10-20")
+
+    assert len(requests) == 2
+    assert len(full["daily_forecast"]) == 2
+    assert [day["date"] for day in trip["daily_forecast"]] == ["2026-10-19"]
+    assert all(entry["date"] == "2026-10-19" for entry in trip["forecast"])
+
+@pytest.mark.asyncio
+async def test_malformed_trip_dates_are_ignored_not_mocked(weather_stub):
+    tool, _ = weather_stub
+
+    single = await tool.get_weather("Paris", start_date="19/10/2026", end_date="2026-10-19")
+    many = await tool.get_weather_many(["Paris"], start_date="soon")
+
+    assert single["location"] == "Paris" and [day["date"] for day in single["daily_forecast"]] == ["2026-10-18", "2026-10-19"]
+    assert len(many["Paris"]["daily_forecast"]) == 2
+
+def test_weather_route_rejects_malformed_dates():
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    response = TestClient(app).get("/api/v1/weather", params={"cities": "Paris", "start_date": "19/10/2026"})
+    assert response.status_code == 400 and "start_date" in response.json()["detail"]
@@ -0,0 +1,119 @@
+"""
+Approximate Search Benchmarks
+Recall against exact search and query latency of VectorMemory with an IVFIndex
+(app/core/memory/ivf_index.py) at each nprobe, plus the time to build the index and
+to save and reload it. Data is a gaussian mixture so the clusters mean something;
+queries are held-out points from the same mixture.
+
+    python -m benchmarks.ann_bench --vectors 200k --nlist 512 --nprobes 1,2,4,8,16,32 --output ann.json
+"""
+
+from typing import Any, Dict, List
+from datetime import datetime
+import argparse
+import json
+import platform
+import tempfile
+import time
+import numpy as np
+
+from app.core.memory.ivf_index import IVFIndex
+from app.core.memory.vector_memory import VectorMemory
+from benchmarks.data_generator import parse_scale
+from benchmarks.vector_bench import _latency_ms
+
+def clustered_vectors(count: int, dim: int, clusters: int, rng: np.random.Generator) -> np.ndarray:
+    centers = rng.standard_normal((clusters, dim), dtype=np.float32)
+    members = rng.integers(0, clusters, count)
+    return centers[members] + 0.5 * rng.standard_normal((count, dim), dtype=np.float32)
+
+def _recall(approximate: List[List[Dict[str, Any]]], exact: List[List[Dict[str, Any]]]) -> float:
+    found = sum(len({hit["doc_id"] for hit in a} & {hit["doc_id"] for hit in e}) for a, e in zip(approximate, exact))
+    return found / max(1, sum(len(e) for e in exact))
+
+def run(count: int, dim: int, nlist: int, nprobes: List[int], top_k: int, queries: int, seed: int) -> Dict[str, Any]:
+    rng = np.random.default_rng(seed)
+    data = clustered_vectors(count + queries, dim, max(nlist // 4, 1), rng)
+    vectors, held_out = data[:count], data[count:]
+    doc_ids = [f"doc-{n}" for n in range(count)]
+
+    exact = VectorMemory(dim=dim)
+    exact.add_batch(doc_ids, doc_ids, vectors)
+    approximate = VectorMemory(dim=dim, index=IVFIndex(nlist=nlist, train_size=count + 1))
+    approximate.add_batch(doc_ids, doc_ids, vectors)
+    started = time.perf_counter()
+    approximate.build_index()
+    build_s = time.perf_counter() - started
+
+    truth = exact.search_batch(held_out, top_k)
+    baseline = _latency_ms(lambda: exact.search_batch(held_out[:1], top_k), 20)
+    sweep = []
+    for nprobe in nprobes:
+        results = approximate.search_batch(held_out, top_k, nprobe=nprobe)
+        latency = _latency_ms(lambda: [approximate.search_batch(q[None, :], top_k, nprobe=nprobe) for q in held_out[:20]], 5)
+        sweep.append({
+            "nprobe": nprobe,
+            "recall": round(_recall(results, truth), 4),
+            "p50_ms": round(latency["p50_ms"] / 20, 3),
+            "p95_ms": round(latency["p95_ms"] / 20, 3),
+        })
+
+    with tempfile.TemporaryDirectory() as directory:
+        started = time.perf_counter()
+        approximate.save(directory)
+        save_s = time.perf_counter() - started
+        started = time.perf_counter()
+        VectorMemory.load(directory)
+        load_s = time.perf_counter() - started
+
+    return {
+        "vectors": count,
+        "dim": dim,
+        "nlist": nlist,
+        "top_k": top_k,
+        "build_s": round(build_s, 3),
+        "save_s": round(save_s, 3),
+        "load_s": round(load_s, 3),
+        "exact": baseline,
+        "sweep": sweep
+    }
+
+def print_report(result: Dict[str, Any]) -> None:
+    print(f"{result['vectors']:,} vectors, dim {result['dim']}, nlist {result['nlist']}: "
+          f"build {result['build_s']:.2f}s, save {result['save_s']:.2f}s, load {result['load_s']:.2f}s")
+    recall = f"recall@{result['top_k']}"
+    print(f"{'nprobe':>8} {recall:>10} {'p50 ms':>9} {'p95 ms':>9}")
+    print(f"{'exact':>8} {1.0:>10.4f} {result['exact']['p50_ms']:>9.3f} {result['exact']['p95_ms']:>9.3f}")
+    for row in result["sweep"]:
+        print(f"{row['nprobe']:>8} {row['recall']:>10.4f} {row['p50_ms']:>9.3f} {row['p95_ms']:>9.3f}")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Recall vs latency of IVF search against exact search.")
+    parser.add_argument("--vectors", default="100k", help="Number of stored vectors, e.g. 100k or 1m")
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--nlist", type=int, default=256)
+    parser.add_argument("--nprobes", default="1,2,4,8,16,32", help="Comma-separated nprobe values")
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=200, help="Held-out queries for recall")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Write the results as JSON to this path")
+    args = parser.parse_args()
+
+    nprobes = [int(n) for n in args.nprobes.split(",") if n.strip()]
+    result = run(parse_scale(args.vectors), args.dim, args.nlist, nprobes, args.top_k, args.queries, args.seed)
+    print_report(result)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({
+                "meta": {
+                    "benchmark": "ann",
+                    "timestamp": datetime.utcnow().isoformat(),
+                    "python": platform.python_version(),
+                    "numpy": np.__version__,
+                    "seed": args.seed
+                },
+                "result": result
+            }, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,242 @@
+"""
+Synthetic Data Generator
+Writes trips.json, users.json and contact_messages.json datasets shaped like the
+records main.plan_trip, the auth routes and the contact endpoint store, at any
+scale. Records are streamed to disk, so a million trips never sit in memory at once.
+
+    python -m benchmarks.data_generator --trips 100000 --out /tmp/travel-data/trips-100000
+
+storage_bench --data-dir /tmp/travel-data reuses a dataset written to trips-<count> there.
+"""
+
+from typing import Dict, Any, Iterable, Iterator, Optional
+from datetime import datetime, timedelta
+import argparse
+import hashlib
+import json
+import os
+import random
+
+DESTINATIONS = ["Paris", "London", "Tokyo", "Rome", "Barcelona", "Amsterdam", "Berlin", "Madrid", "Dubai",
+                "New York", "Lisbon", "Prague", "Vienna", "Istanbul", "Bangkok", "Sydney", "Kyoto", "Seoul"]
+ORIGINS = ["NYC", "LAX", "CHI", "SFO", "BOS", "MIA", "LON", "PAR", ""]
+INTERESTS = ["culture", "food", "history", "art", "nightlife", "nature", "shopping", "architecture",
+             "museums", "beaches", "hiking", "music"]
+TRAVEL_STYLES = ["budget", "mid-range", "luxury"]
+FIRST_NAMES = ["John", "Sarah", "Mike", "Emma", "Liam", "Olivia", "Noah", "Ava", "Lucas", "Mia", "Ethan", "Zoe"]
+LAST_NAMES = ["Smith", "Johnson", "Wilson", "Brown", "Garcia", "Martin", "Lee", "Walker", "Young", "King"]
+AMENITIES = ["Free WiFi", "Pool", "Gym", "Spa", "Restaurant", "Bar", "Room Service", "Parking", "Airport Shuttle"]
+CATEGORIES = ["general", "technical", "booking", "billing", "feedback"]
+SLOTS = {
+    "morning": ["Walking tour of the old town", "Visit the main museum", "Local market breakfast"],
+    "afternoon": ["Guided history tour", "Art gallery visit", "Cooking class", "Boat trip"],
+    "evening": ["Dinner at a traditional restaurant", "Rooftop bar", "Live music show", "Night market"]
+}
+API_SOURCES = {
+    "weather": "OpenWeatherMap API",
+    "flights": "Amadeus API",
+    "hotels": "RapidAPI Booking.com",
+    "ai_content": "OpenAI GPT"
+}
+
+def _timestamp(rng: random.Random, start: datetime) -> str:
+    return (start + timedelta(seconds=rng.randint(0, 365 * 86400))).isoformat()
+
+def _hotel(rng: random.Random, destination: str, created_at: str) -> Dict[str, Any]:
+    return {
+        "id": f"{rng.randint(100000, 9999999)}",
+        "name": f"{rng.choice(['Grand', 'Royal', 'Central', 'Garden', 'Harbour', 'Plaza'])} Hotel {destination}",
+        "price_per_night": round(rng.uniform(60, 450), 2),
+        "currency": "USD",
+        "rating": round(rng.uniform(6.0, 9.8), 1),
+        "review_count": rng.randint(10, 5000),
+        "location": destination,
+        "address": f"{rng.randint(1, 300)} Main Street, {destination}",
+        "room_type": rng.choice(["Standard Room", "Deluxe Room", "Suite"]),
+        "bed_type": rng.choice(["King Bed", "Queen Bed", "Twin Beds"]),
+        "view": rng.choice(["City View", "Garden View", "No View"]),
+        "breakfast": rng.choice(["Continental Breakfast Included", "Not Included"]),
+        "cancellation": rng.choice(["Free Cancellation", "Non-refundable"]),
+        "distance_to_center": f"{rng.uniform(0.1, 8):.1f} km",
+        "distance_km": round(rng.uniform(0.1, 8), 1),
+        "amenities": rng.sample(AMENITIES, rng.randint(3, 6)),
+        "image_url": "",
+        "api_source": "RapidAPI Booking.com",
+        "search_timestamp": created_at
+    }
+
+def generate_trip(rng: random.Random, trip_id: int, start: datetime = datetime(2024, 1, 1)) -> Dict[str, Any]:
+    """One trip record in the shape main.plan_trip saves."""
+    destination = rng.choice(DESTINATIONS)
+    duration = rng.randint(2, 10)
+    start_date = start + timedelta(days=rng.randint(0, 540))
+    budget = rng.choice([800, 1500, 2000, 3000, 5000, 8000])
+    created_at = _timestamp(rng, start)
+    interests = rng.sample(INTERESTS, rng.randint(0, 4))
+    estimated_cost = round(budget * rng.uniform(0.7, 1.05), 1)
+
+    request = {
+        "destination": destination,
+        "start_date": start_date.strftime("%Y-%m-%d"),
+        "end_date": (start_date + timedelta(days=duration)).strftime("%Y-%m-%d"),
+        "budget": budget,
+        "travelers": rng.randint(1, 5),
+        "interests": interests,
+        "from": rng.choice(ORIGINS),
+        "travel_style": rng.choice(TRAVEL_STYLES),
+        "accommodation": rng.choice(["hotel", "apartment", "hostel"]),
+        "transportation": rng.choice(["flight", "train", "car"]),
+        "meal_preference": rng.choice(["all", "vegetarian", "vegan"]),
+        "activity_level": rng.choice(["relaxed", "moderate", "active"]),
+        "special_requests": rng.choice(["", "", "Quiet room please", "Wheelchair access"]),
+        "timestamp": created_at
+    }
+    daily_plan = [
+        {
+            "day": day + 1,
+            "morning": f"{rng.choice(SLOTS['morning'])} in {destination}",
+            "afternoon": f"{rng.choice(SLOTS['afternoon'])} in {destination}",
+            "evening": f"{rng.choice(SLOTS['evening'])} in {destination}",
+            "estimated_cost": rng.randint(60, 300)
+        }
+        for day in range(duration)
+    ]
+    budget_summary = {
+        "total_estimated": estimated_cost,
+        "breakdown": {
+            "flights": round(estimated_cost * 0.4),
+            "hotels": round(estimated_cost * 0.3),
+            "activities": round(estimated_cost * 0.2),
+            "food": round(estimated_cost * 0.1)
+        },
+        "currency": "USD"
+    }
+    itinerary_sources = {"itinerary": "Enhanced Dynamic Generation", **{k: v for k, v in API_SOURCES.items() if k != "ai_content"}}
+    summary_sources = {**API_SOURCES, "summary_generation": "AI-Powered"}
+    overview = f"Welcome to {destination}! Your personalized travel plan is ready."
+
+    return {
+        "id": trip_id,
+        **{key: request[key] for key in ("from", "destination", "start_date", "end_date", "budget", "travelers",
+                                         "travel_style", "accommodation", "transportation", "meal_preference",
+                                         "activity_level", "special_requests", "interests")},
+        "plan": overview,
+        "itinerary": {
+            "destination": destination,
+            "duration": duration,
+            "activities": [
+                {"day": d["day"], "time": slot, "activity": d[slot]} for d in daily_plan for slot in SLOTS
+            ],
+            "estimated_cost": estimated_cost,
+            "recommendations": rng.sample(["Buy a transit pass", "Book museums online", "Try the local food",
+                                           "Carry cash for markets", "Learn a few local phrases"], 3),
+            "daily_plan": daily_plan,
+            "ai_generated": True,
+            "api_sources": itinerary_sources,
+            "timestamp": created_at
+        },
+        "summary": {
+            "trip_overview": overview,
+            "key_highlights": [d["afternoon"] for d in daily_plan[:3]],
+            "budget_summary": budget_summary,
+            "recommendations": ["Check visa requirements", "Get travel insurance", "Pack for the weather"],
+            "api_sources_used": summary_sources,
+            "ai_generated": True,
+            "timestamp": created_at
+        },
+        "trip_request": request,
+        "cost_breakdown": budget_summary,
+        "hotel_recommendations": [_hotel(rng, destination, created_at) for _ in range(rng.randint(3, 5))],
+        "api_sources": {
+            **API_SOURCES,
+            "itinerary_generation": itinerary_sources,
+            "summary_generation": summary_sources
+        },
+        "ai_enhanced": True,
+        "created_at": created_at
+    }
+
+def generate_user(rng: random.Random, user_id: int, start: datetime = datetime(2024, 1, 1)) -> Dict[str, Any]:
+    """One user record in the shape the signup route saves; emails are unique per id."""
+    first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+    return {
+        "id": user_id,
+        "name": f"{first} {last}",
+        "email": f"{first.lower()}.{last.lower()}.{user_id}@example.com",
+        "password": hashlib.sha256(f"password-{user_id}".encode()).hexdigest(),
+        "status": rng.choice(["active", "active", "inactive"]),
+        "plan": rng.choice(["basic", "premium"]),
+        "created_at": _timestamp(rng, start)
+    }
+
+def generate_contact_message(rng: random.Random, message_id: int,
+                             start: datetime = datetime(2024, 1, 1)) -> Dict[str, Any]:
+    first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+    destination = rng.choice(DESTINATIONS)
+    return {
+        "id": message_id,
+        "name": f"{first} {last}",
+        "email": f"{first.lower()}.{last.lower()}@example.com",
+        "phone": f"+1 (555) {rng.randint(100, 999)}-{rng.randint(1000, 9999)}",
+        "category": rng.choice(CATEGORIES),
+        "subject": f"Question about my {destination} trip",
+        "message": f"Hi, I'm planning a trip to {destination} and would like help with the itinerary and hotels.",
+        "priority": rng.choice(["low", "normal", "high"]),
+        "created_at": _timestamp(rng, start),
+        "status": rng.choice(["new", "read", "resolved"])
+    }
+
+def write_json_array(path: str, records: Iterable[Dict[str, Any]]) -> int:
+    """Stream ``records`` to ``path`` as a JSON array and return how many were written."""
+    count = 0
+    with open(path, "w") as f:
+        f.write("[")
+        for record in records:
+            f.write(",\n" if count else "\n")
+            f.write(json.dumps(record))
+            count += 1
+        f.write("\n]" if count else "]")
+    return count
+
+def _records(factory, count: int, seed: int) -> Iterator[Dict[str, Any]]:
+    rng = random.Random(seed)
+    for record_id in range(1, count + 1):
+        yield factory(rng, record_id)
+
+def generate_dataset(directory: str, trips: int, users: Optional[int] = None, messages: Optional[int] = None,
+                     seed: int = 42) -> Dict[str, str]:
+    """Write the three data files into ``directory``; users and messages default to trips/5 and trips/10."""
+    os.makedirs(directory, exist_ok=True)
+    users = max(1, trips // 5) if users is None else users
+    messages = max(1, trips // 10) if messages is None else messages
+    paths = {
+        "trips": os.path.join(directory, "trips.json"),
+        "users": os.path.join(directory, "users.json"),
+        "contact_messages": os.path.join(directory, "contact_messages.json")
+    }
+    write_json_array(paths["trips"], _records(generate_trip, trips, seed))
+    write_json_array(paths["users"], _records(generate_user, users, seed + 1))
+    write_json_array(paths["contact_messages"], _records(generate_contact_message, messages, seed + 2))
+    return paths
+
+def parse_scale(value: str) -> int:
+    """Parse record counts such as 1000, 10k or 1m."""
+    value = value.strip().lower()
+    multiplier = {"k": 1_000, "m": 1_000_000}.get(value[-1:], 1)
+    return int(float(value.rstrip("km")) * multiplier)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Generate synthetic trips/users/contact datasets.")
+    parser.add_argument("--trips", type=parse_scale, required=True, help="Number of trips, e.g. 10k or 1m")
+    parser.add_argument("--users", type=parse_scale, help="Number of users (default: trips/5)")
+    parser.add_argument("--messages", type=parse_scale, help="Number of contact messages (default: trips/10)")
+    parser.add_argument("--out", required=True, help="Output directory")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    paths = generate_dataset(args.out, args.trips, args.users, args.messages, args.seed)
+    for name, path in paths.items():
+        print(f"{name:<17} {os.path.getsize(path) / 1e6:>10.1f} MB  {path}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Itinerary Microbenchmark
+Per-plan cost of the local template itinerary generator (app/core/tools/activity_catalog.py),
+which serves every plan while the LLM is degraded. Times the daily plan on its own
+and the full template itinerary the OpenAI service returns, for each duration.
+
+    python -m benchmarks.itinerary_bench --durations 1,3,7,14,30 --output itinerary.json
+"""
+
+from typing import Any, Callable, Dict, List
+from datetime import datetime
+import argparse
+import json
+import platform
+import timeit
+
+from app.core.tools.activity_catalog import build_daily_plan
+from app.services.openai_service import OpenAIService
+
+def _per_call_us(func: Callable[[], Any], repeats: int) -> Dict[str, float]:
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    runs = [elapsed / number * 1e6 for elapsed in timer.repeat(repeat=repeats, number=number)]
+    return {"min_us": round(min(runs), 3), "median_us": round(sorted(runs)[len(runs) // 2], 3)}
+
+def run(durations: List[int], repeats: int = 5, destination: str = "Lisbon") -> List[Dict[str, Any]]:
+    service = OpenAIService()
+    results = []
+    for duration in durations:
+        trip = {"destination": destination, "duration": duration, "interests": ["food", "culture"], "budget": 1500}
+        results.append({
+            "duration": duration,
+            "daily_plan": _per_call_us(lambda: build_daily_plan(destination, duration), repeats),
+            "template_itinerary": _per_call_us(lambda: service._get_degraded_itinerary(trip, "benchmark"), repeats)
+        })
+    return results
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Time the template itinerary generator per plan.")
+    parser.add_argument("--durations", default="1,3,7,14,30", help="Comma-separated trip lengths in days")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--output", help="Write the results as JSON to this path")
+    args = parser.parse_args()
+
+    durations = [int(days) for days in args.durations.split(",") if days.strip()]
+    results = run(durations, args.repeats)
+
+    print(f"{'days':>5} {'daily plan (us)':>17} {'full itinerary (us)':>21}")
+    for row in results:
+        print(f"{row['duration']:>5} {row['daily_plan']['median_us']:>17.2f} {row['template_itinerary']['median_us']:>21.2f}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({
+                "meta": {
+                    "benchmark": "itinerary",
+                    "timestamp": datetime.utcnow().isoformat(),
+                    "python": platform.python_version()
+                },
+                "results": results
+            }, f, indent=2)
+
+if __name__ == "__main__":
+    main()
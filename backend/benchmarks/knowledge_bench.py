@@ -0,0 +1,108 @@
+"""
+Knowledge Base Benchmarks
+Indexing and startup cost of the file-backed knowledge base (app/core/rag/knowledge_base.py)
+over synthetic Markdown guides: a cold build, a warm start from the saved indexes, a
+refresh after editing a few files, and retrieve_relevant_info latency.
+
+    python -m benchmarks.knowledge_bench --documents 2000 --output knowledge.json
+"""
+
+from typing import Any, Dict
+from datetime import datetime
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import tempfile
+import time
+
+from app.core.rag.knowledge_base import KnowledgeBase
+from app.core.rag.retriever import Retriever
+from benchmarks.data_generator import parse_scale
+from benchmarks.vector_bench import _latency_ms
+
+CITIES = ["Lisbon", "Porto", "Madrid", "Seville", "Rome", "Florence", "Paris", "Lyon", "Berlin", "Prague"]
+TOPICS = ["food", "transport", "museums", "visas", "packing", "safety", "nightlife", "markets", "beaches", "hiking"]
+WORDS = ("early late cheap free local ticket tram metro walk street market river bridge hill old "
+         "town square church tower garden park view coffee bakery wine tapas dinner lunch").split()
+
+def write_guides(directory: str, count: int, rng: random.Random) -> None:
+    for n in range(count):
+        city, topic = CITIES[n % len(CITIES)], TOPICS[(n // len(CITIES)) % len(TOPICS)]
+        sections = [
+            f"## {topic.title()} {s}\n" + " ".join(rng.choice(WORDS) for _ in range(rng.randint(60, 220)))
+            for s in range(3)
+        ]
+        with open(os.path.join(directory, f"{city.lower()}-{topic}-{n}.md"), "w") as f:
+            f.write(f"# {city} {topic}\n" + "\n\n".join(sections))
+
+def _timed(func) -> float:
+    started = time.perf_counter()
+    func()
+    return time.perf_counter() - started
+
+def run(documents: int, edits: int, seed: int) -> Dict[str, Any]:
+    rng = random.Random(seed)
+    with tempfile.TemporaryDirectory() as root:
+        docs, index = os.path.join(root, "docs"), os.path.join(root, "index")
+        os.makedirs(docs)
+        write_guides(docs, documents, rng)
+
+        retriever = Retriever()
+        knowledge = KnowledgeBase(retriever, docs, index)
+        cold_s = _timed(knowledge.refresh)
+        chunks = len(retriever.knowledge_index)
+
+        warm = KnowledgeBase(Retriever(), docs, index)
+        warm_s = _timed(lambda: (warm.load(), warm.refresh()))
+
+        for name in rng.sample(sorted(os.listdir(docs)), min(edits, documents)):
+            with open(os.path.join(docs, name), "a") as f:
+                f.write("\n\n## Update\nNew ferry timetable from the river terminal.")
+        refresh_s = _timed(warm.refresh)
+
+        loop = asyncio.new_event_loop()
+        queries = iter([f"{rng.choice(WORDS)} {rng.choice(CITIES)} {rng.choice(TOPICS)}" for _ in range(200)])
+        query = _latency_ms(lambda: loop.run_until_complete(warm.retriever.retrieve_relevant_info(next(queries))), 200)
+        loop.close()
+
+    return {
+        "documents": documents,
+        "chunks": chunks,
+        "cold_build_s": round(cold_s, 3),
+        "warm_start_s": round(warm_s, 3),
+        "edited_files": edits,
+        "refresh_s": round(refresh_s, 3),
+        "query": query
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark building, loading and querying the knowledge base.")
+    parser.add_argument("--documents", default="2000", help="Number of Markdown guides, e.g. 2000 or 10k")
+    parser.add_argument("--edits", type=int, default=20, help="Files changed before the incremental refresh")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Write the results as JSON to this path")
+    args = parser.parse_args()
+
+    result = run(parse_scale(args.documents), args.edits, args.seed)
+    print(f"{result['documents']:,} documents, {result['chunks']:,} chunks")
+    print(f"  cold build:  {result['cold_build_s']:8.3f} s")
+    print(f"  warm start:  {result['warm_start_s']:8.3f} s")
+    print(f"  refresh ({result['edited_files']} edited): {result['refresh_s']:.3f} s")
+    print(f"  query:       {result['query']['p50_ms']:8.3f} ms p50, {result['query']['p95_ms']:.3f} ms p95")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({
+                "meta": {
+                    "benchmark": "knowledge",
+                    "timestamp": datetime.utcnow().isoformat(),
+                    "python": platform.python_version(),
+                    "seed": args.seed
+                },
+                "result": result
+            }, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,277 @@
+"""
+Plan-Trip Benchmark
+Drives POST /api/v1/plan-trip through a real uvicorn server, with every upstream API
+replaced by the stub server (app/stubs) at a controlled latency, and reports
+throughput and p50/p95/p99 latency per concurrency level, overall and per stage
+(research, itinerary, summary, persistence, enrichment) from the Server-Timing header.
+
+    python -m benchmarks.plan_trip_bench --concurrency 1,4,16 --requests 60 \\
+        --latency-ms 80 --distribution lognormal --spread 0.3 --output results.json
+
+Every level replays the same payloads from cold caches: the upstream, hotel-index and
+embedding caches are cleared and a fresh trips file starts the past-trip index empty,
+so later levels are not measured against caches warmed by earlier ones.
+
+Pass --baseline to compare against a stored run; the exit status is 1 when any
+latency percentile or the throughput regresses by more than --threshold.
+--update-baseline stores the current run as the new baseline instead.
+"""
+
+from typing import Dict, Any, List
+from contextlib import redirect_stdout
+from datetime import date, datetime, timedelta
+import aiohttp
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import random
+import socket
+import sys
+import tempfile
+import time
+import numpy as np
+import uvicorn
+
+from app.config import settings
+from app.core.utils.cache import all_caches
+from app.core.utils.rate_limiter import RateLimiter
+from app.core.utils.timing import parse_server_timing
+from app.stubs import StubServer, StubConfig, ProviderProfile, LatencyProfile
+
+DESTINATIONS = ["Paris", "London", "Tokyo", "Rome", "Barcelona", "Amsterdam", "Berlin", "Madrid", "Dubai", "New York"]
+INTERESTS = ["culture", "food", "history", "art", "nightlife", "nature", "shopping", "architecture"]
+PERCENTILES = (50, 95, 99)
+
+def make_payloads(count: int, seed: int) -> List[Dict[str, Any]]:
+    """Deterministic mix of trips, varied enough that the upstream caches see realistic hit rates."""
+    rng = random.Random(seed)
+    first_day = date.today() + timedelta(days=14)
+    payloads = []
+    for _ in range(count):
+        start = first_day + timedelta(days=rng.randint(0, 60))
+        payloads.append({
+            "destination": rng.choice(DESTINATIONS),
+            "from": "NYC",
+            "startDate": start.isoformat(),
+            "endDate": (start + timedelta(days=rng.randint(2, 6))).isoformat(),
+            "budget": rng.choice([1500, 2500, 4000]),
+            "travelers": rng.randint(1, 4),
+            "interests": rng.sample(INTERESTS, 3),
+            "travelStyle": rng.choice(["budget", "mid-range", "luxury"])
+        })
+    return payloads
+
+def summarize(values: List[float]) -> Dict[str, float]:
+    if not values:
+        return {}
+    data = np.asarray(values, dtype=np.float64)
+    summary = {f"p{p}": round(float(np.percentile(data, p)), 2) for p in PERCENTILES}
+    summary["mean"] = round(float(data.mean()), 2)
+    summary["max"] = round(float(data.max()), 2)
+    return summary
+
+async def run_level(session: aiohttp.ClientSession, url: str, payloads: List[Dict[str, Any]],
+                    concurrency: int) -> Dict[str, Any]:
+    """Send ``payloads`` with ``concurrency`` requests in flight and aggregate the timings."""
+    pending = iter(payloads)
+    totals: List[float] = []
+    stages: Dict[str, List[float]] = {}
+    errors = 0
+
+    async def worker():
+        nonlocal errors
+        for payload in pending:
+            started = time.perf_counter()
+            async with session.post(url, json=payload) as response:
+                await response.read()
+                status = response.status
+                header = response.headers.get("Server-Timing", "")
+            if status != 200:
+                errors += 1
+                continue
+            totals.append((time.perf_counter() - started) * 1000)
+            for name, duration in parse_server_timing(header).items():
+                stages.setdefault(name, []).append(duration)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    return {
+        "concurrency": concurrency,
+        "requests": len(payloads),
+        "errors": errors,
+        "duration_s": round(elapsed, 3),
+        "throughput_rps": round(len(totals) / elapsed, 3) if elapsed else 0.0,
+        "latency_ms": {"total": summarize(totals), **{name: summarize(v) for name, v in stages.items()}}
+    }
+
+def compare_results(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float,
+                    min_delta_ms: float = 1.0) -> List[str]:
+    """Regressions of ``current`` against ``baseline`` beyond ``threshold`` (a fraction).
+
+    Latency differences smaller than ``min_delta_ms`` are ignored so that sub-millisecond
+    stages do not fail the comparison on noise.
+    """
+    regressions = []
+    for level, result in current["levels"].items():
+        base = baseline.get("levels", {}).get(level)
+        if not base:
+            continue
+        if result["throughput_rps"] < base["throughput_rps"] * (1 - threshold):
+            regressions.append(f"c={level} throughput: {base['throughput_rps']} -> {result['throughput_rps']} req/s")
+        for name, stats in result["latency_ms"].items():
+            base_stats = base["latency_ms"].get(name, {})
+            for p in PERCENTILES:
+                key = f"p{p}"
+                if key not in stats or key not in base_stats:
+                    continue
+                old, new = base_stats[key], stats[key]
+                if new > old * (1 + threshold) and new - old >= min_delta_ms:
+                    change = (new - old) / old * 100 if old else float("inf")
+                    regressions.append(f"c={level} {name} {key}: {old}ms -> {new}ms (+{change:.1f}%)")
+    return regressions
+
+def print_report(results: Dict[str, Any]) -> None:
+    for level, result in results["levels"].items():
+        print(f"\nconcurrency={level}  requests={result['requests']}  errors={result['errors']}  "
+              f"throughput={result['throughput_rps']} req/s")
+        print(f"  {'stage':<12} {'p50':>9} {'p95':>9} {'p99':>9} {'mean':>9}")
+        for name, stats in result["latency_ms"].items():
+            if stats:
+                print(f"  {name:<12} " + " ".join(f"{stats[k]:>9.1f}" for k in ("p50", "p95", "p99", "mean")))
+
+def _lift_client_rate_limits() -> None:
+    """The stub has no quota, so replace the per-minute limiters with unthrottled ones.
+
+    The concurrency caps are kept since they are part of how the app behaves under load.
+    """
+    from app.core.tools import flight_tool, hotel_tool
+    from app.core.tools.hotel_config import HOTEL_CONFIG
+    for module, attr in ((hotel_tool, "_rate_limiter"), (flight_tool, "_amadeus_rate_limiter")):
+        setattr(module, attr, RateLimiter(10 ** 9, period=1.0, max_concurrency=HOTEL_CONFIG.MAX_CONCURRENT_REQUESTS))
+
+def _reset_caches(database: Any, workdir: str, level: int) -> None:
+    """Start a level from the same cold state as the first: empty in-process caches and no saved trips."""
+    for cache in all_caches():
+        cache.clear()
+    database.TRIPS_FILE = os.path.join(workdir, f"trips-c{level}.json")
+
+async def run_benchmark(args: argparse.Namespace) -> Dict[str, Any]:
+    if args.stub_config:
+        stub_config = StubConfig.from_file(args.stub_config)
+    else:
+        stub_config = StubConfig(default=ProviderProfile(
+            latency=LatencyProfile(args.distribution, args.latency_ms, args.spread),
+            error_rate=args.error_rate
+        ))
+    stub_config.seed = args.seed
+
+    async with StubServer(stub_config) as stub:
+        # Tools read their base URLs when constructed, so point them at the stub before importing the app
+        settings.UPSTREAM_STUB_URL = stub.url
+        from app.main import app
+        from app.services import database
+        if not args.respect_rate_limits:
+            _lift_client_rate_limits()
+
+        with tempfile.TemporaryDirectory() as workdir:
+            database.TRIPS_FILE = os.path.join(workdir, "trips.json")
+
+            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            sock.bind(("127.0.0.1", 0))
+            server = uvicorn.Server(uvicorn.Config(app, log_level="warning", access_log=False, lifespan="off"))
+            serving = asyncio.create_task(server.serve(sockets=[sock]))
+            while not server.started:
+                await asyncio.sleep(0.01)
+            url = f"http://127.0.0.1:{sock.getsockname()[1]}/api/v1/plan-trip"
+
+            levels = {}
+            try:
+                timeout = aiohttp.ClientTimeout(total=args.timeout)
+                connector = aiohttp.TCPConnector(limit=0)
+                async with aiohttp.ClientSession(timeout=timeout, connector=connector) as session:
+                    if args.warmup:
+                        await run_level(session, url, make_payloads(args.warmup, args.seed + 1), 1)
+                    for concurrency in args.concurrency:
+                        _reset_caches(database, workdir, concurrency)
+                        payloads = make_payloads(args.requests, args.seed)
+                        levels[str(concurrency)] = await run_level(session, url, payloads, concurrency)
+            finally:
+                server.should_exit = True
+                await serving
+
+    return {
+        "meta": {
+            "benchmark": "plan_trip",
+            "timestamp": datetime.utcnow().isoformat(),
+            "python": platform.python_version(),
+            "requests_per_level": args.requests,
+            "warmup": args.warmup,
+            "seed": args.seed,
+            "cold_caches_per_level": True,
+            "stub": {
+                "distribution": args.distribution,
+                "latency_ms": args.latency_ms,
+                "spread": args.spread,
+                "error_rate": args.error_rate,
+                "config_file": args.stub_config
+            }
+        },
+        "levels": levels
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark POST /api/v1/plan-trip against stubbed upstream APIs.")
+    parser.add_argument("--concurrency", default="1,4,16", help="Comma-separated concurrency levels")
+    parser.add_argument("--requests", type=int, default=40, help="Requests per concurrency level")
+    parser.add_argument("--warmup", type=int, default=3, help="Unmeasured requests sent before the first level")
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="Stub latency (median for lognormal)")
+    parser.add_argument("--distribution", default="lognormal", choices=["fixed", "uniform", "normal", "lognormal"])
+    parser.add_argument("--spread", type=float, default=0.25)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--stub-config", help="JSON stub config with per-provider profiles (overrides latency flags)")
+    parser.add_argument("--respect-rate-limits", action="store_true",
+                        help="Keep the per-minute client rate limits meant for the real APIs")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--timeout", type=float, default=120.0, help="Per-request timeout in seconds")
+    parser.add_argument("--output", help="Write the results as JSON to this path")
+    parser.add_argument("--baseline", help="Baseline results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.15, help="Allowed regression as a fraction, e.g. 0.15")
+    parser.add_argument("--update-baseline", action="store_true", help="Store this run as the baseline")
+    parser.add_argument("--verbose", action="store_true", help="Keep the app's own logging and prints")
+    args = parser.parse_args()
+    args.concurrency = [int(level) for level in args.concurrency.split(",") if level.strip()]
+
+    if args.verbose:
+        results = asyncio.run(run_benchmark(args))
+    else:
+        logging.disable(logging.INFO)
+        with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+            results = asyncio.run(run_benchmark(args))
+
+    print_report(results)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline and args.update_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nBaseline written to {args.baseline}")
+    elif args.baseline:
+        with open(args.baseline, "r") as f:
+            baseline = json.load(f)
+        regressions = compare_results(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) beyond {args.threshold:.0%}:")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+        print(f"\nNo regressions beyond {args.threshold:.0%} against {args.baseline}")
+
+if __name__ == "__main__":
+    main()
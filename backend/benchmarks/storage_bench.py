@@ -0,0 +1,194 @@
+"""
+Storage Benchmarks
+Measures how the file-backed store in app/services/database.py degrades with size:
+load_data, save_trips, trip lookup by id, user lookup by email and the dashboard
+stats endpoint, each exercised the way the routes do it (reload, then scan).
+
+    python -m benchmarks.storage_bench --scales 1k,10k,100k --output storage.json
+
+With --data-dir, each scale's dataset lives in <data-dir>/trips-<count> (e.g.
+trips-100000) and is generated there only when missing.
+
+A replacement store can be checked against the JSON files with --backend
+module:Class. The class takes the dataset directory and implements the same
+methods as FileBackend. Its answers are validated against FileBackend's before it
+is timed.
+"""
+
+from typing import Dict, Any, List, Optional, Callable, Tuple
+from datetime import datetime
+import argparse
+import importlib
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import numpy as np
+
+from app.services import database
+from benchmarks.data_generator import generate_dataset, parse_scale
+
+OPERATIONS = ["load_data", "save_trips", "trip_by_id", "user_by_email", "dashboard_stats"]
+
+class FileBackend:
+    """The current JSON-file store, pointed at a dataset directory."""
+
+    name = "json-files"
+
+    def __init__(self, directory: str):
+        self._previous = (database.TRIPS_FILE, database.CONTACT_FILE, database.USERS_FILE)
+        database.TRIPS_FILE = os.path.join(directory, "trips.json")
+        database.CONTACT_FILE = os.path.join(directory, "contact_messages.json")
+        database.USERS_FILE = os.path.join(directory, "users.json")
+
+    def load_data(self) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]], List[Dict[str, Any]]]:
+        return database.load_data()
+
+    def save_trips(self, trips: List[Dict[str, Any]]) -> None:
+        database.save_trips(trips)
+
+    def get_trip(self, trip_id: int) -> Optional[Dict[str, Any]]:
+        trips, _, _ = database.load_data()
+        return next((trip for trip in trips if trip["id"] == trip_id), None)
+
+    def get_user_by_email(self, email: str) -> Optional[Dict[str, Any]]:
+        _, _, users = database.load_data()
+        return next((user for user in users if user["email"] == email), None)
+
+    def dashboard_stats(self) -> Dict[str, Any]:
+        return database.dashboard_stats(*database.load_data())
+
+    def close(self) -> None:
+        database.TRIPS_FILE, database.CONTACT_FILE, database.USERS_FILE = self._previous
+
+def load_backend(spec: str) -> Callable[[str], Any]:
+    """Resolve "package.module:ClassName" to a backend class."""
+    module_name, _, class_name = spec.partition(":")
+    return getattr(importlib.import_module(module_name), class_name)
+
+def _sample_keys(directory: str, samples: int, seed: int) -> Tuple[List[int], List[str]]:
+    """Trip ids and user emails to look up, spread over the whole file (not just the head)."""
+    backend = FileBackend(directory)
+    trips, _, users = backend.load_data()
+    backend.close()
+    rng = random.Random(seed)
+    trip_ids = [trips[rng.randrange(len(trips))]["id"] for _ in range(samples)] + [-1]
+    emails = [users[rng.randrange(len(users))]["email"] for _ in range(samples)] + ["missing@example.com"]
+    return trip_ids, emails
+
+def validate_backend(candidate: Any, reference: FileBackend, trip_ids: List[int], emails: List[str]) -> List[str]:
+    """Differences between a candidate backend's answers and the JSON store's."""
+    problems = []
+    reference_data = reference.load_data()
+    candidate_data = candidate.load_data()
+    for name, expected, actual in zip(("trips", "contact_messages", "users"), reference_data, candidate_data):
+        if len(expected) != len(actual):
+            problems.append(f"load_data {name}: {len(actual)} records, expected {len(expected)}")
+    for trip_id in trip_ids:
+        if candidate.get_trip(trip_id) != reference.get_trip(trip_id):
+            problems.append(f"trip_by_id {trip_id}: mismatch")
+    for email in emails:
+        if candidate.get_user_by_email(email) != reference.get_user_by_email(email):
+            problems.append(f"user_by_email {email}: mismatch")
+    if candidate.dashboard_stats() != reference.dashboard_stats():
+        problems.append("dashboard_stats: mismatch")
+    return problems
+
+def _time(operation: Callable[[], Any], repeats: int) -> Dict[str, float]:
+    durations = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        operation()
+        durations.append((time.perf_counter() - started) * 1000)
+    data = np.asarray(durations)
+    return {
+        "repeats": repeats,
+        "min_ms": round(float(data.min()), 3),
+        "median_ms": round(float(np.median(data)), 3),
+        "max_ms": round(float(data.max()), 3)
+    }
+
+def benchmark_backend(backend: Any, trip_ids: List[int], emails: List[str], repeats: int) -> Dict[str, Any]:
+    trips, _, _ = backend.load_data()
+    trip_keys, email_keys = iter(trip_ids * repeats), iter(emails * repeats)
+    return {
+        "load_data": _time(backend.load_data, repeats),
+        # Rewrites the file with identical contents, so later operations see the same dataset
+        "save_trips": _time(lambda: backend.save_trips(trips), repeats),
+        "trip_by_id": _time(lambda: backend.get_trip(next(trip_keys)), repeats),
+        "user_by_email": _time(lambda: backend.get_user_by_email(next(email_keys)), repeats),
+        "dashboard_stats": _time(backend.dashboard_stats, repeats)
+    }
+
+def run_scale(count: int, args: argparse.Namespace, workdir: str) -> Dict[str, Any]:
+    directory = os.path.join(args.data_dir or workdir, f"trips-{count}")
+    if not os.path.exists(os.path.join(directory, "trips.json")):
+        generate_dataset(directory, count, seed=args.seed)
+    sizes = {name: os.path.getsize(os.path.join(directory, f"{name}.json"))
+             for name in ("trips", "users", "contact_messages")}
+    # Large files take seconds per operation; a few repeats are enough there
+    repeats = max(1, min(args.repeats, int(args.repeats * 10_000 / count) or 1))
+    trip_ids, emails = _sample_keys(directory, max(1, min(repeats, 5)), args.seed)
+
+    result = {"records": count, "file_bytes": sizes, "backends": {}}
+    reference = FileBackend(directory)
+    try:
+        result["backends"][reference.name] = benchmark_backend(reference, trip_ids, emails, repeats)
+        if args.backend:
+            candidate = load_backend(args.backend)(directory)
+            name = getattr(candidate, "name", args.backend)
+            problems = validate_backend(candidate, reference, trip_ids, emails)
+            result["backends"][name] = benchmark_backend(candidate, trip_ids, emails, repeats)
+            result["backends"][name]["validation_errors"] = problems
+            if hasattr(candidate, "close"):
+                candidate.close()
+    finally:
+        reference.close()
+    return result
+
+def print_report(results: Dict[str, Any]) -> None:
+    for scale in results["scales"]:
+        megabytes = scale["file_bytes"]["trips"] / 1e6
+        print(f"\n{scale['records']:,} trips ({megabytes:.1f} MB trips.json)")
+        for backend, operations in scale["backends"].items():
+            print(f"  {backend}")
+            for name in OPERATIONS:
+                stats = operations[name]
+                print(f"    {name:<16} median {stats['median_ms']:>11.2f} ms   min {stats['min_ms']:>11.2f} ms")
+            for problem in operations.get("validation_errors", []):
+                print(f"    INVALID: {problem}")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the file-backed store at increasing sizes.")
+    parser.add_argument("--scales", default="1k,10k", help="Comma-separated trip counts, e.g. 1k,10k,100k,1m")
+    parser.add_argument("--repeats", type=int, default=10, help="Repeats per operation at 10k records and below")
+    parser.add_argument("--data-dir", help="Keep generated datasets here, as trips-<count>, and reuse them across runs")
+    parser.add_argument("--backend", help="Replacement backend to validate and time, as module:Class")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Write the results as JSON to this path")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        scales = [run_scale(parse_scale(scale), args, workdir) for scale in args.scales.split(",") if scale.strip()]
+
+    results = {
+        "meta": {
+            "benchmark": "storage",
+            "timestamp": datetime.utcnow().isoformat(),
+            "python": platform.python_version(),
+            "seed": args.seed
+        },
+        "scales": scales
+    }
+    print_report(results)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    if any(backend.get("validation_errors") for scale in scales for backend in scale["backends"].values()):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
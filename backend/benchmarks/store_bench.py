@@ -0,0 +1,133 @@
+"""
+Embedding Store Benchmarks
+Startup time and resident memory of the memory-mapped store (app/core/memory/mapped_memory.py)
+against loading a saved in-memory VectorMemory snapshot. The store is built once with
+an IVF index; a read-only open is then timed, followed by IVF queries. Each query only
+faults in the pages of its probed rows, so resident memory follows the rows queries
+actually touch rather than the corpus size, and it is shared page cache rather than
+private memory (random synthetic queries soon touch most of the file, and the kernel
+may map whole large folios around each row).
+
+    python -m benchmarks.store_bench --vectors 200k --dim 384 --output store.json
+"""
+
+from typing import Any, Dict
+from datetime import datetime
+import argparse
+import json
+import os
+import platform
+import resource
+import tempfile
+import time
+import numpy as np
+
+from app.core.memory.ivf_index import IVFIndex
+from app.core.memory.mapped_memory import MappedVectorMemory
+from app.core.memory.vector_memory import VectorMemory
+from benchmarks.ann_bench import clustered_vectors
+from benchmarks.data_generator import parse_scale
+
+def resident_mb() -> Dict[str, float]:
+    """Private (anonymous) and file-backed resident memory; peak RSS where /proc is not available."""
+    try:
+        with open("/proc/self/status") as f:
+            fields = dict(line.split(":", 1) for line in f)
+        return {"anon": int(fields["RssAnon"].split()[0]) / 1e3, "file": int(fields["RssFile"].split()[0]) / 1e3}
+    except (OSError, KeyError):
+        return {"anon": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1e3, "file": 0.0}
+
+def _grown(before: Dict[str, float], after: Dict[str, float]) -> Dict[str, float]:
+    return {kind: round(after[kind] - before[kind], 1) for kind in before}
+
+def build_store(directory: str, count: int, dim: int, nlist: int, seed: int, chunk: int = 20_000) -> float:
+    rng = np.random.default_rng(seed)
+    started = time.perf_counter()
+    store = MappedVectorMemory(directory, dim=dim, index=IVFIndex(nlist=nlist, train_size=count))
+    for start in range(0, count, chunk):
+        size = min(chunk, count - start)
+        doc_ids = [f"doc-{n}" for n in range(start, start + size)]
+        store.add_batch(doc_ids, doc_ids, clustered_vectors(size, dim, max(nlist // 4, 1), rng))
+    store.close()
+    return time.perf_counter() - started
+
+def run(count: int, dim: int, nlist: int, queries: int, seed: int) -> Dict[str, Any]:
+    with tempfile.TemporaryDirectory() as directory:
+        build_s = build_store(os.path.join(directory, "store"), count, dim, nlist, seed)
+        held_out = clustered_vectors(queries, dim, max(nlist // 4, 1), np.random.default_rng(seed))
+
+        before = resident_mb()
+        started = time.perf_counter()
+        store = MappedVectorMemory(os.path.join(directory, "store"), readonly=True)
+        open_ms = (time.perf_counter() - started) * 1000
+        opened = resident_mb()
+        store.search_batch(held_out[:1], 10)
+        first_query = resident_mb()
+        started = time.perf_counter()
+        store.search_batch(held_out, 10)
+        query_ms = (time.perf_counter() - started) * 1000 / queries
+        queried = resident_mb()
+
+        store.save(os.path.join(directory, "snapshot"))
+        del store
+        baseline = resident_mb()
+        started = time.perf_counter()
+        memory = VectorMemory.load(os.path.join(directory, "snapshot"))
+        load_ms = (time.perf_counter() - started) * 1000
+        loaded = resident_mb()
+        del memory
+
+    return {
+        "vectors": count,
+        "dim": dim,
+        "matrix_mb": round(count * dim * 4 / 1e6, 1),
+        "build_s": round(build_s, 2),
+        "mapped": {
+            "open_ms": round(open_ms, 3),
+            "open_rss_mb": _grown(before, opened),
+            "first_query_rss_mb": _grown(before, first_query),
+            "query_ms": round(query_ms, 3),
+            "after_queries_rss_mb": _grown(before, queried),
+            "queries": queries
+        },
+        "in_memory": {"load_ms": round(load_ms, 1), "rss_mb": _grown(baseline, loaded)}
+    }
+
+def _rss(grown: Dict[str, float]) -> str:
+    return f"+{grown['anon']:.1f} MB private, +{grown['file']:.1f} MB shared"
+
+def print_report(result: Dict[str, Any]) -> None:
+    mapped, in_memory = result["mapped"], result["in_memory"]
+    print(f"{result['vectors']:,} vectors x {result['dim']} ({result['matrix_mb']:.0f} MB), built in {result['build_s']:.1f}s")
+    print(f"  mapped open:     {mapped['open_ms']:8.2f} ms  {_rss(mapped['open_rss_mb'])}")
+    print(f"  first query:                {_rss(mapped['first_query_rss_mb'])}")
+    print(f"  {mapped['queries']} IVF queries: {mapped['query_ms']:8.2f} ms each  {_rss(mapped['after_queries_rss_mb'])}")
+    print(f"  in-memory load:  {in_memory['load_ms']:8.0f} ms  {_rss(in_memory['rss_mb'])}")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Startup time and resident memory of the mapped embedding store.")
+    parser.add_argument("--vectors", default="100k", help="Number of stored vectors, e.g. 100k or 1m")
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--nlist", type=int, default=256)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Write the results as JSON to this path")
+    args = parser.parse_args()
+
+    result = run(parse_scale(args.vectors), args.dim, args.nlist, args.queries, args.seed)
+    print_report(result)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({
+                "meta": {
+                    "benchmark": "store",
+                    "timestamp": datetime.utcnow().isoformat(),
+                    "python": platform.python_version(),
+                    "numpy": np.__version__,
+                    "seed": args.seed
+                },
+                "result": result
+            }, f, indent=2)
+
+if __name__ == "__main__":
+    main()
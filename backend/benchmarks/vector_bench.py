@@ -0,0 +1,94 @@
+"""
+Vector Index Benchmarks
+Insert throughput and top-k query latency of VectorMemory (app/core/memory/vector_memory.py)
+at increasing sizes, with random unit vectors of the embedding dimension.
+
+    python -m benchmarks.vector_bench --scales 10k,100k,1m --dim 384 --output vectors.json
+"""
+
+from typing import Any, Dict, List
+from datetime import datetime
+import argparse
+import json
+import platform
+import time
+import numpy as np
+
+from app.core.memory.vector_memory import VectorMemory
+from benchmarks.data_generator import parse_scale
+
+def build_index(count: int, dim: int, seed: int, chunk: int = 10_000) -> Dict[str, Any]:
+    rng = np.random.default_rng(seed)
+    memory = VectorMemory(dim=dim)
+    elapsed = 0.0
+    for start in range(0, count, chunk):
+        size = min(chunk, count - start)
+        vectors = rng.standard_normal((size, dim), dtype=np.float32)
+        doc_ids = [f"doc-{n}" for n in range(start, start + size)]
+        started = time.perf_counter()
+        memory.add_batch(doc_ids, doc_ids, vectors)
+        elapsed += time.perf_counter() - started
+    return {"memory": memory, "insert_s": elapsed}
+
+def _latency_ms(run, repeats: int) -> Dict[str, float]:
+    samples = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        run()
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return {"p50_ms": round(samples[len(samples) // 2], 3), "p95_ms": round(samples[int(0.95 * (len(samples) - 1))], 3)}
+
+def run_scale(count: int, dim: int, top_k: int, batch: int, repeats: int, seed: int) -> Dict[str, Any]:
+    built = build_index(count, dim, seed)
+    memory = built["memory"]
+    queries = np.random.default_rng(seed + 1).standard_normal((batch, dim), dtype=np.float32)
+
+    single = _latency_ms(lambda: memory.search_batch(queries[:1], top_k), repeats)
+    batched = _latency_ms(lambda: memory.search_batch(queries, top_k), max(3, repeats // 4))
+    return {
+        "vectors": count,
+        "dim": dim,
+        "matrix_mb": round(memory._matrix.nbytes / 1e6, 1),
+        "insert_per_s": round(count / built["insert_s"]) if built["insert_s"] else None,
+        "query": single,
+        "batch": {**batched, "queries": batch, "per_query_ms": round(batched["p50_ms"] / batch, 4)}
+    }
+
+def print_report(scales: List[Dict[str, Any]], top_k: int) -> None:
+    print(f"{'vectors':>10} {'matrix MB':>10} {'insert/s':>12} {'query p50':>10} {'query p95':>10} {'batch/query':>12}   (top {top_k}, ms)")
+    for scale in scales:
+        print(f"{scale['vectors']:>10,} {scale['matrix_mb']:>10.1f} {scale['insert_per_s']:>12,} "
+              f"{scale['query']['p50_ms']:>10.3f} {scale['query']['p95_ms']:>10.3f} {scale['batch']['per_query_ms']:>12.4f}")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the VectorMemory index at increasing sizes.")
+    parser.add_argument("--scales", default="10k,100k", help="Comma-separated vector counts, e.g. 10k,100k,1m")
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--batch", type=int, default=64, help="Queries per batched search")
+    parser.add_argument("--repeats", type=int, default=40)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Write the results as JSON to this path")
+    args = parser.parse_args()
+
+    scales = [
+        run_scale(parse_scale(scale), args.dim, args.top_k, args.batch, args.repeats, args.seed)
+        for scale in args.scales.split(",") if scale.strip()
+    ]
+    print_report(scales, args.top_k)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({
+                "meta": {
+                    "benchmark": "vectors",
+                    "timestamp": datetime.utcnow().isoformat(),
+                    "python": platform.python_version(),
+                    "numpy": np.__version__,
+                    "seed": args.seed
+                },
+                "scales": scales
+            }, f, indent=2)
+
+if __name__ == "__main__":
+    main()